@@ -0,0 +1,102 @@
+-- =============================================================================
+-- Migration: 006_usage_ledger
+-- Description: Durable usage ledger. Redis usage counters are flushed here
+--              periodically so usage survives a Redis flush and has history.
+-- Sprint: Phase 2 — Billing
+-- Depends on: 005_security_definer_helpers
+-- =============================================================================
+
+-- =============================================================================
+-- Usage Metrics (one row per org / category / billing period)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS usage_metrics (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  org_id UUID NOT NULL,
+  -- Per-user attribution (unused by the org ledger); system_delete_user_data deletes by it
+  user_id UUID,
+  category VARCHAR(50) NOT NULL,
+  period CHAR(7) NOT NULL,  -- YYYY-MM, same as the Redis key suffix
+  used BIGINT NOT NULL DEFAULT 0,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+
+  CONSTRAINT usage_metrics_org_category_period UNIQUE (org_id, category, period)
+);
+
+CREATE INDEX IF NOT EXISTS idx_usage_metrics_period ON usage_metrics(period);
+
+ALTER TABLE usage_metrics ENABLE ROW LEVEL SECURITY;
+
+-- Org members can read their own usage history; writes go through the function below
+CREATE POLICY usage_metrics_select ON usage_metrics
+  FOR SELECT USING (org_id = auth.current_org_id());
+
+
+-- =============================================================================
+-- Flush batches already applied (makes apply_usage_deltas idempotent)
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS usage_flush_batches (
+  batch_id UUID PRIMARY KEY,
+  applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_usage_flush_batches_applied_at ON usage_flush_batches(applied_at);
+
+ALTER TABLE usage_flush_batches ENABLE ROW LEVEL SECURITY;
+
+
+-- =============================================================================
+-- System: Apply a batch of counter deltas exactly once
+-- p_rows: [{"org_id", "category", "period", "delta"}, ...], unique per key.
+-- A batch ID seen before is ignored, so a worker can safely resend a batch
+-- whose result it never saw. Returns the number of rows written.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION apply_usage_deltas(
+  p_batch_id UUID,
+  p_rows JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  INSERT INTO usage_flush_batches (batch_id) VALUES (p_batch_id)
+  ON CONFLICT (batch_id) DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN 0;
+  END IF;
+
+  -- Make sure every key has a row, then add the (possibly negative) deltas
+  INSERT INTO usage_metrics (org_id, category, period, used)
+  SELECT r.org_id, r.category, r.period, 0
+  FROM jsonb_to_recordset(p_rows) AS r(org_id UUID, category TEXT, period TEXT, delta BIGINT)
+  ON CONFLICT (org_id, category, period) DO NOTHING;
+
+  UPDATE usage_metrics m
+  SET used = GREATEST(m.used + r.delta, 0),
+      updated_at = NOW()
+  FROM jsonb_to_recordset(p_rows) AS r(org_id UUID, category TEXT, period TEXT, delta BIGINT)
+  WHERE m.org_id = r.org_id
+    AND m.category = r.category
+    AND m.period = r.period;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  -- Batch IDs only need to outlive worker retries
+  DELETE FROM usage_flush_batches WHERE applied_at < NOW() - INTERVAL '7 days';
+
+  RETURN v_count;
+END;
+$$;
+
+
+-- =============================================================================
+-- Grants
+-- =============================================================================
+
+-- Ledger writes: only service_role (worker)
+GRANT EXECUTE ON FUNCTION apply_usage_deltas TO service_role;
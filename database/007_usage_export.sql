@@ -0,0 +1,70 @@
+-- =============================================================================
+-- Migration: 007_usage_export
+-- Description: Track which usage overage has been reported to Stripe meters,
+--              so the periodic export only sends new units, exactly once.
+-- Sprint: Phase 2 — Billing
+-- Depends on: 006_usage_ledger
+-- =============================================================================
+
+-- exported:      overage units Stripe has acknowledged
+-- export_target: overage total of an export in flight (NULL when none).
+--                Resent with the same meter event identifier until acknowledged.
+ALTER TABLE usage_metrics
+  ADD COLUMN IF NOT EXISTS exported BIGINT NOT NULL DEFAULT 0,
+  ADD COLUMN IF NOT EXISTS export_target BIGINT;
+
+
+-- =============================================================================
+-- System: Stage export targets (p_rows: [{"id", "target"}, ...])
+-- Rows that already have an export in flight keep their target.
+-- Returns the IDs actually staged, so concurrent runs never both claim a row.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION stage_usage_export(p_rows JSONB)
+RETURNS TABLE (id UUID)
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE usage_metrics m
+  SET export_target = r.target
+  FROM jsonb_to_recordset(p_rows) AS r(id UUID, target BIGINT)
+  WHERE m.id = r.id
+    AND m.export_target IS NULL
+    AND r.target > m.exported
+  RETURNING m.id;
+END;
+$$;
+
+
+-- =============================================================================
+-- System: Record acknowledged exports (p_rows: [{"id", "exported"}, ...])
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION mark_usage_exported(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  UPDATE usage_metrics m
+  SET exported = GREATEST(m.exported, r.exported),
+      export_target = NULL
+  FROM jsonb_to_recordset(p_rows) AS r(id UUID, exported BIGINT)
+  WHERE m.id = r.id;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
+
+
+-- =============================================================================
+-- Grants
+-- =============================================================================
+
+-- Export bookkeeping: only service_role (worker)
+GRANT EXECUTE ON FUNCTION stage_usage_export TO service_role;
+GRANT EXECUTE ON FUNCTION mark_usage_exported TO service_role;
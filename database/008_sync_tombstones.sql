@@ -0,0 +1,87 @@
+-- =============================================================================
+-- Migration: 008_sync_tombstones
+-- Description: Tombstones for delta sync. Deleting a skill, habit, reflex or
+--              project records its ID here, so GET /<resource>/changes can
+--              report deletes alongside rows whose updated_at moved.
+-- Sprint: Phase 2 — Performance
+-- Depends on: 004_rls_policies
+-- =============================================================================
+
+-- One row per deleted record. Only IDs and owners, no content; pruned by
+-- log retention after SYNC_TOMBSTONE_RETENTION_DAYS (clients whose cursor is
+-- older than that get a full resync instead).
+CREATE TABLE IF NOT EXISTS deleted_records (
+  id BIGSERIAL PRIMARY KEY,
+  table_name VARCHAR(64) NOT NULL,
+  record_id UUID NOT NULL,
+  user_id UUID,
+  organization_id UUID,
+  -- When the row was deleted
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_deleted_records_table_created_at
+  ON deleted_records(table_name, created_at);
+
+ALTER TABLE deleted_records ENABLE ROW LEVEL SECURITY;
+
+-- Same visibility as the rows were: skill tables per user, projects per org
+CREATE POLICY deleted_records_select ON deleted_records
+  FOR SELECT USING (
+    (table_name IN ('skills', 'habits', 'reflexes') AND user_id = auth.current_user_id())
+    OR (table_name = 'projects' AND organization_id = auth.current_org_id())
+  );
+
+
+-- =============================================================================
+-- Trigger: record a tombstone for every deleted row
+-- A trigger rather than the service layer, so cascades (a skill's habits and
+-- reflexes) and deletes outside the API are recorded too.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION record_deleted_row()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO deleted_records (table_name, record_id, user_id, organization_id)
+  VALUES (
+    TG_TABLE_NAME,
+    OLD.id,
+    (to_jsonb(OLD)->>'user_id')::UUID,
+    (to_jsonb(OLD)->>'organization_id')::UUID
+  );
+  RETURN OLD;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS record_skills_deleted ON skills;
+CREATE TRIGGER record_skills_deleted
+  AFTER DELETE ON skills
+  FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+DROP TRIGGER IF EXISTS record_habits_deleted ON habits;
+CREATE TRIGGER record_habits_deleted
+  AFTER DELETE ON habits
+  FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+DROP TRIGGER IF EXISTS record_reflexes_deleted ON reflexes;
+CREATE TRIGGER record_reflexes_deleted
+  AFTER DELETE ON reflexes
+  FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+DROP TRIGGER IF EXISTS record_projects_deleted ON projects;
+CREATE TRIGGER record_projects_deleted
+  AFTER DELETE ON projects
+  FOR EACH ROW EXECUTE FUNCTION record_deleted_row();
+
+
+-- =============================================================================
+-- Indexes for "changed since" reads
+-- =============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_skills_user_updated_at ON skills(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_habits_user_updated_at ON habits(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_reflexes_user_updated_at ON reflexes(user_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_projects_org_updated_at ON projects(organization_id, updated_at);
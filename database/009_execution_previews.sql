@@ -0,0 +1,48 @@
+-- =============================================================================
+-- Migration: 009_execution_previews
+-- Description: Computed fields for slim execution lists. GET /executions
+--              selects output_preview and output_length instead of the full
+--              output text and input JSON; the full output is only read by
+--              GET /executions/{id}; /executions/{id}/output pages it out
+--              with execution_output_chunk().
+-- Sprint: Phase 2 — Performance
+-- Depends on: 002_skills_tables
+-- =============================================================================
+
+-- PostgREST exposes a function taking the table's row type as a computed
+-- column: select=id,status,output_preview. Evaluated per returned row only,
+-- so nothing is stored and existing rows need no backfill.
+
+-- First 200 characters of the output (NULL while the execution has none)
+CREATE OR REPLACE FUNCTION output_preview(skill_executions)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT left($1.output, 200);
+$$;
+
+-- Length of the full output in characters, so lists can show "more" links
+CREATE OR REPLACE FUNCTION output_length(skill_executions)
+RETURNS INTEGER
+LANGUAGE sql IMMUTABLE
+AS $$
+  SELECT char_length($1.output);
+$$;
+
+-- One slice of an execution's output, for GET /executions/{id}/output:
+-- the API pages through the text instead of loading the whole column.
+-- substr() on a TOASTed value only fetches (and decompresses) up to the
+-- requested slice. SECURITY INVOKER, so the skill_executions RLS applies.
+-- p_offset is 0-based, in characters
+CREATE OR REPLACE FUNCTION execution_output_chunk(
+  p_execution_id UUID,
+  p_offset INTEGER,
+  p_length INTEGER
+)
+RETURNS TEXT
+LANGUAGE sql STABLE
+AS $$
+  SELECT substr(output, p_offset + 1, p_length)
+  FROM skill_executions
+  WHERE id = p_execution_id;
+$$;
@@ -0,0 +1,64 @@
+-- =============================================================================
+-- Migration: 010_usage_plan_limits
+-- Description: Record the org's plan limit on each usage_metrics row while its
+--              period is current, so the Stripe export prices overage with
+--              the plan that was in effect for the period, not the org's plan
+--              at export time.
+-- Sprint: Phase 2 — Billing
+-- Depends on: 007_usage_export
+-- =============================================================================
+
+-- plan_limit: included units of the org's plan, as of the last flush during
+--             the period. NULL for rows written before this migration.
+ALTER TABLE usage_metrics
+  ADD COLUMN IF NOT EXISTS plan_limit BIGINT;
+
+
+-- =============================================================================
+-- System: Apply a batch of counter deltas exactly once
+-- p_rows: [{"org_id", "category", "period", "delta", "plan_limit"}, ...],
+-- unique per key. A NULL plan_limit (late usage of a past period) keeps the
+-- limit already recorded for the row.
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION apply_usage_deltas(
+  p_batch_id UUID,
+  p_rows JSONB
+)
+RETURNS INTEGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_count INTEGER;
+BEGIN
+  INSERT INTO usage_flush_batches (batch_id) VALUES (p_batch_id)
+  ON CONFLICT (batch_id) DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN 0;
+  END IF;
+
+  -- Make sure every key has a row, then add the (possibly negative) deltas
+  INSERT INTO usage_metrics (org_id, category, period, used)
+  SELECT r.org_id, r.category, r.period, 0
+  FROM jsonb_to_recordset(p_rows) AS r(org_id UUID, category TEXT, period TEXT, delta BIGINT)
+  ON CONFLICT (org_id, category, period) DO NOTHING;
+
+  UPDATE usage_metrics m
+  SET used = GREATEST(m.used + r.delta, 0),
+      plan_limit = COALESCE(r.plan_limit, m.plan_limit),
+      updated_at = NOW()
+  FROM jsonb_to_recordset(p_rows) AS r(
+    org_id UUID, category TEXT, period TEXT, delta BIGINT, plan_limit BIGINT
+  )
+  WHERE m.org_id = r.org_id
+    AND m.category = r.category
+    AND m.period = r.period;
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+
+  -- Batch IDs only need to outlive worker retries
+  DELETE FROM usage_flush_batches WHERE applied_at < NOW() - INTERVAL '7 days';
+
+  RETURN v_count;
+END;
+$$;
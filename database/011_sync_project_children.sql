@@ -0,0 +1,40 @@
+-- =============================================================================
+-- Migration: 011_sync_project_children
+-- Description: Adding, removing or moving a project's repositories or members
+--              bumps projects.updated_at, so GET /projects/changes reports the
+--              project with its new project_repositories / project_members
+--              counts.
+-- Sprint: Phase 2 — Performance
+-- Depends on: 008_sync_tombstones
+-- =============================================================================
+
+-- update_project_repo_count() (001) already touches the project on repository
+-- inserts and deletes, but it runs as the caller: under RLS its UPDATE skips
+-- projects the caller may add repositories to but not edit. Members had no
+-- trigger at all. Only project_id changes move a count, so other updates of a
+-- child row leave the project alone.
+CREATE OR REPLACE FUNCTION touch_parent_project()
+RETURNS TRIGGER
+LANGUAGE plpgsql SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    UPDATE projects SET updated_at = NOW() WHERE id = NEW.project_id;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE projects SET updated_at = NOW() WHERE id = OLD.project_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS touch_project_on_repositories ON project_repositories;
+CREATE TRIGGER touch_project_on_repositories
+  AFTER INSERT OR DELETE OR UPDATE OF project_id ON project_repositories
+  FOR EACH ROW EXECUTE FUNCTION touch_parent_project();
+
+DROP TRIGGER IF EXISTS touch_project_on_members ON project_members;
+CREATE TRIGGER touch_project_on_members
+  AFTER INSERT OR DELETE OR UPDATE OF project_id ON project_members
+  FOR EACH ROW EXECUTE FUNCTION touch_parent_project();
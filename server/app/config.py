@@ -20,6 +20,8 @@ class Settings(BaseSettings):
 
     # --- Supabase Auth ---
     SUPABASE_JWT_SECRET: str = ""
+    # Verified token claims kept per process (LRU, entries expire at the token's exp)
+    AUTH_CLAIMS_CACHE_SIZE: int = 10_000
 
     # --- Keycloak (reserved for future use) ---
     KEYCLOAK_URL: str = "https://auth.kijko.nl"
@@ -30,10 +32,80 @@ class Settings(BaseSettings):
     # --- Stripe ---
     STRIPE_SECRET_KEY: str = "sk_test_placeholder"
     STRIPE_WEBHOOK_SECRET: str = "whsec_placeholder"
+    # Override the Stripe API URL (e.g. a local stand-in); empty = api.stripe.com
+    STRIPE_API_BASE: str = ""
 
     # --- Redis ---
     REDIS_URL: str = "redis://localhost:6379"
 
+    # --- WebSocket ---
+    # Max ingestion_progress events per second per project room (0 = no coalescing)
+    WS_PROGRESS_MAX_HZ: float = 4.0
+    # Forget a room's coalescing state after this many seconds without progress (0 = never)
+    WS_PROGRESS_IDLE_TIMEOUT: float = 600.0
+    # Server heartbeat: ping quiet sockets, evict if no reply within the timeout
+    WS_PING_INTERVAL: float = 25.0
+    WS_PONG_TIMEOUT: float = 10.0
+    # Force reconnect after this many seconds (0 = unlimited)
+    WS_MAX_CONNECTION_AGE: float = 4 * 3600
+
+    # --- Server-Sent Events (WebSocket fallback) ---
+    # Keepalive comment interval; keep below WS_PING_INTERVAL and proxy idle timeouts
+    SSE_KEEPALIVE_INTERVAL: float = 15.0
+    # Undelivered frames before a slow stream is cut off
+    SSE_MAX_QUEUE: int = 256
+    # Last-Event-ID replay buffer: events kept per room, rooms kept per process
+    SSE_REPLAY_EVENTS: int = 100
+    SSE_REPLAY_ROOMS: int = 1024
+    # Max rooms a single /events request may subscribe to
+    SSE_MAX_ROOMS: int = 20
+
+    # --- Rate limiting ---
+    # Max keys held by the in-memory limiter used when Redis is down (LRU eviction)
+    RATE_LIMIT_FALLBACK_MAX_KEYS: int = 10_000
+
+    # --- Usage quotas ---
+    # Share of an org's remaining allowance each process leases at once (0 = no leasing)
+    QUOTA_LEASE_FRACTION: float = 0.05
+    # Below this many units per lease, fall back to one Redis check per request
+    QUOTA_LEASE_MIN_BLOCK: int = 10
+    # Leases are committed (spent units) and dropped after this many seconds;
+    # a background sweep runs every QUOTA_LEASE_TTL / 2 seconds
+    QUOTA_LEASE_TTL: float = 60.0
+
+    # --- Entitlements cache (org plan + limits) ---
+    # Per-process LRU: seconds an entry is trusted, and max orgs held
+    ENTITLEMENTS_LOCAL_TTL: float = 30.0
+    ENTITLEMENTS_CACHE_SIZE: int = 10_000
+    # Shared Redis copy; webhooks invalidate both layers on plan changes
+    ENTITLEMENTS_REDIS_TTL: int = 300
+
+    # --- Usage ledger (Redis counters → usage_metrics) ---
+    # Seconds between flushes; bounds how much usage a Redis loss can cost
+    USAGE_LEDGER_FLUSH_INTERVAL: float = 60.0
+    # Rows per apply_usage_deltas() call
+    USAGE_LEDGER_BATCH_SIZE: int = 500
+
+    # --- Usage export (overage → Stripe meters) ---
+    # Seconds between exports of ledger overage to Stripe
+    USAGE_EXPORT_INTERVAL: float = 3600.0
+    # Max Stripe API calls in flight per export run
+    USAGE_EXPORT_CONCURRENCY: int = 8
+
+    # --- Response cache (GET /skills, /habits, /reflexes, /projects) ---
+    # Seconds a cached response is served without revalidation (0 = disabled)
+    RESPONSE_CACHE_TTL: int = 30
+    # Extra seconds an expired entry is served while reloaded in the background
+    RESPONSE_CACHE_STALE_TTL: int = 0
+
+    # --- Delta sync (GET /skills/changes etc.) ---
+    # Cursors step back this many seconds to cover in-flight transactions and clock skew
+    SYNC_CURSOR_OVERLAP: float = 5.0
+    # More changes (or deletes) than this since a cursor → client resyncs the full list instead
+    SYNC_MAX_CHANGES: int = 500
+    # Tombstones (deleted_records) are kept this long; older cursors get a full resync
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
     # --- CORS ---
     CORS_ORIGINS: list[str] = [
         "http://localhost:3000",
@@ -21,6 +21,7 @@ if settings.SENTRY_DSN:
     )
 from server.app.routers.auth import router as auth_router
 from server.app.routers.billing import router as billing_router
+from server.app.routers.events import router as events_router
 from server.app.routers.executions import router as executions_router
 from server.app.routers.gdpr import router as gdpr_router
 from server.app.routers.habits import router as habits_router
@@ -46,9 +47,44 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Warning: Supabase Auth init failed (will retry on first auth): {e}")
 
+    from server.app.services.websocket import manager as ws_manager
+    ws_manager.start_heartbeat()
+
+    # Commit spent units of leases that go quiet (see QuotaLeaser)
+    from server.app.services.usage import quota_leases
+    quota_leases.start_sweeper()
+
+    from server.app.services.entitlements import entitlements
+    entitlements.start_listener()
+
+    from server.app.services.supabase_auth import verified_claims
+    verified_claims.start_listener()
+
+    # Restore usage counters if Redis lost them (no-op otherwise)
+    try:
+        from server.app.dependencies import get_redis, get_supabase
+        from server.app.services.usage_ledger import rehydrate_usage_from_ledger
+        await rehydrate_usage_from_ledger(get_supabase(), await get_redis())
+    except Exception as e:
+        print(f"Warning: usage ledger rehydration skipped: {e}")
+
     yield
 
     # Shutdown
+    from server.app.services.websocket import progress_coalescer
+    await ws_manager.stop_heartbeat()
+    await progress_coalescer.flush()
+    await entitlements.stop_listener()
+    await verified_claims.stop_listener()
+
+    from server.app.services import supabase_auth
+    if supabase_auth._auth_service is not None:
+        await supabase_auth._auth_service.close()
+
+    # Hand unused quota leases back before the Redis pool goes away
+    await quota_leases.stop_sweeper()
+    await quota_leases.release_all()
+
     from server.app.dependencies import _redis_pool
     if _redis_pool is not None:
         await _redis_pool.close()
@@ -77,6 +113,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Cache"],
 )
 
 
@@ -111,6 +148,7 @@ app.include_router(webhooks_router, prefix=settings.API_PREFIX)
 app.include_router(gdpr_router, prefix=settings.API_PREFIX)
 app.include_router(admin_router, prefix=settings.API_PREFIX)
 app.include_router(ws_router)
+app.include_router(events_router)
 
 
 @app.get("/", tags=["system"])
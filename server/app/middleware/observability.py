@@ -3,70 +3,93 @@
 Adds X-Request-ID header to all responses for tracing.
 Logs request/response with timing information.
 Warns on slow requests (>1s).
+
+Implemented as plain ASGI middleware: the response is passed through
+untouched apart from the extra headers on ``http.response.start``, so
+streaming bodies are not buffered or re-chunked.
 """
 
 import logging
 import time
 import uuid
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 logger = logging.getLogger("kijko.http")
 
+# Paths not logged (health checks and docs) to reduce noise
+QUIET_PATHS = frozenset({"/health", "/", "/docs", "/openapi.json"})
+
 
-class ObservabilityMiddleware(BaseHTTPMiddleware):
+class ObservabilityMiddleware:
     """Middleware for request logging and tracing.
 
     Adds:
     - X-Request-ID header (generated if not provided)
-    - X-Process-Time header (request duration in ms)
+    - X-Process-Time header (time to response headers, in ms)
     - Structured logging for each request
     - Slow request warnings
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Generate or extract request ID
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4())[:8])
+        request_id = Headers(scope=scope).get("X-Request-ID") or str(uuid.uuid4())[:8]
+        method = scope["method"]
+        path = scope["path"]
 
         # Time the request
         start = time.monotonic()
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                duration_ms = int((time.monotonic() - start) * 1000)
+
+                # Add tracing headers
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                headers["X-Process-Time"] = f"{duration_ms}ms"
+
+                self._log(request_id, method, path, message["status"], duration_ms)
+            await send(message)
 
         # Process request
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except Exception as exc:
-            duration_ms = int((time.monotonic() - start) * 1000)
-            logger.error(
-                "request_id=%s method=%s path=%s status=500 duration_ms=%d error=%s",
-                request_id, request.method, request.url.path, duration_ms, str(exc),
-            )
+            if not response_started:
+                duration_ms = int((time.monotonic() - start) * 1000)
+                logger.error(
+                    "request_id=%s method=%s path=%s status=500 duration_ms=%d error=%s",
+                    request_id, method, path, duration_ms, str(exc),
+                )
             raise
 
-        duration_ms = int((time.monotonic() - start) * 1000)
-
-        # Add tracing headers
-        response.headers["X-Request-ID"] = request_id
-        response.headers["X-Process-Time"] = f"{duration_ms}ms"
-
+    @staticmethod
+    def _log(request_id: str, method: str, path: str, status_code: int, duration_ms: int) -> None:
         # Log request (skip health checks to reduce noise)
-        if request.url.path not in ("/health", "/", "/docs", "/openapi.json"):
-            log_level = logging.WARNING if duration_ms > 1000 else logging.INFO
-            logger.log(
-                log_level,
-                "request_id=%s method=%s path=%s status=%d duration_ms=%d",
-                request_id,
-                request.method,
-                request.url.path,
-                response.status_code,
-                duration_ms,
-            )
+        if path in QUIET_PATHS:
+            return
 
-            if duration_ms > 1000:
-                logger.warning(
-                    "SLOW REQUEST: %s %s took %dms (request_id=%s)",
-                    request.method, request.url.path, duration_ms, request_id,
-                )
+        log_level = logging.WARNING if duration_ms > 1000 else logging.INFO
+        logger.log(
+            log_level,
+            "request_id=%s method=%s path=%s status=%d duration_ms=%d",
+            request_id, method, path, status_code, duration_ms,
+        )
 
-        return response
+        if duration_ms > 1000:
+            logger.warning(
+                "SLOW REQUEST: %s %s took %dms (request_id=%s)",
+                method, path, duration_ms, request_id,
+            )
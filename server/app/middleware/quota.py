@@ -8,18 +8,23 @@ Returns 429 Too Many Requests when quota exceeded with:
   - X-RateLimit-Remaining header
   - X-RateLimit-Reset header (billing period end timestamp)
   - JSON body with detail, limit, and used counts
+
+The check and the increment are a single atomic Redis operation
+(reserve_quota). If the endpoint then fails, the reservation is refunded.
+Most requests are served from a per-process lease of the org's remaining
+allowance (QuotaLeaser) and never reach Redis.
 """
 
 from datetime import datetime, timezone
-from typing import Callable
+from typing import AsyncIterator, Callable
 
 from fastapi import Depends, HTTPException, Request, Response
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_supabase
 from server.app.middleware.auth import require_auth
-from server.app.models.enums import PlanTier
-from server.app.services.usage import check_quota, increment_usage
+from server.app.services.entitlements import get_entitlements
+from server.app.services.usage import QuotaReservation, quota_leases, release_quota
 
 
 def _get_period_end_timestamp() -> int:
@@ -44,38 +49,36 @@ def require_quota(category: str) -> Callable:
 
     Or in the handler:
         async def execute_skill(
-            _quota=Depends(require_quota("api_calls")),
+            reservation=Depends(require_quota("api_calls")),
             ...
         ):
+
+    The units are refunded automatically if the handler raises. Handlers
+    that hand work off (e.g. to Celery) can refund later failures with
+    ``release_quota(reservation)``.
     """
 
-    async def _check_and_increment(
+    async def _reserve(
         request: Request,
         response: Response,
         user: dict = Depends(require_auth),
         db: SupabaseClient = Depends(get_supabase),
-    ) -> None:
+    ) -> AsyncIterator[QuotaReservation]:
         org_id = user.get("org_id", "")
 
-        # Get org's plan from DB
-        result = (
-            db.table("organizations")
-            .select("plan")
-            .eq("id", org_id)
-            .single()
-            .execute()
-        )
-        plan = (result.data or {}).get("plan", PlanTier.FREE)
+        # Org's plan (cached; see services/entitlements.py)
+        plan = (await get_entitlements(org_id, db)).plan
 
-        # Check quota
-        within_limit, used, limit = await check_quota(org_id, category, plan)
+        # Check and take one unit — from the local lease, else atomically in Redis
+        reservation = await quota_leases.reserve(org_id, category, plan)
+        limit = reservation.limit
 
         # Set rate limit headers on ALL responses
         response.headers["X-RateLimit-Limit"] = str(limit)
-        response.headers["X-RateLimit-Remaining"] = str(max(0, limit - used - 1))
+        response.headers["X-RateLimit-Remaining"] = str(reservation.remaining)
         response.headers["X-RateLimit-Reset"] = str(_get_period_end_timestamp())
 
-        if not within_limit:
+        if not reservation.granted:
             raise HTTPException(
                 status_code=429,
                 detail=f"Quota exceeded for {category}",
@@ -89,7 +92,11 @@ def require_quota(category: str) -> Callable:
                 },
             )
 
-        # Increment usage counter
-        await increment_usage(org_id, category)
+        try:
+            yield reservation
+        except Exception:
+            # Downstream failure — don't bill the org for it
+            await release_quota(reservation)
+            raise
 
-    return _check_and_increment
+    return _reserve
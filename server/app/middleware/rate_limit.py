@@ -1,65 +1,468 @@
-"""Rate limiting middleware — protect auth endpoints from brute force.
+"""Rate limiting middleware — protect auth endpoints from brute force
+and keep one tenant from starving others on expensive endpoints.
 
-Uses Redis for distributed rate limiting with sliding window.
+Limits are declared in RATE_LIMIT_POLICIES (route template, methods,
+identity, per-plan limits) and compiled into a path-segment trie, so
+finding the policy for a request costs one walk over its path segments.
+
+Uses Redis for distributed rate limiting with GCRA (generic cell rate
+algorithm): one atomic Lua call per request, one integer per key, and
+rejected requests are not counted against the client.
 Configurable per-endpoint limits.
+
+Implemented as plain ASGI middleware: requests that are not rate limited
+pass straight through, and rejected requests get a 429 JSON response
+without reaching the app.
 """
 
+import hashlib
+import logging
+import math
 import time
-from typing import Callable
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple, Union
 
-from fastapi import HTTPException, Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from server.app.config import settings
+
+logger = logging.getLogger(__name__)
 
 # Rate limit configuration: path_prefix → (max_requests, window_seconds)
 RATE_LIMITS = {
     "/api/v1/auth/login": (5, 60),       # 5 attempts per minute
     "/api/v1/auth/signup": (10, 60),      # 10 signups per minute
     "/api/v1/auth/refresh": (10, 60),     # 10 refreshes per minute
+    "/api/v1/auth/logout": (10, 60),      # 10 logouts per minute
     "/api/v1/auth/oauth": (5, 60),        # 5 OAuth attempts per minute
     "/api/v1/webhooks/stripe": (100, 60), # 100 webhook calls per minute
 }
 
+# Per-plan limits for expensive tenant endpoints: plan → (max_requests, window_seconds)
+STATS_LIMITS = {
+    "free": (30, 60),
+    "pro": (120, 60),
+    "teams": (600, 60),
+    "enterprise": (3000, 60),
+}
+EXPORT_LIMITS = {
+    "free": (3, 3600),
+    "pro": (10, 3600),
+    "teams": (50, 3600),
+    "enterprise": (200, 3600),
+}
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Redis-backed rate limiting middleware.
 
-    Uses sliding window counter pattern.
-    Falls back to in-memory tracking if Redis unavailable.
+# =============================================================================
+# Policies
+# =============================================================================
+
+# Who a limit is counted against
+IDENTITY_IP = "ip"        # client IP (X-Forwarded-For / X-Real-IP aware)
+IDENTITY_USER = "user"    # JWT sub
+IDENTITY_ORG = "org"      # JWT org_id — one budget per tenant
+
+Limit = Union[tuple[int, int], dict[str, tuple[int, int]]]
+
+
+class RateLimitPolicy(NamedTuple):
+    """One declarative rate-limit rule.
+
+    ``route`` is a path template; ``{param}`` segments match any single
+    segment. With ``prefix=True`` the rule also covers every path below
+    the template. ``limit`` is (max_requests, window_seconds) or a dict of
+    those per plan tier. User/org identities fall back to the client IP
+    when the request carries no valid token.
+    """
+
+    route: str
+    methods: frozenset[str]
+    identity: str
+    limit: Limit
+    prefix: bool = False
+
+    @property
+    def tiered(self) -> bool:
+        return isinstance(self.limit, dict)
+
+    def limit_for(self, plan: str | None) -> tuple[int, int]:
+        if not self.tiered:
+            return self.limit
+        return self.limit.get(plan or "free", self.limit["free"])
+
+
+RATE_LIMIT_POLICIES: list[RateLimitPolicy] = [
+    # Brute-force protection on auth and webhooks (unauthenticated → per IP)
+    *(
+        RateLimitPolicy(path, frozenset({"POST"}), IDENTITY_IP, limit, prefix=True)
+        for path, limit in RATE_LIMITS.items()
+    ),
+    # Aggregation queries — per tenant, scaled by plan
+    RateLimitPolicy("/api/v1/executions/stats", frozenset({"GET"}), IDENTITY_ORG, STATS_LIMITS, prefix=True),
+    RateLimitPolicy("/api/v1/habits/stats", frozenset({"GET"}), IDENTITY_ORG, STATS_LIMITS),
+    RateLimitPolicy("/api/v1/reflexes/stats", frozenset({"GET"}), IDENTITY_ORG, STATS_LIMITS),
+    # Full data exports — per tenant, hourly
+    RateLimitPolicy("/api/v1/gdpr/export", frozenset({"POST"}), IDENTITY_ORG, EXPORT_LIMITS),
+]
+
+
+class _TrieNode:
+    __slots__ = ("children", "param", "exact", "below")
+
+    def __init__(self) -> None:
+        self.children: dict[str, "_TrieNode"] = {}
+        self.param: "_TrieNode | None" = None
+        # Policies ending exactly here / covering this node and everything below
+        self.exact: list[RateLimitPolicy] = []
+        self.below: list[RateLimitPolicy] = []
+
+
+class PolicyMatcher:
+    """Path-segment trie over RateLimitPolicy route templates.
+
+    Literal segments win over ``{param}`` segments and the deepest
+    (most specific) match wins; at most one policy applies per request.
+    """
+
+    def __init__(self, policies: list[RateLimitPolicy]) -> None:
+        self._root = _TrieNode()
+        for policy in policies:
+            node = self._root
+            for segment in _segments(policy.route):
+                if segment.startswith("{") and segment.endswith("}"):
+                    node.param = node.param or _TrieNode()
+                    node = node.param
+                else:
+                    node = node.children.setdefault(segment, _TrieNode())
+            (node.below if policy.prefix else node.exact).append(policy)
+
+    def match(self, method: str, path: str) -> RateLimitPolicy | None:
+        return self._walk(self._root, _segments(path), 0, method)
+
+    def _walk(self, node: _TrieNode, segments: list[str], i: int, method: str) -> RateLimitPolicy | None:
+        if i == len(segments):
+            found = _for_method(node.exact, method) or _for_method(node.below, method)
+            return found
+
+        for child in (node.children.get(segments[i]), node.param):
+            if child is not None:
+                found = self._walk(child, segments, i + 1, method)
+                if found is not None:
+                    return found
+        return _for_method(node.below, method)
+
+
+def _segments(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _for_method(policies: list[RateLimitPolicy], method: str) -> RateLimitPolicy | None:
+    for policy in policies:
+        if method in policy.methods:
+            return policy
+    return None
+
+
+async def _get_org_plan(org_id: str) -> str:
+    """Plan tier of an org, from the shared entitlements cache (free on error)."""
+    from server.app.services.entitlements import get_entitlements
+
+    return (await get_entitlements(org_id)).plan
+
+
+# GCRA: the key holds the "theoretical arrival time" (TAT) in microseconds.
+# Each request advances TAT by one emission interval (window / limit); a
+# request is allowed while TAT stays within one window of now. Denied
+# requests leave the key untouched. Uses the Redis clock so all workers agree.
+#
+# KEYS[1] = bucket key
+# ARGV[1] = max_requests, ARGV[2] = window in microseconds
+# Returns {allowed (0/1), remaining, retry_after_us, reset_after_us}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local interval = window / limit
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + interval
+local allow_at = new_tat - window
+if now < allow_at then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+local reset_after = new_tat - now
+redis.call('SET', KEYS[1], string.format('%.0f', new_tat), 'PX', math.ceil(reset_after / 1000))
+return {1, math.floor((now - allow_at) / interval), 0, math.ceil(reset_after)}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of one rate-limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the next request would be allowed (0 if allowed now)
+    retry_after: float
+    # Seconds until the bucket is completely full again
+    reset_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+# =============================================================================
+# In-memory fallback
+# =============================================================================
+
+# Keys longer than this (e.g. forged X-Forwarded-For) are hashed
+_MAX_KEY_LENGTH = 128
+
+# Every live fallback store, for fallback_stats()
+_fallback_stores: "weakref.WeakSet[SlidingWindowStore]" = weakref.WeakSet()
+
+
+class _Window:
+    """Sliding-window counter state for one key (fixed size)."""
+
+    __slots__ = ("start", "current", "previous")
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.current = 0
+        self.previous = 0
+
+
+class SlidingWindowStore:
+    """Fixed-capacity LRU of sliding-window counters.
+
+    Each key keeps two counters (this window and the previous one); the
+    request count over the trailing window is estimated by weighting the
+    previous counter by how much of it still overlaps. Updates are O(1),
+    denied requests are not counted, and once ``max_keys`` is reached the
+    least recently used key is evicted, so memory has a hard ceiling no
+    matter how many client IPs an attacker rotates through.
     """
 
-    def __init__(self, app):
-        super().__init__(app)
-        self._memory_store: dict[str, list[float]] = {}
-
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Check if this path has rate limits
-        for path_prefix, (max_requests, window_seconds) in RATE_LIMITS.items():
-            if request.url.path.startswith(path_prefix) and request.method == "POST":
-                client_ip = self._get_client_ip(request)
-                key = f"rate:{path_prefix}:{client_ip}"
-
-                allowed = await self._check_rate_limit(
-                    key, max_requests, window_seconds,
-                )
-
-                if not allowed:
-                    raise HTTPException(
-                        status_code=429,
-                        detail="Too many requests. Please try again later.",
-                        headers={
-                            "Retry-After": str(window_seconds),
-                            "X-RateLimit-Limit": str(max_requests),
-                            "X-RateLimit-Remaining": "0",
-                        },
+    def __init__(self, max_keys: int | None = None) -> None:
+        self.max_keys = settings.RATE_LIMIT_FALLBACK_MAX_KEYS if max_keys is None else max_keys
+        self._windows: OrderedDict[str, _Window] = OrderedDict()
+        self.evictions = 0
+        self.rejections = 0
+        _fallback_stores.add(self)
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def __contains__(self, key: str) -> bool:
+        return self._key(key) in self._windows
+
+    @staticmethod
+    def _key(key: str) -> str:
+        if len(key) <= _MAX_KEY_LENGTH:
+            return key
+        return "h:" + hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+    def hit(self, key: str, max_requests: int, window_seconds: int, now: float | None = None) -> RateLimitResult:
+        """Count one request for ``key`` if it fits the limit."""
+        now = time.time() if now is None else now
+        key = self._key(key)
+
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(now - now % window_seconds)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+                self.evictions += 1
+                if self.evictions == 1 or self.evictions % 10_000 == 0:
+                    logger.warning(
+                        "Rate limit fallback at capacity (%d keys), evictions=%d",
+                        self.max_keys, self.evictions,
                     )
-                break
+        else:
+            self._windows.move_to_end(key)
+
+        # Roll the window forward
+        elapsed = now - window.start
+        if elapsed >= window_seconds:
+            periods = int(elapsed // window_seconds)
+            window.previous = window.current if periods == 1 else 0
+            window.current = 0
+            window.start += periods * window_seconds
+            elapsed = now - window.start
+
+        weight = 1 - elapsed / window_seconds
+        estimate = window.previous * weight + window.current
+
+        if estimate + 1 > max_requests:
+            self.rejections += 1
+            return RateLimitResult(
+                allowed=False,
+                limit=max_requests,
+                remaining=0,
+                retry_after=self._retry_after(window, max_requests, window_seconds, now),
+                reset_after=self._reset_after(window, window_seconds, now),
+            )
+
+        window.current += 1
+        return RateLimitResult(
+            allowed=True,
+            limit=max_requests,
+            remaining=max(0, math.floor(max_requests - estimate - 1)),
+            retry_after=0.0,
+            reset_after=self._reset_after(window, window_seconds, now),
+        )
+
+    @staticmethod
+    def _retry_after(window: _Window, max_requests: int, window_seconds: int, now: float) -> float:
+        """Seconds until the estimate leaves room for one more request."""
+        room = max_requests - 1
+        if window.current > room:
+            # Wait for the next window, then for the carried-over weight to decay
+            next_start = window.start + window_seconds
+            fraction = max(0.0, 1 - room / window.current) if window.current else 0.0
+            return next_start + fraction * window_seconds - now
+        fraction = 1 - (room - window.current) / window.previous
+        return max(0.0, window.start + fraction * window_seconds - now)
+
+    @staticmethod
+    def _reset_after(window: _Window, window_seconds: int, now: float) -> float:
+        """Seconds until both counters have fully aged out."""
+        if window.current:
+            return window.start + 2 * window_seconds - now
+        if window.previous:
+            return window.start + window_seconds - now
+        return 0.0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "keys": len(self._windows),
+            "max_keys": self.max_keys,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+        }
+
+
+def fallback_stats() -> dict[str, int]:
+    """Aggregate counters of the in-memory fallback across middleware instances."""
+    totals = {"keys": 0, "max_keys": 0, "evictions": 0, "rejections": 0}
+    for store in list(_fallback_stores):
+        for name, value in store.stats().items():
+            totals[name] += value
+    return totals
+
+
+class RateLimitMiddleware:
+    """Redis-backed rate limiting middleware.
+
+    Uses GCRA via a server-side Lua script (see GCRA_SCRIPT).
+    Falls back to a bounded in-memory SlidingWindowStore if Redis
+    is unavailable (per process, so limits are per worker then).
+
+    Rate-limited responses carry X-RateLimit-Limit/Remaining/Reset;
+    429s add Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp, policies: list[RateLimitPolicy] | None = None):
+        self.app = app
+        self._matcher = PolicyMatcher(RATE_LIMIT_POLICIES if policies is None else policies)
+        self._memory_store = SlidingWindowStore()
+        self._gcra = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Check if this route has a rate limit
+        policy = self._matcher.match(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        identity, plan = await self._resolve_identity(policy, request)
+        max_requests, window_seconds = policy.limit_for(plan)
+        key = f"rate:{policy.route}:{identity}"
+
+        result = await self._check_rate_limit(key, max_requests, window_seconds)
+
+        if not result.allowed:
+            response = JSONResponse(
+                {"detail": "Too many requests. Please try again later."},
+                status_code=429,
+                headers=result.headers(),
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, self._with_headers(send, result))
+
+    async def _resolve_identity(
+        self, policy: RateLimitPolicy, request: Request,
+    ) -> tuple[str, str | None]:
+        """Return (identity key part, plan tier) for a request under ``policy``.
+
+        IP identities keep the historical key shape (rate:<route>:<ip>).
+        """
+        if policy.identity == IDENTITY_IP:
+            return self._get_client_ip(request), None
+
+        claims = self._get_claims(request) or {}
+        subject = claims.get("sub") if policy.identity == IDENTITY_USER else claims.get("org_id")
+        if subject:
+            org_id = claims.get("org_id")
+            plan = await _get_org_plan(org_id) if policy.tiered and org_id else None
+            return f"{policy.identity}:{subject}", plan
+
+        # No usable token — the route will 401, but still bound the attempts
+        return f"ip:{self._get_client_ip(request)}", None
 
-        return await call_next(request)
+    @staticmethod
+    def _get_claims(request: Request) -> dict | None:
+        """Validated JWT claims from the Authorization header, if any."""
+        auth_header = request.headers.get("authorization", "")
+        scheme, _, token = auth_header.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            from server.app.services.supabase_auth import get_supabase_auth
+            return get_supabase_auth().validate_token(token)
+        except Exception:
+            return None
+
+    @staticmethod
+    def _with_headers(send: Send, result: RateLimitResult) -> Send:
+        """Wrap ``send`` to add the rate-limit headers to the response."""
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in result.headers().items():
+                    headers[name] = value
+            await send(message)
+
+        return send_wrapper
 
     async def _check_rate_limit(
         self, key: str, max_requests: int, window_seconds: int,
-    ) -> bool:
+    ) -> RateLimitResult:
         """Check if request is within rate limit.
 
         Tries Redis first, falls back to in-memory.
@@ -67,49 +470,41 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         try:
             return await self._check_redis(key, max_requests, window_seconds)
         except Exception:
-            return self._check_memory(key, max_requests, window_seconds)
+            return self._memory_result(key, max_requests, window_seconds)
 
     async def _check_redis(
         self, key: str, max_requests: int, window_seconds: int,
-    ) -> bool:
-        """Redis-backed sliding window rate limit."""
+    ) -> RateLimitResult:
+        """Redis-backed GCRA rate limit — a single EVALSHA round-trip."""
         from server.app.dependencies import get_redis
 
         redis = await get_redis()
-        now = time.time()
+        if self._gcra is None:
+            # Script object: EVALSHA, re-sending the source only on NOSCRIPT
+            self._gcra = redis.register_script(GCRA_SCRIPT)
 
-        # Use sorted set for sliding window
-        pipeline = redis.pipeline()
-        pipeline.zremrangebyscore(key, 0, now - window_seconds)
-        pipeline.zadd(key, {str(now): now})
-        pipeline.zcard(key)
-        pipeline.expire(key, window_seconds + 1)
-        results = await pipeline.execute()
+        allowed, remaining, retry_after_us, reset_after_us = await self._gcra(
+            keys=[key], args=[max_requests, window_seconds * 1_000_000], client=redis,
+        )
+        return RateLimitResult(
+            allowed=bool(int(allowed)),
+            limit=max_requests,
+            remaining=int(remaining),
+            retry_after=int(retry_after_us) / 1_000_000,
+            reset_after=int(reset_after_us) / 1_000_000,
+        )
 
-        current_count = results[2]
-        return current_count <= max_requests
+    def _memory_result(
+        self, key: str, max_requests: int, window_seconds: int,
+    ) -> RateLimitResult:
+        """In-memory fallback with the same result shape as Redis."""
+        return self._memory_store.hit(key, max_requests, window_seconds)
 
     def _check_memory(
         self, key: str, max_requests: int, window_seconds: int,
     ) -> bool:
         """In-memory fallback rate limit (single process only)."""
-        now = time.time()
-        cutoff = now - window_seconds
-
-        if key not in self._memory_store:
-            self._memory_store[key] = []
-
-        # Clean old entries
-        self._memory_store[key] = [
-            ts for ts in self._memory_store[key] if ts > cutoff
-        ]
-
-        # Check limit
-        if len(self._memory_store[key]) >= max_requests:
-            return False
-
-        self._memory_store[key].append(now)
-        return True
+        return self._memory_result(key, max_requests, window_seconds).allowed
 
     @staticmethod
     def _get_client_ip(request: Request) -> str:
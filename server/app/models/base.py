@@ -36,6 +36,20 @@ class PaginatedResponse(BaseModel, Generic[T]):
     has_more: bool
 
 
+class SyncResponse(BaseModel, Generic[T]):
+    """Changes since a sync cursor.
+
+    Apply ``changes`` (upserts) before ``deleted``. With ``reset`` set, the
+    cursor is too old or too far behind: refetch the full list, then sync
+    from the returned cursor.
+    """
+
+    changes: list[T]
+    deleted: list[UUID]
+    cursor: datetime
+    reset: bool = False
+
+
 class MessageResponse(BaseModel):
     """Simple message response."""
 
@@ -30,6 +30,33 @@ class SkillExecutionResponse(BaseSchema):
     completed_at: datetime | None
 
 
+class SkillExecutionSummary(BaseSchema):
+    """Execution row in list responses — no input, output truncated to a preview.
+
+    output_preview and output_length are PostgREST computed fields
+    (database/009_execution_previews.sql); the full output is served by
+    GET /executions/{id} and GET /executions/{id}/output.
+    """
+
+    id: UUID
+    skill_id: UUID | None
+    user_id: UUID
+    execution_type: ExecutionType
+    reference_id: UUID | None
+    tokens_used: int | None
+    prompt_tokens: int | None
+    completion_tokens: int | None
+    duration_ms: int | None
+    cost_cents: int | None
+    status: ExecutionStatus
+    error_message: str | None
+    error_code: str | None
+    executed_at: datetime
+    completed_at: datetime | None
+    output_preview: str | None
+    output_length: int | None
+
+
 class ExecutionListFilter(BaseSchema):
     """Filters for listing executions."""
 
@@ -1,11 +1,16 @@
 """Admin router — management and maintenance endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_supabase
 from server.app.middleware.auth import require_auth, require_role
+from server.app.models.enums import PlanTier
 from server.app.services.log_retention import cleanup_expired_logs
+from server.app.services.usage import get_usage_for_orgs
+
+# Max orgs per /admin/usage request
+MAX_USAGE_ORGS = 500
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -21,3 +26,30 @@ async def run_log_cleanup(
     Use dry_run=true (default) to preview what would be deleted.
     """
     return await cleanup_expired_logs(db, dry_run=dry_run)
+
+
+@router.get("/usage", dependencies=[Depends(require_role(["admin"]))])
+async def get_orgs_usage(
+    org_id: list[str] = Query(..., description="Organization IDs (repeat the parameter)"),
+    db: SupabaseClient = Depends(get_supabase),
+):
+    """Current-period usage for several organizations (admin only).
+
+    Plans are read in one query and all counters in one Redis round-trip.
+    """
+    org_ids = list(dict.fromkeys(org_id))
+    if len(org_ids) > MAX_USAGE_ORGS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_USAGE_ORGS} organizations per request")
+
+    result = db.table("organizations").select("id, plan").in_("id", org_ids).execute()
+    plans = {row["id"]: row.get("plan") or PlanTier.FREE for row in result.data or []}
+    org_plans = {oid: plans[oid] for oid in org_ids if oid in plans}
+
+    usage = await get_usage_for_orgs(org_plans)
+    return {
+        "organizations": [
+            {"org_id": oid, "plan": plan, "metrics": usage[oid]}
+            for oid, plan in org_plans.items()
+        ],
+        "not_found": [oid for oid in org_ids if oid not in plans],
+    }
@@ -4,9 +4,10 @@ Uses Supabase Auth (GoTrue) for all user operations.
 All endpoints are public (no auth required) except GET /me.
 """
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Response, Security, status
+from fastapi.security import HTTPAuthorizationCredentials
 
-from server.app.middleware.auth import get_current_user
+from server.app.middleware.auth import get_current_user, optional_security
 from server.app.models.auth import (
     LoginRequest,
     RefreshRequest,
@@ -86,14 +87,20 @@ async def refresh(
     "/logout",
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Logout (invalidate session)",
-    description="Signs out the user from Supabase Auth.",
+    description=(
+        "Signs out the user from Supabase Auth. If a Bearer access token is "
+        "sent, it is also rejected from now on until it expires."
+    ),
 )
 async def logout(
     body: RefreshRequest,
+    credentials: HTTPAuthorizationCredentials | None = Security(optional_security),
     auth: SupabaseAuthService = Depends(get_supabase_auth),
 ) -> Response:
     """Invalidate session."""
     await auth.logout(body.refresh_token)
+    if credentials is not None:
+        await auth.revoke_token(credentials.credentials)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -58,6 +58,7 @@ async def create_checkout(
             billing_interval=body.billing_interval,
             success_url=body.success_url,
             cancel_url=body.cancel_url,
+            org_id=user["org_id"],
         )
 
         return CheckoutSessionResponse(
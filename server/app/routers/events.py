@@ -0,0 +1,107 @@
+"""Events router — Server-Sent Events fallback for the WebSocket rooms."""
+
+import logging
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Security, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from server.app.config import settings
+from server.app.middleware.auth import optional_security
+from server.app.routers.ws import _validate_room_access
+from server.app.services.supabase_auth import SupabaseAuthService, get_supabase_auth
+from server.app.services.websocket import (
+    PROTOCOL_SSE,
+    SSEConnection,
+    encode_frame,
+    format_sse,
+    manager,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["websocket"])
+
+
+@router.get("/events")
+async def event_stream(
+    rooms: str = Query(default="", description="Comma-separated rooms, e.g. project:uuid"),
+    token: str = Query(default=""),
+    last_event_id_param: str | None = Query(default=None, alias="last_event_id"),
+    last_event_id: str | None = Header(default=None),
+    credentials: HTTPAuthorizationCredentials | None = Security(optional_security),
+    auth: SupabaseAuthService = Depends(get_supabase_auth),
+):
+    """Stream room events as Server-Sent Events.
+
+    For clients whose proxies break WebSockets. Delivers the same events
+    as /ws for the user and org rooms plus any rooms listed in ``rooms``.
+
+    Connect: GET /events?rooms=project:uuid&token=<jwt>
+    (EventSource cannot set headers, so the token may be passed as a
+    query parameter; an Authorization: Bearer header also works.)
+
+    Resume: browsers resend the last ``id:`` as Last-Event-ID when they
+    reconnect; ``?last_event_id=`` does the same for manual reconnects.
+    Missed events still in the replay buffer are sent first. If some
+    were lost, a {"type": "resync"} event tells the client to refetch over REST.
+
+    Idle streams get a ``: keepalive`` comment every SSE_KEEPALIVE_INTERVAL.
+    """
+    raw_token = credentials.credentials if credentials is not None else token
+    if not raw_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_claims = auth.validate_token(raw_token)
+
+    requested = [r.strip() for r in rooms.split(",") if r.strip()]
+    if len(requested) > settings.SSE_MAX_ROOMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SSE_MAX_ROOMS} rooms per stream",
+        )
+    denied = [r for r in requested if not _validate_room_access(r, user_claims)]
+    if denied:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Cannot join room: {denied[0]}",
+        )
+
+    conn = SSEConnection()
+    await manager.connect(conn, user_claims, subprotocol=PROTOCOL_SSE)
+    for room in requested:
+        manager.join_room(conn, room)
+
+    # Snapshot the backlog in the same tick as the joins so nothing slips between
+    resume_from = last_event_id_param or last_event_id
+    backlog, complete = (
+        manager.replay(manager.rooms_of(conn), resume_from) if resume_from else ([], True)
+    )
+
+    async def body():
+        try:
+            yield "retry: 3000\n\n"
+            if not complete:
+                yield format_sse(encode_frame({"type": "resync"}, None))
+            for event_id, data in backlog:
+                yield format_sse(encode_frame(data, None), event_id)
+            async for chunk in conn.stream(settings.SSE_KEEPALIVE_INTERVAL):
+                yield chunk
+                # A successful write is the SSE equivalent of a pong
+                manager.touch(conn)
+        finally:
+            manager.disconnect(conn)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            # Disable response buffering in nginx
+            "X-Accel-Buffering": "no",
+        },
+    )
@@ -2,7 +2,8 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_user_db
@@ -15,12 +16,17 @@ from server.app.models.execution import (
     SkillExecutionResponse,
 )
 from server.app.services import executions as execution_service
+from server.app.services.response_cache import conditional_response, etag_matches, make_etag
 
 router = APIRouter(prefix="/executions", tags=["executions"])
 
+# Characters fetched from the database per chunk of GET /executions/{id}/output
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
 
 @router.get("", response_model=PaginatedResponse)
 async def list_executions(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     skill_id: str | None = None,
@@ -28,53 +34,64 @@ async def list_executions(
     execution_type: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List skill executions with optional filters."""
-    return await execution_service.list_executions(
+    columns = execution_service.LIST_FIELDS.parse(fields)
+    result = await execution_service.list_executions(
         db, page=page, page_size=page_size,
         skill_id=skill_id, status=status,
         execution_type=execution_type,
         date_from=date_from, date_to=date_to,
+        fields=columns,
     )
+    return conditional_response(request, execution_service.LIST_FIELDS.response_model(columns), result)
 
 
 @router.get("/stats", response_model=ExecutionStats)
 async def get_execution_stats(
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get aggregated execution statistics for the last N days."""
-    return await execution_service.get_execution_stats(db, days=days)
+    result = await execution_service.get_execution_stats(db, days=days)
+    return conditional_response(request, ExecutionStats, result)
 
 
 @router.get("/stats/by-skill", response_model=list[ExecutionStatsBySkill])
 async def get_stats_by_skill(
+    request: Request,
     limit: int = Query(20, ge=1, le=100),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get execution statistics grouped by skill."""
-    return await execution_service.get_stats_by_skill(db, limit=limit)
+    result = await execution_service.get_stats_by_skill(db, limit=limit)
+    return conditional_response(request, list[ExecutionStatsBySkill], result)
 
 
 @router.get("/stats/by-period", response_model=list[ExecutionStatsByPeriod])
 async def get_stats_by_period(
+    request: Request,
     days: int = Query(30, ge=1, le=365),
     granularity: str = Query("day", pattern="^(day|week|month)$"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get execution statistics grouped by time period."""
-    return await execution_service.get_stats_by_period(
+    result = await execution_service.get_stats_by_period(
         db, days=days, granularity=granularity,
     )
+    return conditional_response(request, list[ExecutionStatsByPeriod], result)
 
 
 @router.get("/{execution_id}", response_model=SkillExecutionResponse)
 async def get_execution(
+    request: Request,
     execution_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
@@ -83,4 +100,50 @@ async def get_execution(
     result = await execution_service.get_execution(db, execution_id)
     if not result:
         raise HTTPException(status_code=404, detail="Execution not found")
-    return result
+    return conditional_response(request, SkillExecutionResponse, result)
+
+
+@router.get(
+    "/{execution_id}/output",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/plain": {}}}},
+)
+async def get_execution_output(
+    request: Request,
+    execution_id: UUID,
+    user: dict = Depends(require_auth),
+    db: SupabaseClient = Depends(get_user_db),
+):
+    """Stream the full output of an execution as plain text.
+
+    The output is paged out of the database OUTPUT_CHUNK_SIZE characters
+    at a time (execution_output_chunk), so neither the API nor the client
+    waits for, or holds, the whole text; list responses only carry
+    output_preview.
+    """
+    info = await execution_service.get_execution_output_info(db, execution_id)
+    if not info:
+        raise HTTPException(status_code=404, detail="Execution not found")
+
+    # Output is written once, on completion: that and its length identify it
+    etag = make_etag(f"{execution_id}:{info.get('completed_at')}:{info.get('output_length')}".encode())
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    async def chunks():
+        offset = 0
+        while True:
+            text = await execution_service.get_execution_output_chunk(
+                db, execution_id, offset, OUTPUT_CHUNK_SIZE,
+            )
+            if text:
+                yield text.encode()
+            if len(text) < OUTPUT_CHUNK_SIZE:
+                return
+            offset += OUTPUT_CHUNK_SIZE
+
+    return StreamingResponse(
+        chunks(),
+        media_type="text/plain; charset=utf-8",
+        headers={"ETag": etag},
+    )
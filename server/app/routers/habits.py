@@ -1,13 +1,14 @@
 """Habits router — CRUD, toggle, stats, cron validation."""
 
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_user_db
 from server.app.middleware.auth import require_auth
-from server.app.models.base import MessageResponse, PaginatedResponse
+from server.app.models.base import MessageResponse, PaginatedResponse, SyncResponse
 from server.app.models.habit import (
     CronValidationRequest,
     CronValidationResponse,
@@ -18,26 +19,47 @@ from server.app.models.habit import (
     HabitWithSkill,
 )
 from server.app.services import habits as habit_service
+from server.app.services.response_cache import entity_tags, list_tag, response_cache
 
 router = APIRouter(prefix="/habits", tags=["habits"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_habits(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     skill_id: str | None = None,
     is_active: bool | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List habits for the current user."""
-    return await habit_service.list_habits(
-        db, page=page, page_size=page_size,
-        skill_id=skill_id, is_active=is_active,
+    columns = habit_service.LIST_FIELDS.parse(fields)
+    return await response_cache.serve(
+        request,
+        lambda: habit_service.list_habits(
+            db, page=page, page_size=page_size,
+            skill_id=skill_id, is_active=is_active, fields=columns,
+        ),
+        habit_service.LIST_FIELDS.response_model(columns),
+        scope=f"user:{user['sub']}",
+        tags=[list_tag("habit", user["sub"])],
+        row_tags=lambda result: entity_tags("habit", result["data"]),
     )
 
 
+@router.get("/changes", response_model=SyncResponse)
+async def list_habit_changes(
+    since: datetime | None = Query(None, description="Cursor returned by the previous sync"),
+    user: dict = Depends(require_auth),
+    db: SupabaseClient = Depends(get_user_db),
+):
+    """Habits changed or deleted since a sync cursor."""
+    return await habit_service.list_habit_changes(db, since)
+
+
 @router.post("", response_model=HabitResponse, status_code=status.HTTP_201_CREATED)
 async def create_habit(
     body: HabitCreate,
@@ -50,22 +72,33 @@ async def create_habit(
 
 @router.get("/stats", response_model=HabitStats)
 async def get_global_stats(
+    request: Request,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get global habit statistics for the current user."""
-    result = await habit_service.list_habits(db, page=1, page_size=1000, is_active=None)
-    habits = result.get("data", [])
-    active = [h for h in habits if h.get("is_active")]
-    failed = [h for h in habits if h.get("consecutive_failures", 0) > 0]
-    total_runs = sum(h.get("run_count", 0) for h in habits)
-    return {
-        "total_habits": len(habits),
-        "active_habits": len(active),
-        "total_runs": total_runs,
-        "failed_habits": len(failed),
-        "success_rate": round(1 - (len(failed) / max(len(habits), 1)), 2),
-    }
+    async def load():
+        result = await habit_service.list_habits(
+            db, page=1, page_size=1000, is_active=None,
+            fields=("is_active", "consecutive_failures", "run_count"),
+        )
+        habits = result.get("data", [])
+        active = [h for h in habits if h.get("is_active")]
+        failed = [h for h in habits if h.get("consecutive_failures", 0) > 0]
+        total_runs = sum(h.get("run_count", 0) for h in habits)
+        return {
+            "total_habits": len(habits),
+            "active_habits": len(active),
+            "total_runs": total_runs,
+            "failed_habits": len(failed),
+            "success_rate": round(1 - (len(failed) / max(len(habits), 1)), 2),
+        }
+
+    return await response_cache.serve(
+        request, load, HabitStats,
+        scope=f"user:{user['sub']}",
+        tags=[list_tag("habit", user["sub"])],
+    )
 
 
 @router.post("/validate-cron", response_model=CronValidationResponse)
@@ -80,13 +113,21 @@ async def validate_cron(
 
 @router.get("/{habit_id}", response_model=HabitWithSkill)
 async def get_habit(
+    request: Request,
     habit_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get a habit with related skill info."""
-    result = await habit_service.get_habit(db, habit_id)
-    if not result:
+    result = await response_cache.serve(
+        request,
+        lambda: habit_service.get_habit(db, habit_id),
+        HabitWithSkill,
+        scope=f"user:{user['sub']}",
+        tags=[f"habit:{habit_id}"],
+        row_tags=lambda habit: entity_tags("habit", habit),
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Habit not found")
     return result
 
@@ -1,13 +1,14 @@
 """Projects router — CRUD endpoints for projects, repositories, members."""
 
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_user_db
 from server.app.middleware.auth import require_auth
-from server.app.models.base import MessageResponse, PaginatedResponse
+from server.app.models.base import MessageResponse, PaginatedResponse, SyncResponse
 from server.app.models.project import (
     BulkInviteRequest,
     MemberCreate,
@@ -25,6 +26,7 @@ from server.app.models.project import (
     ProjectFileResponse,
 )
 from server.app.services import projects as project_service
+from server.app.services.response_cache import conditional_response, entity_tags, list_tag, response_cache
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -35,21 +37,42 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 
 @router.get("", response_model=PaginatedResponse)
 async def list_projects(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status_filter: str | None = Query(None, alias="status"),
     type_filter: str | None = Query(None, alias="type"),
     search: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List projects for the current organization."""
-    return await project_service.list_projects(
-        db, page=page, page_size=page_size,
-        status=status_filter, project_type=type_filter, search=search,
+    columns = project_service.LIST_FIELDS.parse(fields)
+    return await response_cache.serve(
+        request,
+        lambda: project_service.list_projects(
+            db, page=page, page_size=page_size,
+            status=status_filter, project_type=type_filter, search=search,
+            fields=columns,
+        ),
+        project_service.LIST_FIELDS.response_model(columns),
+        scope=f"org:{user['org_id']}",
+        tags=[list_tag("project", user["org_id"])],
+        row_tags=lambda result: entity_tags("project", result["data"]),
     )
 
 
+@router.get("/changes", response_model=SyncResponse)
+async def list_project_changes(
+    since: datetime | None = Query(None, description="Cursor returned by the previous sync"),
+    user: dict = Depends(require_auth),
+    db: SupabaseClient = Depends(get_user_db),
+):
+    """Projects changed or deleted since a sync cursor."""
+    return await project_service.list_project_changes(db, since)
+
+
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     body: ProjectCreate,
@@ -64,21 +87,32 @@ async def create_project(
 
 @router.get("/{project_id}", response_model=ProjectWithRelations)
 async def get_project(
+    request: Request,
     project_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get a project with all related data."""
-    result = await project_service.get_project_with_relations(db, project_id)
-    if not result:
+    async def load():
+        result = await project_service.get_project_with_relations(db, project_id)
+        if not result:
+            return None
+        # Normalize nested relations: PostgREST returns [] for empty one-to-many
+        if isinstance(result.get("ingestion_progress"), list):
+            result["ingestion_progress"] = result["ingestion_progress"][0] if result["ingestion_progress"] else None
+        if "project_repositories" in result and "repositories" not in result:
+            result["repositories"] = result.pop("project_repositories", [])
+        if "project_members" in result and "members" not in result:
+            result["members"] = result.pop("project_members", [])
+        return result
+
+    result = await response_cache.serve(
+        request, load, ProjectWithRelations,
+        scope=f"org:{user['org_id']}",
+        tags=[f"project:{project_id}"],
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    # Normalize nested relations: PostgREST returns [] for empty one-to-many
-    if isinstance(result.get("ingestion_progress"), list):
-        result["ingestion_progress"] = result["ingestion_progress"][0] if result["ingestion_progress"] else None
-    if "project_repositories" in result and "repositories" not in result:
-        result["repositories"] = result.pop("project_repositories", [])
-    if "project_members" in result and "members" not in result:
-        result["members"] = result.pop("project_members", [])
     return result
 
 
@@ -138,12 +172,14 @@ async def validate_repository(
 
 @router.get("/{project_id}/repositories", response_model=list[RepositoryResponse])
 async def list_repositories(
+    request: Request,
     project_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List repositories for a project."""
-    return await project_service.list_repositories(db, project_id)
+    result = await project_service.list_repositories(db, project_id)
+    return conditional_response(request, list[RepositoryResponse], result)
 
 
 @router.post(
@@ -183,12 +219,14 @@ async def remove_repository(
 
 @router.get("/{project_id}/members", response_model=list[MemberResponse])
 async def list_members(
+    request: Request,
     project_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List members of a project."""
-    return await project_service.list_members(db, project_id)
+    result = await project_service.list_members(db, project_id)
+    return conditional_response(request, list[MemberResponse], result)
 
 
 @router.post(
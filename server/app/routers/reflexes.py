@@ -1,13 +1,14 @@
 """Reflexes router — CRUD, toggle, test, webhook info, stats."""
 
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_user_db
 from server.app.middleware.auth import require_auth
-from server.app.models.base import MessageResponse, PaginatedResponse
+from server.app.models.base import MessageResponse, PaginatedResponse, SyncResponse
 from server.app.models.reflex import (
     ReflexCreate,
     ReflexResponse,
@@ -18,27 +19,49 @@ from server.app.models.reflex import (
     ReflexWithSkill,
 )
 from server.app.services import reflexes as reflex_service
+from server.app.services.response_cache import entity_tags, list_tag, response_cache
 
 router = APIRouter(prefix="/reflexes", tags=["reflexes"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_reflexes(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     skill_id: str | None = None,
     trigger_type: str | None = None,
     is_active: bool | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """List reflexes for the current user."""
-    return await reflex_service.list_reflexes(
-        db, page=page, page_size=page_size,
-        skill_id=skill_id, trigger_type=trigger_type, is_active=is_active,
+    columns = reflex_service.LIST_FIELDS.parse(fields)
+    return await response_cache.serve(
+        request,
+        lambda: reflex_service.list_reflexes(
+            db, page=page, page_size=page_size,
+            skill_id=skill_id, trigger_type=trigger_type, is_active=is_active,
+            fields=columns,
+        ),
+        reflex_service.LIST_FIELDS.response_model(columns),
+        scope=f"user:{user['sub']}",
+        tags=[list_tag("reflex", user["sub"])],
+        row_tags=lambda result: entity_tags("reflex", result["data"]),
     )
 
 
+@router.get("/changes", response_model=SyncResponse)
+async def list_reflex_changes(
+    since: datetime | None = Query(None, description="Cursor returned by the previous sync"),
+    user: dict = Depends(require_auth),
+    db: SupabaseClient = Depends(get_user_db),
+):
+    """Reflexes changed or deleted since a sync cursor."""
+    return await reflex_service.list_reflex_changes(db, since)
+
+
 @router.post("", response_model=ReflexResponse, status_code=status.HTTP_201_CREATED)
 async def create_reflex(
     body: ReflexCreate,
@@ -51,22 +74,37 @@ async def create_reflex(
 
 @router.get("/stats", response_model=ReflexStats)
 async def get_reflex_stats(
+    request: Request,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get aggregated reflex statistics for the current user."""
-    return await reflex_service.get_reflex_stats(db)
+    return await response_cache.serve(
+        request,
+        lambda: reflex_service.get_reflex_stats(db),
+        ReflexStats,
+        scope=f"user:{user['sub']}",
+        tags=[list_tag("reflex", user["sub"])],
+    )
 
 
 @router.get("/{reflex_id}", response_model=ReflexWithSkill)
 async def get_reflex(
+    request: Request,
     reflex_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
     """Get a reflex with related skill info."""
-    result = await reflex_service.get_reflex(db, reflex_id)
-    if not result:
+    result = await response_cache.serve(
+        request,
+        lambda: reflex_service.get_reflex(db, reflex_id),
+        ReflexWithSkill,
+        scope=f"user:{user['sub']}",
+        tags=[f"reflex:{reflex_id}"],
+        row_tags=lambda reflex: entity_tags("reflex", reflex),
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Reflex not found")
     return result
 
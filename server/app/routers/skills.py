@@ -1,13 +1,14 @@
 """Skills router — CRUD, execute, test, bulk, export/import."""
 
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from supabase import Client as SupabaseClient
 
 from server.app.dependencies import get_user_db
 from server.app.middleware.auth import require_auth
-from server.app.models.base import MessageResponse, PaginatedResponse
+from server.app.models.base import MessageResponse, PaginatedResponse, SyncResponse
 from server.app.models.skill import (
     SkillBulkAction,
     SkillCreate,
@@ -19,26 +20,47 @@ from server.app.models.skill import (
     SkillWithRelations,
 )
 from server.app.services import skills as skill_service
+from server.app.services.response_cache import conditional_response, entity_tags, list_tag, response_cache
 
 router = APIRouter(prefix="/skills", tags=["skills"])
 
 
 @router.get("", response_model=PaginatedResponse)
 async def list_skills(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category: str | None = None,
     is_active: bool | None = None,
     search: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated columns to return"),
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
-    return await skill_service.list_skills(
-        db, page=page, page_size=page_size,
-        category=category, is_active=is_active, search=search,
+    columns = skill_service.LIST_FIELDS.parse(fields)
+    return await response_cache.serve(
+        request,
+        lambda: skill_service.list_skills(
+            db, page=page, page_size=page_size,
+            category=category, is_active=is_active, search=search, fields=columns,
+        ),
+        skill_service.LIST_FIELDS.response_model(columns),
+        scope=f"user:{user['sub']}",
+        tags=[list_tag("skill", user["sub"])],
+        row_tags=lambda result: entity_tags("skill", result["data"]),
     )
 
 
+@router.get("/changes", response_model=SyncResponse)
+async def list_skill_changes(
+    since: datetime | None = Query(None, description="Cursor returned by the previous sync"),
+    user: dict = Depends(require_auth),
+    db: SupabaseClient = Depends(get_user_db),
+):
+    """Skills changed or deleted since a sync cursor."""
+    return await skill_service.list_skill_changes(db, since)
+
+
 @router.post("", response_model=SkillResponse, status_code=status.HTTP_201_CREATED)
 async def create_skill(
     body: SkillCreate,
@@ -50,12 +72,19 @@ async def create_skill(
 
 @router.get("/{skill_id}", response_model=SkillWithRelations)
 async def get_skill(
+    request: Request,
     skill_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
 ):
-    result = await skill_service.get_skill_with_relations(db, skill_id)
-    if not result:
+    result = await response_cache.serve(
+        request,
+        lambda: skill_service.get_skill_with_relations(db, skill_id),
+        SkillWithRelations,
+        scope=f"user:{user['sub']}",
+        tags=[f"skill:{skill_id}"],
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Skill not found")
     return result
 
@@ -132,6 +161,7 @@ async def bulk_action(
 
 @router.get("/{skill_id}/export", response_model=SkillExportResponse)
 async def export_skill(
+    request: Request,
     skill_id: UUID,
     user: dict = Depends(require_auth),
     db: SupabaseClient = Depends(get_user_db),
@@ -139,7 +169,7 @@ async def export_skill(
     result = await skill_service.export_skill(db, skill_id)
     if not result:
         raise HTTPException(status_code=404, detail="Skill not found")
-    return result
+    return conditional_response(request, SkillExportResponse, result)
 
 
 @router.post("/import", response_model=SkillResponse, status_code=status.HTTP_201_CREATED)
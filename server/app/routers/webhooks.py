@@ -2,6 +2,7 @@
 
 No auth middleware — webhooks are verified by Stripe signature.
 Events are processed idempotently (event ID checked).
+Subscription changes invalidate the org's cached entitlements.
 """
 
 import logging
@@ -116,6 +117,8 @@ async def _handle_checkout_completed(session: dict[str, Any]) -> None:
     #     "subscription_status": "active",
     # }).eq("stripe_customer_id", customer_id).execute()
 
+    await _invalidate_entitlements(session)
+
 
 async def _handle_subscription_updated(subscription: dict[str, Any]) -> None:
     """Handle subscription update — status change, plan change.
@@ -137,6 +140,8 @@ async def _handle_subscription_updated(subscription: dict[str, Any]) -> None:
     #     "cancel_at_period_end": cancel_at_period_end,
     # }).eq("stripe_subscription_id", sub_id).execute()
 
+    await _invalidate_entitlements(subscription)
+
 
 async def _handle_subscription_deleted(subscription: dict[str, Any]) -> None:
     """Handle subscription deletion — revert to free tier.
@@ -154,6 +159,8 @@ async def _handle_subscription_deleted(subscription: dict[str, Any]) -> None:
     #     "stripe_subscription_id": None,
     # }).eq("stripe_subscription_id", sub_id).execute()
 
+    await _invalidate_entitlements(subscription)
+
 
 async def _handle_payment_succeeded(invoice: dict[str, Any]) -> None:
     """Handle successful payment — log for records.
@@ -197,6 +204,22 @@ async def _handle_payment_failed(invoice: dict[str, Any]) -> None:
 # Helpers
 # =============================================================================
 
+async def _invalidate_entitlements(obj: dict[str, Any]) -> None:
+    """Drop cached plan/limits for the org a session or subscription belongs to.
+
+    The org ID comes from the metadata set at checkout. Objects without it
+    (e.g. subscriptions created before it was added) age out of the cache
+    with ENTITLEMENTS_REDIS_TTL instead.
+    """
+    org_id = (obj.get("metadata") or {}).get("org_id") or obj.get("client_reference_id")
+    if not org_id:
+        logger.debug("No org_id on %s %s, entitlements left to expire", obj.get("object"), obj.get("id"))
+        return
+
+    from server.app.services.entitlements import entitlements
+    await entitlements.invalidate(org_id)
+
+
 def _mark_processed(event_id: str) -> None:
     """Mark an event as processed (simple in-memory cache)."""
     global _processed_events
@@ -1,11 +1,15 @@
 """WebSocket router — Real-time event streaming with JWT auth."""
 
-import json
 import logging
 
 from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
 
-from server.app.services.websocket import manager
+from server.app.services.websocket import (
+    CLOSE_AUTH_EXPIRED,
+    decode_frame,
+    manager,
+    negotiate_subprotocol,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,21 +25,31 @@ async def websocket_endpoint(
 
     Connect: ws://host/ws?token=<jwt>
 
+    Wire format is negotiated with Sec-WebSocket-Protocol: offer
+    "kijko.msgpack.v1" for binary MessagePack frames, or "kijko.json.v1"
+    (or nothing) for JSON text frames. permessage-deflate is negotiated
+    by the server (uvicorn --ws-per-message-deflate) independently.
+
     Client messages:
     - {"action": "join", "room": "project:uuid"} — join a room
     - {"action": "leave", "room": "project:uuid"} — leave a room
     - {"action": "ping"} — heartbeat
+    - {"action": "pong"} — reply to a server ping
+    - {"action": "auth", "token": "<jwt>"} — swap in a refreshed token
 
     Server events:
     - {"type": "ingestion_progress", ...}
     - {"type": "execution_update", ...}
     - {"type": "notification", ...}
     - {"type": "pong"} — heartbeat response
+    - {"type": "ping"} — server heartbeat; any client frame counts as the reply
+    - {"type": "token_expired"} — sent before closing with 4001
+    - {"type": "reconnect", "retry_after_ms": n} — sent before closing with 4000
     - {"type": "error", "message": "..."} — error messages
     """
     # Validate JWT
     if not token:
-        await websocket.close(code=4001, reason="Missing token")
+        await websocket.close(code=CLOSE_AUTH_EXPIRED, reason="Missing token")
         return
 
     try:
@@ -43,24 +57,43 @@ async def websocket_endpoint(
         auth = get_supabase_auth()
         user_claims = auth.validate_token(token)
     except Exception as e:
-        await websocket.close(code=4001, reason="Invalid token")
+        await websocket.close(code=CLOSE_AUTH_EXPIRED, reason="Invalid token")
         return
 
     # Accept and register connection
-    await manager.connect(websocket, user_claims)
+    subprotocol = negotiate_subprotocol(websocket.scope.get("subprotocols"))
+    await manager.connect(websocket, user_claims, subprotocol=subprotocol)
 
     try:
         while True:
-            # Receive and process client messages
-            data = await websocket.receive_text()
+            # Receive and process client messages (text or binary frames)
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
+            manager.touch(websocket)
 
             try:
-                message = json.loads(data)
+                message = decode_frame(data)
                 action = message.get("action", "")
 
                 if action == "ping":
                     await manager.send_personal(websocket, {"type": "pong"})
 
+                elif action == "pong":
+                    pass
+
+                elif action == "auth":
+                    new_claims = _revalidate(auth, message.get("token", ""), user_claims)
+                    if new_claims is None:
+                        await manager.send_personal(websocket, {
+                            "type": "error",
+                            "message": "Invalid token",
+                        })
+                    else:
+                        user_claims = new_claims
+                        manager.update_claims(websocket, user_claims)
+                        await manager.send_personal(websocket, {"type": "auth_ok"})
+
                 elif action == "join":
                     room = message.get("room", "")
                     if room and _validate_room_access(room, user_claims):
@@ -90,10 +123,10 @@ async def websocket_endpoint(
                         "message": f"Unknown action: {action}",
                     })
 
-            except json.JSONDecodeError:
+            except ValueError:
                 await manager.send_personal(websocket, {
                     "type": "error",
-                    "message": "Invalid JSON",
+                    "message": "Invalid message",
                 })
 
     except WebSocketDisconnect:
@@ -103,6 +136,26 @@ async def websocket_endpoint(
         manager.disconnect(websocket)
 
 
+def _revalidate(auth, token: str, current_claims: dict) -> dict | None:
+    """Validate a refreshed token for an open connection.
+
+    The new token must belong to the same user; org changes are not
+    allowed mid-connection because room memberships were granted on
+    the original claims.
+    """
+    if not token:
+        return None
+    try:
+        claims = auth.validate_token(token)
+    except Exception:
+        return None
+    if claims.get("sub") != current_claims.get("sub"):
+        return None
+    if claims.get("org_id") != current_claims.get("org_id"):
+        return None
+    return claims
+
+
 def _validate_room_access(room: str, user_claims: dict) -> bool:
     """Validate that a user can join a specific room.
 
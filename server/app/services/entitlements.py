@@ -0,0 +1,220 @@
+"""Entitlements service — cached org plan and resolved plan limits.
+
+Quota checks, rate-limit tiers and the billing usage page all need the
+org's plan. Reading organizations.plan on every request is replaced by
+two cache layers:
+
+  1. Per-process LRU (ENTITLEMENTS_LOCAL_TTL, ENTITLEMENTS_CACHE_SIZE)
+  2. Redis key entitlements:{org_id} shared by all processes (ENTITLEMENTS_REDIS_TTL)
+
+Subscription webhooks call invalidate(), which deletes the Redis key and
+publishes the org ID on INVALIDATION_CHANNEL so every process drops its
+local copy. The TTLs bound staleness if a message is missed.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from server.app.config import settings
+from server.app.models.enums import PlanTier
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "entitlements:invalidate"
+
+
+class Entitlements(NamedTuple):
+    """An org's plan with its limits already looked up in PLAN_LIMITS."""
+
+    plan: str
+    limits: dict[str, int]
+
+    def limit(self, category: str) -> int:
+        return self.limits.get(category, 0)
+
+
+def resolve_entitlements(plan: str | None) -> Entitlements:
+    """Entitlements for a plan tier; unknown or missing plans get free limits."""
+    from server.app.services.usage import PLAN_LIMITS
+
+    tier = PlanTier(plan) if plan in PLAN_LIMITS else PlanTier.FREE
+    return Entitlements(tier.value, PLAN_LIMITS[tier])
+
+
+def _redis_key(org_id: str) -> str:
+    return f"entitlements:{org_id}"
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+class EntitlementsCache:
+    """Two-level (process LRU + Redis) cache of org entitlements."""
+
+    def __init__(
+        self,
+        max_size: int | None = None,
+        local_ttl: float | None = None,
+        redis_ttl: int | None = None,
+    ) -> None:
+        self.max_size = settings.ENTITLEMENTS_CACHE_SIZE if max_size is None else max_size
+        self.local_ttl = settings.ENTITLEMENTS_LOCAL_TTL if local_ttl is None else local_ttl
+        self.redis_ttl = settings.ENTITLEMENTS_REDIS_TTL if redis_ttl is None else redis_ttl
+        self._local: OrderedDict[str, tuple[Entitlements, float]] = OrderedDict()
+        self._listener_task: asyncio.Task | None = None
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, org_id: str, client=None, redis_client=None) -> Entitlements:
+        """Entitlements for an org: local LRU, then Redis, then the database.
+
+        ``client`` is the Supabase client to read organizations with
+        (defaults to the service-role client). Redis errors skip that
+        layer; a failed database read falls back to free limits and is
+        not cached.
+        """
+        now = time.monotonic()
+        cached = self._local.get(org_id)
+        if cached is not None and cached[1] > now:
+            self._local.move_to_end(org_id)
+            self.hits += 1
+            return cached[0]
+
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        try:
+            plan = await redis_client.get(_redis_key(org_id))
+        except Exception as e:
+            logger.debug("Entitlements Redis read failed (org=%s): %s", org_id, e)
+            plan = None
+
+        if plan is not None:
+            self.redis_hits += 1
+            ents = resolve_entitlements(plan)
+            self._store(org_id, ents, now)
+            return ents
+
+        self.misses += 1
+        try:
+            plan = _fetch_plan(org_id, client)
+        except Exception as e:
+            logger.warning("Plan lookup failed (org=%s): %s", org_id, e)
+            return resolve_entitlements(PlanTier.FREE)
+
+        ents = resolve_entitlements(plan)
+        self._store(org_id, ents, now)
+        try:
+            await redis_client.set(_redis_key(org_id), ents.plan, ex=self.redis_ttl)
+        except Exception as e:
+            logger.debug("Entitlements Redis write failed (org=%s): %s", org_id, e)
+        return ents
+
+    def _store(self, org_id: str, ents: Entitlements, now: float) -> None:
+        self._local[org_id] = (ents, now + self.local_ttl)
+        self._local.move_to_end(org_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    def forget(self, org_id: str) -> None:
+        """Drop an org from this process's cache only."""
+        self._local.pop(org_id, None)
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    async def invalidate(self, org_id: str, redis_client=None) -> None:
+        """Drop an org everywhere: locally, in Redis, and in other processes."""
+        self.forget(org_id)
+
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        try:
+            await redis_client.delete(_redis_key(org_id))
+            await redis_client.publish(INVALIDATION_CHANNEL, org_id)
+        except Exception as e:
+            logger.warning("Entitlements invalidation failed (org=%s): %s", org_id, e)
+
+    # -------------------------------------------------------------------------
+    # Invalidation listener
+    # -------------------------------------------------------------------------
+
+    def start_listener(self) -> None:
+        """Start the pub/sub invalidation listener (idempotent)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Cancel the pub/sub invalidation listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _listen(self, redis_client=None) -> None:
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.forget(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Messages may have been missed: start over with a cold cache
+                logger.warning("Entitlements listener disconnected: %s", e)
+                self.clear()
+                await asyncio.sleep(5.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._local),
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+
+def _fetch_plan(org_id: str, client=None) -> str:
+    if client is None:
+        from server.app.dependencies import get_supabase
+        client = get_supabase()
+
+    result = (
+        client.table("organizations")
+        .select("plan")
+        .eq("id", org_id)
+        .single()
+        .execute()
+    )
+    return (result.data or {}).get("plan") or PlanTier.FREE
+
+
+# Process-wide cache
+entitlements = EntitlementsCache()
+
+
+async def get_entitlements(org_id: str, client=None) -> Entitlements:
+    """Cached entitlements for an org (see EntitlementsCache.get)."""
+    return await entitlements.get(org_id, client)
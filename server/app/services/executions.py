@@ -1,13 +1,29 @@
-"""Executions service — Supabase queries for skill executions and analytics."""
+"""Executions service — Supabase queries for skill executions and analytics.
+
+All functions are read-only and @coalesce'd: identical concurrent reads
+share one query.
+"""
 
 from typing import Any
 from uuid import UUID
 
 from supabase import Client as SupabaseClient
 
+from server.app.models.execution import SkillExecutionSummary
 from server.app.services.database import build_filtered_query
+from server.app.services.fieldsets import Fieldset
+from server.app.services.singleflight import coalesce, run_query
+
+# ?fields= on GET /executions. Lists never carry input or the full output
+# (often tens of KB per row): only a preview, see SkillExecutionSummary
+LIST_FIELDS = Fieldset(
+    SkillExecutionSummary,
+    default=", ".join([*SkillExecutionSummary.model_fields, "skills(name, category)"]),
+    embeds={"skills": "skills(name, category)"},
+)
 
 
+@coalesce
 async def list_executions(
     client: SupabaseClient,
     page: int = 1,
@@ -17,6 +33,7 @@ async def list_executions(
     execution_type: str | None = None,
     date_from: str | None = None,
     date_to: str | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """List skill executions with filters (RLS-scoped to current user)."""
     filters = {}
@@ -29,7 +46,7 @@ async def list_executions(
 
     query = build_filtered_query(
         client, "skill_executions",
-        select="*, skills(name, category)",
+        select=LIST_FIELDS.select(fields),
         filters=filters, page=page, page_size=page_size,
         order_by="executed_at",
     )
@@ -40,7 +57,7 @@ async def list_executions(
     if date_to:
         query = query.lte("executed_at", date_to)
 
-    result = query.execute()
+    result = await run_query(query)
     total = result.count or 0
     return {
         "data": result.data,
@@ -51,18 +68,49 @@ async def list_executions(
     }
 
 
+@coalesce
 async def get_execution(client: SupabaseClient, execution_id: str | UUID) -> dict | None:
     """Get a single execution with related skill info."""
-    result = (
+    result = await run_query(
         client.table("skill_executions")
         .select("*, skills(name, category)")
         .eq("id", str(execution_id))
         .single()
-        .execute()
     )
     return result.data
 
 
+@coalesce
+async def get_execution_output_info(client: SupabaseClient, execution_id: str | UUID) -> dict | None:
+    """Get what GET /executions/{id}/output needs before paging: no output text."""
+    result = await run_query(
+        client.table("skill_executions")
+        .select("id, completed_at, output_length")
+        .eq("id", str(execution_id))
+        .single()
+    )
+    return result.data
+
+
+@coalesce
+async def get_execution_output_chunk(
+    client: SupabaseClient,
+    execution_id: str | UUID,
+    offset: int,
+    length: int,
+) -> str:
+    """Get ``length`` characters of an execution's output from ``offset`` (0-based)."""
+    result = await run_query(
+        client.rpc("execution_output_chunk", {
+            "p_execution_id": str(execution_id),
+            "p_offset": offset,
+            "p_length": length,
+        })
+    )
+    return result.data or ""
+
+
+@coalesce
 async def get_execution_stats(
     client: SupabaseClient,
     days: int = 30,
@@ -76,11 +124,10 @@ async def get_execution_stats(
 
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-    result = (
+    result = await run_query(
         client.table("skill_executions")
         .select("status, tokens_used, cost_cents, duration_ms", count="exact")
         .gte("executed_at", cutoff)
-        .execute()
     )
 
     executions = result.data or []
@@ -105,6 +152,7 @@ async def get_execution_stats(
     }
 
 
+@coalesce
 async def get_stats_by_skill(
     client: SupabaseClient,
     limit: int = 20,
@@ -113,10 +161,9 @@ async def get_stats_by_skill(
 
     Returns top skills by execution count.
     """
-    result = (
+    result = await run_query(
         client.table("skill_executions")
         .select("skill_id, status, tokens_used, cost_cents, duration_ms, skills(name)")
-        .execute()
     )
 
     executions = result.data or []
@@ -162,6 +209,7 @@ async def get_stats_by_skill(
     return stats[:limit]
 
 
+@coalesce
 async def get_stats_by_period(
     client: SupabaseClient,
     days: int = 30,
@@ -178,12 +226,11 @@ async def get_stats_by_period(
 
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-    result = (
+    result = await run_query(
         client.table("skill_executions")
         .select("executed_at, status, tokens_used, cost_cents")
         .gte("executed_at", cutoff)
         .order("executed_at", desc=False)
-        .execute()
     )
 
     executions = result.data or []
@@ -0,0 +1,83 @@
+"""Sparse fieldsets — ``?fields=`` on list endpoints.
+
+List views usually render a handful of columns, yet ``select=*`` ships
+every row's ``prompt_template``, ``custom_settings`` or execution
+``output`` with it. Each list service declares a ``Fieldset``: the
+columns a client may ask for (those of the resource's response model)
+plus named embeds (``skills``, ``project_members`` ...). A request such as
+
+    GET /skills?fields=name,category,is_active
+
+is validated against it and becomes the PostgREST select
+``id,name,category,is_active``; the response is validated against a
+model trimmed to the same columns. Without ``fields`` the list keeps its
+full default select.
+
+Columns in ``always`` (the ID, and the parent skill_id where response
+cache tags depend on it) are selected whether requested or not.
+"""
+
+import functools
+from typing import Any
+
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+
+from server.app.models.base import BaseSchema, PaginatedResponse
+
+
+@functools.lru_cache(maxsize=None)
+def _trimmed_model(model: type[BaseModel], columns: tuple[str, ...], embeds: tuple[str, ...]) -> type[BaseModel]:
+    definitions: dict[str, Any] = {
+        name: (model.model_fields[name].annotation, ...) for name in columns
+    }
+    definitions.update({name: (Any, None) for name in embeds})
+    return create_model(f"{model.__name__}Fields", __base__=BaseSchema, **definitions)
+
+
+class Fieldset:
+    """Selectable columns and embeds of one list endpoint."""
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        default: str = "*",
+        embeds: dict[str, str] | None = None,
+        always: tuple[str, ...] = ("id",),
+    ) -> None:
+        self.model = model
+        self.default = default
+        self.embeds = embeds or {}
+        self.always = always
+        self.allowed = frozenset(model.model_fields) | frozenset(self.embeds)
+
+    def parse(self, raw: str | None) -> tuple[str, ...] | None:
+        """Validate a ``fields`` query value; None means the default select.
+
+        Raises HTTPException(422) naming any field not in the allowlist.
+        """
+        if raw is None or not raw.strip():
+            return None
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted({name for name in requested if name not in self.allowed})
+        if unknown:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Unknown fields: {', '.join(unknown)}. "
+                       f"Allowed: {', '.join(sorted(self.allowed))}",
+            )
+        return tuple(dict.fromkeys([*self.always, *requested]))
+
+    def select(self, fields: tuple[str, ...] | None) -> str:
+        """PostgREST select clause for parsed ``fields``."""
+        if fields is None:
+            return self.default
+        return ",".join(self.embeds.get(name, name) for name in fields)
+
+    def response_model(self, fields: tuple[str, ...] | None) -> Any:
+        """Page model for parsed ``fields`` (untyped rows for the default select)."""
+        if fields is None:
+            return PaginatedResponse
+        columns = tuple(name for name in fields if name not in self.embeds)
+        embeds = tuple(name for name in fields if name in self.embeds)
+        return PaginatedResponse[_trimmed_model(self.model, columns, embeds)]
@@ -1,17 +1,31 @@
 """Habits service — Supabase CRUD operations for habits."""
 
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from supabase import Client as SupabaseClient
 
+from server.app.models.habit import HabitResponse
 from server.app.services.database import build_filtered_query
+from server.app.services.fieldsets import Fieldset
+from server.app.services.response_cache import invalidate_entities
+from server.app.services.sync import changes_since
+
+# ?fields= on GET /habits; skill_id keeps the skill:{id} cache tag
+LIST_FIELDS = Fieldset(
+    HabitResponse,
+    default="*, skills(name, category)",
+    embeds={"skills": "skills(name, category)"},
+    always=("id", "skill_id"),
+)
 
 
 async def list_habits(
     client: SupabaseClient,
     page: int = 1, page_size: int = 20,
     skill_id: str | None = None, is_active: bool | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     filters = {}
     if skill_id:
@@ -20,12 +34,16 @@ async def list_habits(
         filters["is_active"] = is_active
 
     query = build_filtered_query(client, "habits",
-        select="*, skills(name, category)", filters=filters, page=page, page_size=page_size)
+        select=LIST_FIELDS.select(fields), filters=filters, page=page, page_size=page_size)
     result = query.execute()
     total = result.count or 0
     return {"data": result.data, "total": total, "page": page, "page_size": page_size, "has_more": (page * page_size) < total}
 
 
+async def list_habit_changes(client: SupabaseClient, since: datetime | None) -> dict[str, Any]:
+    return await changes_since(client, "habits", since, select="*, skills(name, category)")
+
+
 async def get_habit(client: SupabaseClient, habit_id: str | UUID) -> dict | None:
     result = client.table("habits").select("*, skills(name, category, model)").eq("id", str(habit_id)).single().execute()
     return result.data
@@ -42,6 +60,7 @@ async def create_habit(client: SupabaseClient, data: dict[str, Any], user_id: st
         "config": data.get("config", {}),
     }
     result = client.table("habits").insert(insert_data).execute()
+    await invalidate_entities("habit", result.data)
     return result.data[0] if result.data else {}
 
 
@@ -50,11 +69,13 @@ async def update_habit(client: SupabaseClient, habit_id: str | UUID, data: dict[
     if not update_data:
         return await get_habit(client, habit_id)
     result = client.table("habits").update(update_data).eq("id", str(habit_id)).execute()
+    await invalidate_entities("habit", result.data)
     return result.data[0] if result.data else None
 
 
 async def delete_habit(client: SupabaseClient, habit_id: str | UUID) -> bool:
     result = client.table("habits").delete().eq("id", str(habit_id)).execute()
+    await invalidate_entities("habit", result.data)
     return len(result.data) > 0
 
 
@@ -65,6 +86,7 @@ async def toggle_habit(client: SupabaseClient, habit_id: str | UUID) -> dict | N
         return None
     new_state = not habit.get("is_active", True)
     result = client.table("habits").update({"is_active": new_state}).eq("id", str(habit_id)).execute()
+    await invalidate_entities("habit", result.data)
     return result.data[0] if result.data else None
 
 
@@ -1,6 +1,7 @@
 """Health check service — dependency status for readiness/liveness probes.
 
 Checks: Redis, Supabase (DB), Supabase Auth, Stripe.
+Also reports the in-memory rate-limit fallback and read-coalescing counters.
 Returns structured status for monitoring.
 """
 
@@ -40,6 +41,12 @@ async def check_health() -> dict[str, Any]:
     # 4. Stripe
     checks["stripe"] = _check_stripe()
 
+    # 5. Rate-limit fallback (informational — only used while Redis is down)
+    checks["rate_limit_fallback"] = _check_rate_limit_fallback()
+
+    # 6. Read coalescing (informational — how many queries single-flight saved)
+    checks["read_coalescing"] = _check_read_coalescing()
+
     total_ms = int((time.monotonic() - start) * 1000)
 
     return {
@@ -133,3 +140,24 @@ def _check_stripe() -> dict[str, Any]:
         "api_key_configured": has_key,
         "webhook_secret_configured": has_webhook,
     }
+
+
+def _check_rate_limit_fallback() -> dict[str, Any]:
+    """Report in-memory rate limiter occupancy and evictions."""
+    from server.app.middleware.rate_limit import fallback_stats
+
+    stats = fallback_stats()
+    return {
+        "status": "healthy",
+        **stats,
+    }
+
+
+def _check_read_coalescing() -> dict[str, Any]:
+    """Report single-flight calls vs. reads that shared an in-flight call."""
+    from server.app.services.singleflight import singleflight
+
+    return {
+        "status": "healthy",
+        **singleflight.stats(),
+    }
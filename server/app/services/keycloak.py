@@ -8,18 +8,23 @@ Handles:
 
 Architecture:
   - Uses OIDC discovery endpoint for automatic configuration
-  - JWKS keys cached with 1-hour TTL, auto-refresh on validation failure
-  - All Keycloak API calls go through httpx async client
+  - JWKS keys cached with 1-hour TTL, parsed once and indexed by kid
+  - JWKS re-fetched early only for an unknown kid (key rotation), at most
+    once per JWKS_MIN_REFRESH_INTERVAL; concurrent refreshes share one fetch
+  - All Keycloak API calls go through one pooled httpx async client
+  - Admin (client credentials) token cached until shortly before expiry,
+    renewed in the background with a single in-flight fetch
   - Token validation extracts user_id (sub), org_id, email, roles from claims
 """
 
+import asyncio
 import logging
 import time
 from typing import Any
 
 import httpx
 from fastapi import HTTPException, status
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 
 from server.app.config import settings
 
@@ -28,6 +33,14 @@ logger = logging.getLogger(__name__)
 # JWKS cache TTL in seconds
 JWKS_CACHE_TTL = 3600  # 1 hour
 
+# Min seconds between JWKS fetches triggered by an unknown kid
+JWKS_MIN_REFRESH_INTERVAL = 30
+
+# Admin token: stop using it this many seconds before exp, and start a
+# background renewal once this share of its lifetime has passed
+ADMIN_TOKEN_EXPIRY_SKEW = 10
+ADMIN_TOKEN_REFRESH_AFTER = 0.8
+
 
 class KeycloakService:
     """Keycloak OIDC client for authentication operations."""
@@ -36,6 +49,15 @@ class KeycloakService:
         self._oidc_config: dict[str, Any] | None = None
         self._jwks: dict[str, Any] | None = None
         self._jwks_fetched_at: float = 0
+        self._jwks_attempted_at: float = 0
+        self._jwks_refresh: asyncio.Future | None = None
+        # kid → parsed public key, rebuilt whenever _jwks changes
+        self._signing_keys: dict[str, Any] = {}
+        self._indexed_jwks: dict[str, Any] | None = None
+        self._admin_token: str | None = None
+        self._admin_token_expires_at: float = 0
+        self._admin_token_refresh_at: float = 0
+        self._admin_token_fetch: asyncio.Future | None = None
         self._http_client: httpx.AsyncClient | None = None
 
         # Build Keycloak URLs
@@ -62,6 +84,8 @@ class KeycloakService:
 
     async def close(self) -> None:
         """Close the HTTP client."""
+        if self._admin_token_fetch is not None and not self._admin_token_fetch.done():
+            self._admin_token_fetch.cancel()
         if self._http_client and not self._http_client.is_closed:
             await self._http_client.aclose()
 
@@ -114,7 +138,8 @@ class KeycloakService:
         """Fetch JWKS public keys for token validation.
 
         Keys are cached for JWKS_CACHE_TTL seconds.
-        Force refresh on JWT validation failure (key rotation).
+        Force refresh on an unknown kid (key rotation). Concurrent callers
+        share a single in-flight fetch.
         """
         now = time.time()
         if (
@@ -124,11 +149,17 @@ class KeycloakService:
         ):
             return self._jwks
 
+        if self._jwks_refresh is None or self._jwks_refresh.done():
+            self._jwks_refresh = asyncio.ensure_future(self._fetch_jwks())
+        return await asyncio.shield(self._jwks_refresh)
+
+    async def _fetch_jwks(self) -> dict[str, Any]:
+        self._jwks_attempted_at = time.time()
         try:
             resp = await self.http_client.get(self.jwks_uri)
             resp.raise_for_status()
             self._jwks = resp.json()
-            self._jwks_fetched_at = now
+            self._jwks_fetched_at = time.time()
             logger.info("JWKS refreshed from %s", self.jwks_uri)
             return self._jwks
         except httpx.HTTPError as e:
@@ -140,6 +171,39 @@ class KeycloakService:
                 detail="Authentication service unavailable",
             )
 
+    def _signing_key(self, kid: str) -> Any | None:
+        """Parsed public key for a kid in the current JWKS, or None."""
+        if self._indexed_jwks is not self._jwks:
+            self._index_jwks()
+        return self._signing_keys.get(kid)
+
+    def _index_jwks(self) -> None:
+        # Parse each JWK once per fetch; keys that did not change are reused
+        previous = self._signing_keys
+        previous_jwks = {
+            k.get("kid"): k for k in (self._indexed_jwks or {}).get("keys", [])
+        }
+        keys: dict[str, Any] = {}
+        for key_data in (self._jwks or {}).get("keys", []):
+            kid = key_data.get("kid")
+            if not kid or key_data.get("use", "sig") != "sig":
+                continue
+            if kid in previous and previous_jwks.get(kid) == key_data:
+                keys[kid] = previous[kid]
+                continue
+            try:
+                keys[kid] = jwk.construct(key_data, key_data.get("alg", "RS256"))
+            except Exception as e:
+                logger.warning("Skipping unusable JWKS key %s: %s", kid, e)
+        self._signing_keys = keys
+        self._indexed_jwks = self._jwks
+
+    async def _refresh_for_unknown_kid(self) -> None:
+        """Re-fetch JWKS for a kid we do not know, rate-limited."""
+        in_flight = self._jwks_refresh is not None and not self._jwks_refresh.done()
+        if in_flight or time.time() - self._jwks_attempted_at >= JWKS_MIN_REFRESH_INTERVAL:
+            await self.get_jwks(force_refresh=True)
+
     # =========================================================================
     # Token Validation
     # =========================================================================
@@ -163,32 +227,48 @@ class KeycloakService:
         Raises:
             HTTPException(401) on any validation failure
         """
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+        except JWTError as e:
+            logger.warning("JWT validation failed: %s", str(e))
+            raise invalid
+
         jwks = await self.get_jwks()
 
+        if kid is None:
+            # No kid: let jose try every key in the set
+            key: Any = jwks
+        else:
+            key = self._signing_key(kid)
+            if key is None:
+                # Unknown kid — keys might have rotated
+                await self._refresh_for_unknown_kid()
+                key = self._signing_key(kid)
+            if key is None:
+                logger.warning("JWT validation failed: unknown kid %s", kid)
+                raise invalid
+
         try:
-            # Try to decode with current JWKS keys
-            payload = self._decode_token(token, jwks)
-        except JWTError:
-            # Key might have rotated — refresh JWKS and retry once
-            jwks = await self.get_jwks(force_refresh=True)
-            try:
-                payload = self._decode_token(token, jwks)
-            except JWTError as e:
-                logger.warning("JWT validation failed after JWKS refresh: %s", str(e))
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid or expired token",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
+            payload = self._decode_token(token, key)
+        except JWTError as e:
+            # Expired or tampered tokens never trigger a JWKS fetch
+            logger.warning("JWT validation failed: %s", str(e))
+            raise invalid
 
         # Extract and normalize claims
         return self._extract_claims(payload)
 
-    def _decode_token(self, token: str, jwks: dict[str, Any]) -> dict[str, Any]:
-        """Decode and validate JWT using JWKS public keys."""
+    def _decode_token(self, token: str, key: Any) -> dict[str, Any]:
+        """Decode and validate JWT using a parsed public key (or a JWKS)."""
         return jwt.decode(
             token,
-            jwks,
+            key,
             algorithms=["RS256"],
             audience=self.client_id,
             issuer=self.realm_url,
@@ -343,9 +423,6 @@ class KeycloakService:
         Returns:
             Token response (auto-login after registration)
         """
-        # First, get an admin token using client credentials
-        admin_token = await self._get_admin_token()
-
         # Create user in Keycloak
         user_data = {
             "email": email,
@@ -364,14 +441,7 @@ class KeycloakService:
         }
 
         try:
-            resp = await self.http_client.post(
-                f"{self.admin_url}/users",
-                json=user_data,
-                headers={
-                    "Authorization": f"Bearer {admin_token}",
-                    "Content-Type": "application/json",
-                },
-            )
+            resp = await self._admin_request("post", "/users", json=user_data)
         except httpx.HTTPError as e:
             logger.error("User registration failed: %s", str(e))
             raise HTTPException(
@@ -515,12 +585,49 @@ class KeycloakService:
     # Internal Helpers
     # =========================================================================
 
+    async def _admin_request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Call the Admin REST API with the cached admin token.
+
+        ``method`` is the http_client method name ("get", "post", ...).
+        A 401 means the token was revoked or expired early: it is dropped
+        and the call retried once with a fresh one.
+        """
+        for attempt in range(2):
+            admin_token = await self._get_admin_token()
+            resp = await getattr(self.http_client, method)(
+                f"{self.admin_url}{path}",
+                headers={"Authorization": f"Bearer {admin_token}"},
+                **kwargs,
+            )
+            if resp.status_code != 401 or attempt:
+                return resp
+            self._admin_token = None
+        return resp
+
     async def _get_admin_token(self) -> str:
         """Get an admin access token using client credentials grant.
 
         The backend's Keycloak client must have service account enabled
-        and appropriate roles for user management.
+        and appropriate roles for user management. The token is reused
+        until shortly before it expires; past ADMIN_TOKEN_REFRESH_AFTER of
+        its lifetime a renewal starts in the background. All callers share
+        one in-flight fetch.
         """
+        now = time.time()
+        if self._admin_token and now < self._admin_token_expires_at:
+            if now >= self._admin_token_refresh_at:
+                self._start_admin_token_fetch()
+            return self._admin_token
+
+        return await asyncio.shield(self._start_admin_token_fetch())
+
+    def _start_admin_token_fetch(self) -> asyncio.Future:
+        if self._admin_token_fetch is None or self._admin_token_fetch.done():
+            self._admin_token_fetch = asyncio.ensure_future(self._fetch_admin_token())
+            self._admin_token_fetch.add_done_callback(_log_background_failure)
+        return self._admin_token_fetch
+
+    async def _fetch_admin_token(self) -> str:
         data = {
             "grant_type": "client_credentials",
             "client_id": self.client_id,
@@ -534,7 +641,8 @@ class KeycloakService:
                 headers={"Content-Type": "application/x-www-form-urlencoded"},
             )
             resp.raise_for_status()
-            return resp.json()["access_token"]
+            token_data = resp.json()
+            access_token = token_data["access_token"]
         except (httpx.HTTPError, KeyError) as e:
             logger.error("Failed to get admin token: %s", str(e))
             raise HTTPException(
@@ -542,6 +650,19 @@ class KeycloakService:
                 detail="Authentication service unavailable",
             )
 
+        fetched_at = time.time()
+        lifetime = float(token_data.get("expires_in") or 60)
+        self._admin_token = access_token
+        self._admin_token_expires_at = fetched_at + max(lifetime - ADMIN_TOKEN_EXPIRY_SKEW, 0)
+        self._admin_token_refresh_at = fetched_at + lifetime * ADMIN_TOKEN_REFRESH_AFTER
+        return access_token
+
+
+def _log_background_failure(future: asyncio.Future) -> None:
+    # Background renewals have no awaiting caller; the next request retries
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug("Admin token renewal failed: %s", future.exception())
+
 
 # ---------------------------------------------------------------------------
 # Singleton instance
@@ -17,6 +17,8 @@ from datetime import datetime, timedelta, timezone
 
 from supabase import Client as SupabaseClient
 
+from server.app.config import settings
+
 logger = logging.getLogger(__name__)
 
 # Retention periods per table
@@ -31,6 +33,12 @@ RETENTION_POLICIES = {
         "timestamp_column": "created_at",
         "pii_columns": [],
     },
+    # Delta-sync tombstones; sync cursors older than this get a full resync
+    "deleted_records": {
+        "retention_days": settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+        "timestamp_column": "created_at",
+        "pii_columns": [],
+    },
 }
 
 # Fields to strip from any log output (PII exclusion)
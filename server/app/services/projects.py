@@ -2,23 +2,41 @@
 
 Handles: projects, repositories, members, ingestion progress, project files.
 All queries go through the shared Supabase client with RLS context set by middleware.
+Read functions are @coalesce'd: identical concurrent reads share one query.
 """
 
 import logging
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from supabase import Client as SupabaseClient
 
+from server.app.models.project import ProjectResponse
 from server.app.services.database import build_filtered_query, build_pagination_query
+from server.app.services.fieldsets import Fieldset
+from server.app.services.response_cache import invalidate_entities
+from server.app.services.singleflight import coalesce, run_query
+from server.app.services.sync import changes_since
 
 logger = logging.getLogger(__name__)
 
+# ?fields= on GET /projects
+LIST_FIELDS = Fieldset(
+    ProjectResponse,
+    default="*, project_repositories(count), project_members(count)",
+    embeds={
+        "project_repositories": "project_repositories(count)",
+        "project_members": "project_members(count)",
+    },
+)
+
 
 # =============================================================================
 # Projects
 # =============================================================================
 
+@coalesce
 async def list_projects(
     client: SupabaseClient,
     page: int = 1,
@@ -26,6 +44,7 @@ async def list_projects(
     status: str | None = None,
     project_type: str | None = None,
     search: str | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """List projects (RLS-scoped to current org)."""
     filters = {}
@@ -36,7 +55,7 @@ async def list_projects(
 
     query = build_filtered_query(
         client, "projects",
-        select="*, project_repositories(count), project_members(count)",
+        select=LIST_FIELDS.select(fields),
         filters=filters,
         page=page, page_size=page_size,
     )
@@ -44,7 +63,7 @@ async def list_projects(
     if search:
         query = query.ilike("name", f"%{search}%")
 
-    result = query.execute()
+    result = await run_query(query)
     total = result.count or 0
 
     return {
@@ -56,30 +75,47 @@ async def list_projects(
     }
 
 
+async def list_project_changes(
+    client: SupabaseClient,
+    since: datetime | None,
+) -> dict[str, Any]:
+    """Projects changed or deleted since a sync cursor (RLS-scoped to current org).
+
+    Repository and member changes bump the project's updated_at
+    (database/011_sync_project_children.sql), so the counts stay current.
+    """
+    return await changes_since(
+        client, "projects", since,
+        select="*, project_repositories(count), project_members(count)",
+    )
+
+
+@coalesce
 async def get_project(
     client: SupabaseClient,
     project_id: str | UUID,
 ) -> dict | None:
     """Get a single project by ID."""
-    result = client.table("projects") \
+    query = client.table("projects") \
         .select("*") \
         .eq("id", str(project_id)) \
-        .single() \
-        .execute()
+        .single()
+    result = await run_query(query)
     return result.data
 
 
+@coalesce
 async def get_project_with_relations(
     client: SupabaseClient,
     project_id: str | UUID,
 ) -> dict | None:
     """Get a project with repositories, members, and ingestion progress."""
     try:
-        result = client.table("projects") \
+        query = client.table("projects") \
             .select("*, project_repositories(*), project_members(*), ingestion_progress(*)") \
             .eq("id", str(project_id)) \
-            .single() \
-            .execute()
+            .single()
+        result = await run_query(query)
         return result.data
     except Exception:
         # .single() raises when RLS filters produce 0 rows
@@ -109,6 +145,7 @@ async def create_project(
     result = client.table("projects") \
         .insert(insert_data) \
         .execute()
+    await invalidate_entities("project", result.data)
     return result.data[0] if result.data else {}
 
 
@@ -127,6 +164,7 @@ async def update_project(
         .update(update_data) \
         .eq("id", str(project_id)) \
         .execute()
+    await invalidate_entities("project", result.data)
     return result.data[0] if result.data else None
 
 
@@ -139,6 +177,7 @@ async def delete_project(
         .delete() \
         .eq("id", str(project_id)) \
         .execute()
+    await invalidate_entities("project", result.data)
     return len(result.data) > 0
 
 
@@ -168,16 +207,17 @@ async def validate_project_name(
 # Repositories
 # =============================================================================
 
+@coalesce
 async def list_repositories(
     client: SupabaseClient,
     project_id: str | UUID,
 ) -> list[dict]:
     """List repositories for a project."""
-    result = client.table("project_repositories") \
+    query = client.table("project_repositories") \
         .select("*") \
         .eq("project_id", str(project_id)) \
-        .order("created_at", desc=True) \
-        .execute()
+        .order("created_at", desc=True)
+    result = await run_query(query)
     return result.data
 
 
@@ -200,6 +240,7 @@ async def add_repository(
     result = client.table("project_repositories") \
         .insert(insert_data) \
         .execute()
+    await invalidate_entities("project", {"id": str(project_id)})
     return result.data[0] if result.data else {}
 
 
@@ -214,6 +255,7 @@ async def remove_repository(
         .eq("id", str(repo_id)) \
         .eq("project_id", str(project_id)) \
         .execute()
+    await invalidate_entities("project", {"id": str(project_id)})
     return len(result.data) > 0
 
 
@@ -221,16 +263,17 @@ async def remove_repository(
 # Members
 # =============================================================================
 
+@coalesce
 async def list_members(
     client: SupabaseClient,
     project_id: str | UUID,
 ) -> list[dict]:
     """List members of a project."""
-    result = client.table("project_members") \
+    query = client.table("project_members") \
         .select("*") \
         .eq("project_id", str(project_id)) \
-        .order("created_at", desc=False) \
-        .execute()
+        .order("created_at", desc=False)
+    result = await run_query(query)
     return result.data
 
 
@@ -254,6 +297,7 @@ async def add_member(
     result = client.table("project_members") \
         .insert(insert_data) \
         .execute()
+    await invalidate_entities("project", {"id": str(project_id)})
     return result.data[0] if result.data else {}
 
 
@@ -273,6 +317,7 @@ async def update_member(
         .eq("id", str(member_id)) \
         .eq("project_id", str(project_id)) \
         .execute()
+    await invalidate_entities("project", {"id": str(project_id)})
     return result.data[0] if result.data else None
 
 
@@ -287,6 +332,7 @@ async def remove_member(
         .eq("id", str(member_id)) \
         .eq("project_id", str(project_id)) \
         .execute()
+    await invalidate_entities("project", {"id": str(project_id)})
     return len(result.data) > 0
 
 
@@ -328,18 +374,19 @@ async def bulk_invite_members(
 # Ingestion Progress
 # =============================================================================
 
+@coalesce
 async def get_ingestion_progress(
     client: SupabaseClient,
     project_id: str | UUID,
 ) -> dict | None:
     """Get current ingestion progress for a project."""
-    result = client.table("ingestion_progress") \
+    query = client.table("ingestion_progress") \
         .select("*") \
         .eq("project_id", str(project_id)) \
         .is_("completed_at", "null") \
         .order("started_at", desc=True) \
-        .limit(1) \
-        .execute()
+        .limit(1)
+    result = await run_query(query)
     return result.data[0] if result.data else None
 
 
@@ -347,6 +394,7 @@ async def get_ingestion_progress(
 # Project Files
 # =============================================================================
 
+@coalesce
 async def list_project_files(
     client: SupabaseClient,
     project_id: str | UUID,
@@ -360,7 +408,7 @@ async def list_project_files(
     )
     query = query.eq("project_id", str(project_id))
 
-    result = query.execute()
+    result = await run_query(query)
     total = result.count or 0
 
     return {
@@ -1,12 +1,25 @@
 """Reflexes service — Supabase CRUD operations for reflexes."""
 
 import secrets
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from supabase import Client as SupabaseClient
 
+from server.app.models.reflex import ReflexResponse
 from server.app.services.database import build_filtered_query
+from server.app.services.fieldsets import Fieldset
+from server.app.services.response_cache import invalidate_entities
+from server.app.services.sync import changes_since
+
+# ?fields= on GET /reflexes; skill_id keeps the skill:{id} cache tag
+LIST_FIELDS = Fieldset(
+    ReflexResponse,
+    default="*, skills(name, category, is_active)",
+    embeds={"skills": "skills(name, category, is_active)"},
+    always=("id", "skill_id"),
+)
 
 
 async def list_reflexes(
@@ -16,6 +29,7 @@ async def list_reflexes(
     skill_id: str | None = None,
     trigger_type: str | None = None,
     is_active: bool | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """List reflexes (RLS-scoped to current user)."""
     filters = {}
@@ -28,7 +42,7 @@ async def list_reflexes(
 
     query = build_filtered_query(
         client, "reflexes",
-        select="*, skills(name, category, is_active)",
+        select=LIST_FIELDS.select(fields),
         filters=filters, page=page, page_size=page_size,
     )
     result = query.execute()
@@ -42,6 +56,13 @@ async def list_reflexes(
     }
 
 
+async def list_reflex_changes(client: SupabaseClient, since: datetime | None) -> dict[str, Any]:
+    """Reflexes changed or deleted since a sync cursor (RLS-scoped to current user)."""
+    return await changes_since(
+        client, "reflexes", since, select="*, skills(name, category, is_active)",
+    )
+
+
 async def get_reflex(client: SupabaseClient, reflex_id: str | UUID) -> dict | None:
     """Get a single reflex with related skill info."""
     result = (
@@ -69,6 +90,7 @@ async def create_reflex(
         "is_active": data.get("is_active", True),
     }
     result = client.table("reflexes").insert(insert_data).execute()
+    await invalidate_entities("reflex", result.data)
     return result.data[0] if result.data else {}
 
 
@@ -87,12 +109,14 @@ async def update_reflex(
         .eq("id", str(reflex_id))
         .execute()
     )
+    await invalidate_entities("reflex", result.data)
     return result.data[0] if result.data else None
 
 
 async def delete_reflex(client: SupabaseClient, reflex_id: str | UUID) -> bool:
     """Delete a reflex."""
     result = client.table("reflexes").delete().eq("id", str(reflex_id)).execute()
+    await invalidate_entities("reflex", result.data)
     return len(result.data) > 0
 
 
@@ -108,6 +132,7 @@ async def toggle_reflex(client: SupabaseClient, reflex_id: str | UUID) -> dict |
         .eq("id", str(reflex_id))
         .execute()
     )
+    await invalidate_entities("reflex", result.data)
     return result.data[0] if result.data else None
 
 
@@ -0,0 +1,348 @@
+"""Response cache — Redis-backed cache of serialized GET responses.
+
+Read-heavy dashboard endpoints (/skills, /habits, /reflexes, /projects/{id},
+the stats endpoints) are polled far more often than they change. Routers
+wrap their service call in ``response_cache.serve()``, which stores the
+serialized JSON body under
+
+    rcache:{scope}:{digest(path + sorted query)}
+
+where scope is the user (user-scoped tables) or the org (org-scoped tables),
+so an entry is only ever served to callers that would see the same rows
+under RLS. A hit returns the stored bytes: no PostgREST call and no
+response-model serialization.
+
+Invalidation is tag based. Every entry records the version of each tag it
+depends on (rcache:tag:{tag}), e.g.
+
+    skill:{id}              one entity (detail pages, lists containing it)
+    user:{user_id}:skills   a user's skill lists and stats
+    org:{org_id}:projects   an org's project lists
+
+Mutations in services/*.py call ``invalidate_entities()``, which bumps the
+versions, so every entry built on the old version is ignored from then on.
+Versions are read before the upstream query, so a write that lands while
+an entry is being built also invalidates that entry. Writes by background
+workers (habit runs, executions) do not invalidate; RESPONSE_CACHE_TTL
+bounds how stale those fields can get.
+
+With RESPONSE_CACHE_STALE_TTL > 0, an expired but still valid entry is
+served once more while it is reloaded in the background (stale-while-
+revalidate). Entries invalidated by a tag are never served.
+
+Every response carries a strong ETag (a hash of the body). An entry stores
+its ETag next to the body, so a matching If-None-Match is answered 304 from
+the entry's metadata alone: no PostgREST call, no body read or serialized.
+Routes that are not cached use ``conditional_response()`` for the same
+ETag/304 handling.
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from server.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ENTRY_KEY = "rcache:{scope}:{digest}"
+TAG_KEY = "rcache:tag:{tag}"
+
+# Tag versions must outlive every entry that recorded them
+TAG_TTL_SECONDS = 24 * 3600
+
+# kind → (owner prefix, owner column, list name)
+_OWNERS = {
+    "skill": ("user", "user_id", "skills"),
+    "habit": ("user", "user_id", "habits"),
+    "reflex": ("user", "user_id", "reflexes"),
+    "project": ("org", "organization_id", "projects"),
+}
+
+# kind → related kinds whose cached pages embed or count this entity
+_RELATED = {
+    "skill": (),
+    "habit": ("skill",),
+    "reflex": ("skill",),
+    "project": (),
+}
+
+
+# =============================================================================
+# Tags
+# =============================================================================
+
+def _as_rows(rows: dict | Iterable[dict] | None) -> list[dict]:
+    if rows is None:
+        return []
+    if isinstance(rows, dict):
+        return [rows]
+    return [row for row in rows if isinstance(row, dict)]
+
+
+def list_tag(kind: str, owner_id: str) -> str:
+    """Tag of every list/stats page of ``kind`` owned by a user or org."""
+    prefix, _, name = _OWNERS[kind]
+    return f"{prefix}:{owner_id}:{name}"
+
+
+def entity_tags(kind: str, rows: dict | Iterable[dict] | None) -> list[str]:
+    """Tags of cached pages that contain these rows (entity + related entities)."""
+    tags: list[str] = []
+    for row in _as_rows(rows):
+        if row.get("id"):
+            tags.append(f"{kind}:{row['id']}")
+        for related in _RELATED[kind]:
+            if row.get(f"{related}_id"):
+                tags.append(f"{related}:{row[f'{related}_id']}")
+    return tags
+
+
+def mutation_tags(kind: str, rows: dict | Iterable[dict] | None) -> list[str]:
+    """Everything a write to these rows makes stale: entities and owner lists."""
+    _, owner_column, _ = _OWNERS[kind]
+    tags = entity_tags(kind, rows)
+    for row in _as_rows(rows):
+        if row.get(owner_column):
+            tags.append(list_tag(kind, row[owner_column]))
+    return tags
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+@functools.lru_cache(maxsize=None)
+def _adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def _serialize(response_model: Any, data: Any) -> bytes:
+    # Same validation + by_alias JSON dump FastAPI applies for response_model
+    adapter = _adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(data), by_alias=True)
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag of a serialized response body."""
+    return '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers ``etag`` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def conditional_response(request: Request, response_model: Any, data: Any) -> Response:
+    """Serialize ``data`` with an ETag, or answer 304 if the client has it."""
+    body = _serialize(response_model, data)
+    return _response(request, body, make_etag(body), "BYPASS")
+
+
+def _response(request: Request, body: bytes | str | None, etag: str, status: str) -> Response:
+    headers = {"ETag": etag, "X-Cache": status}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _digest(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return hashlib.blake2b(f"{request.url.path}?{query}".encode(), digest_size=16).hexdigest()
+
+
+class ResponseCache:
+    """Tag-invalidated cache of serialized GET responses in Redis."""
+
+    def __init__(self, ttl: int | None = None, stale_ttl: int | None = None) -> None:
+        self.ttl = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = settings.RESPONSE_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self._refreshing: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def serve(
+        self,
+        request: Request,
+        loader: Callable[[], Awaitable[Any]],
+        response_model: Any,
+        scope: str,
+        tags: Iterable[str] = (),
+        row_tags: Callable[[Any], Iterable[str]] | None = None,
+        redis_client=None,
+    ) -> Response | None:
+        """Serve a GET from cache, or run ``loader`` and cache its result.
+
+        ``scope`` must identify everyone allowed to see the same result
+        (``user:{sub}`` or ``org:{org_id}``). ``tags`` are known up front;
+        ``row_tags`` derives more from the loaded data. Returns None, and
+        caches nothing, when the loader finds nothing.
+        """
+        if self.ttl <= 0:
+            data = await loader()
+            return conditional_response(request, response_model, data) if data else None
+
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        key = ENTRY_KEY.format(scope=scope, digest=_digest(request))
+        tags = sorted(set(tags))
+
+        if "no-cache" not in request.headers.get("cache-control", ""):
+            try:
+                entry = await self._get_valid(redis_client, key, request)
+            except Exception as e:
+                logger.debug("Response cache read failed (%s): %s", key, e)
+                self.errors += 1
+                entry = None
+
+            if entry is not None:
+                fresh = float(entry["fresh"]) > time.time()
+                if fresh:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._revalidate(redis_client, key, loader, response_model, tags, row_tags)
+                return _response(request, entry.get("body"), entry["etag"], "HIT" if fresh else "STALE")
+
+        self.misses += 1
+        loaded = await self._load(redis_client, key, loader, response_model, tags, row_tags)
+        return None if loaded is None else _response(request, *loaded, "MISS")
+
+    def _revalidate(self, redis_client, key: str, *load_args) -> None:
+        """Reload ``key`` in the background, once per process at a time."""
+        if key not in self._refreshing:
+            task = asyncio.create_task(self._load(redis_client, key, *load_args))
+            self._refreshing[key] = task
+            task.add_done_callback(functools.partial(self._refresh_done, key))
+
+    async def _get_valid(self, redis_client, key: str, request: Request) -> dict[str, str] | None:
+        """The entry at ``key`` if none of its tags moved since it was stored.
+
+        Conditional requests read the metadata first and only fetch the
+        body when the client's copy is out of date.
+        """
+        conditional = "if-none-match" in request.headers
+        if conditional:
+            tags, fresh, etag = await redis_client.hmget(key, ["tags", "fresh", "etag"])
+            entry = {"tags": tags, "fresh": fresh, "etag": etag} if etag else {}
+        else:
+            entry = await redis_client.hgetall(key)
+        if not entry.get("etag"):
+            return None
+
+        recorded: dict[str, int] = json.loads(entry["tags"])
+        if recorded:
+            current = await redis_client.mget([TAG_KEY.format(tag=tag) for tag in recorded])
+            if any(int(v or 0) != recorded[tag] for tag, v in zip(recorded, current)):
+                return None
+
+        if conditional and not etag_matches(request, entry["etag"]):
+            entry["body"] = await redis_client.hget(key, "body")
+            if entry["body"] is None:
+                return None
+        return entry
+
+    async def _load(
+        self,
+        redis_client,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        response_model: Any,
+        tags: list[str],
+        row_tags: Callable[[Any], Iterable[str]] | None,
+    ) -> tuple[bytes, str] | None:
+        # Versions first: a write racing the query leaves the entry stale, not wrong
+        try:
+            versions = await self._versions(redis_client, tags)
+        except Exception as e:
+            logger.debug("Response cache version read failed (%s): %s", key, e)
+            self.errors += 1
+            versions = None
+
+        data = await loader()
+        if not data:
+            return None
+        body = _serialize(response_model, data)
+        etag = make_etag(body)
+        if versions is None:
+            return body, etag
+
+        try:
+            extra = sorted(set(row_tags(data)) - set(versions)) if row_tags else []
+            versions.update(await self._versions(redis_client, extra))
+            pipe = redis_client.pipeline(transaction=True)
+            pipe.hset(key, mapping={
+                "body": body.decode(),
+                "etag": etag,
+                "tags": json.dumps(versions),
+                "fresh": time.time() + self.ttl,
+            })
+            pipe.expire(key, self.ttl + max(self.stale_ttl, 0))
+            await pipe.execute()
+        except Exception as e:
+            logger.debug("Response cache write failed (%s): %s", key, e)
+            self.errors += 1
+        return body, etag
+
+    async def _versions(self, redis_client, tags: list[str]) -> dict[str, int]:
+        if not tags:
+            return {}
+        values = await redis_client.mget([TAG_KEY.format(tag=tag) for tag in tags])
+        return {tag: int(v or 0) for tag, v in zip(tags, values)}
+
+    def _refresh_done(self, key: str, task: asyncio.Task) -> None:
+        self._refreshing.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Response cache revalidation failed (%s): %s", key, task.exception())
+
+    async def invalidate(self, tags: Iterable[str], redis_client=None) -> None:
+        """Bump tag versions; entries recorded against older versions die."""
+        tags = sorted(set(tags))
+        if not tags:
+            return
+
+        try:
+            if redis_client is None:
+                from server.app.dependencies import get_redis
+                redis_client = await get_redis()
+            pipe = redis_client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(TAG_KEY.format(tag=tag))
+                pipe.expire(TAG_KEY.format(tag=tag), TAG_TTL_SECONDS)
+            await pipe.execute()
+        except Exception as e:
+            # Entries still expire after RESPONSE_CACHE_TTL (+ stale window)
+            logger.warning("Response cache invalidation failed (%s): %s", ", ".join(tags), e)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "refreshing": len(self._refreshing),
+        }
+
+
+# Process-wide cache
+response_cache = ResponseCache()
+
+
+async def invalidate_entities(kind: str, rows: dict | Iterable[dict] | None) -> None:
+    """Invalidate cached pages affected by a write to ``kind`` rows."""
+    await response_cache.invalidate(mutation_tags(kind, rows))
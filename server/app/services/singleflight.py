@@ -0,0 +1,131 @@
+"""Single-flight — share one upstream call between identical concurrent reads.
+
+When a dashboard opens in several tabs, or a page fires the same request
+twice, identical GETs arrive together and each would run the same
+PostgREST query. Service read functions decorated with ``@coalesce`` key
+every call on
+
+    (function, tenant, normalized arguments)
+
+and while a call with that key is in flight, later callers await its
+result instead of issuing their own query. Nothing is cached: once the
+call finishes the next caller starts a new one.
+
+The tenant is the caller's bearer token (the Authorization header of the
+per-request Supabase client), so only callers PostgREST would answer
+identically under RLS ever share a result. The query itself runs in a
+worker thread (supabase-py is synchronous), otherwise the event loop
+could never interleave two identical requests in the first place.
+
+The shared call runs as its own task: a caller that disconnects does not
+cancel it for the others. Followers get a deep copy of the result, so
+routers may still normalize what they receive in place. A read that joins
+a call started just before a write may miss that write; the window is one
+query long, the same as if the read had arrived a moment earlier.
+"""
+
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+from typing import Any, Awaitable, Callable, TypeVar
+from uuid import UUID
+
+T = TypeVar("T")
+
+
+def _tenant(client: Any) -> str:
+    """Digest of the credential PostgREST evaluates RLS against."""
+    postgrest = getattr(client, "postgrest", None)
+    headers = getattr(postgrest, "headers", None)
+    credential = headers.get("Authorization") if headers is not None else None
+    if not isinstance(credential, str):
+        # No readable credential (e.g. a test double): never share
+        return f"client:{id(client)}"
+    return hashlib.blake2b(credential.encode(), digest_size=16).hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_normalize(v) for v in value]
+        return tuple(sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in value.items()))
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+class SingleFlight:
+    """In-flight call registry with per-function coalescing counters."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._counters: dict[str, dict[str, int]] = {}
+
+    async def do(self, key: tuple, name: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call`` once for all concurrent callers with the same key."""
+        counters = self._counters.setdefault(name, {"calls": 0, "coalesced": 0, "failures": 0})
+        task = self._inflight.get(key)
+        if task is not None:
+            counters["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        counters["calls"] += 1
+        task = asyncio.ensure_future(call())
+        self._inflight[key] = task
+        task.add_done_callback(functools.partial(self._done, key, counters))
+        return await asyncio.shield(task)
+
+    def _done(self, key: tuple, counters: dict[str, int], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            counters["failures"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        calls = sum(c["calls"] for c in self._counters.values())
+        coalesced = sum(c["coalesced"] for c in self._counters.values())
+        return {
+            "in_flight": len(self._inflight),
+            "calls": calls,
+            "coalesced": coalesced,
+            "ratio": round(coalesced / max(calls + coalesced, 1), 3),
+            "by_function": {name: dict(c) for name, c in sorted(self._counters.items())},
+        }
+
+
+# Process-wide registry
+singleflight = SingleFlight()
+
+
+def coalesce(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Coalesce concurrent identical calls of a read-only service function.
+
+    ``fn`` takes the request's Supabase client as its first argument; the
+    remaining arguments (defaults applied, UUIDs as strings) form the key.
+    """
+    signature = inspect.signature(fn)
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    async def wrapper(client, *args, **kwargs):
+        bound = signature.bind(client, *args, **kwargs)
+        bound.apply_defaults()
+        params = tuple((k, _normalize(v)) for k, v in list(bound.arguments.items())[1:])
+        key = (name, _tenant(client), params)
+        return await singleflight.do(key, name, lambda: fn(client, *args, **kwargs))
+
+    return wrapper
+
+
+async def run_query(query: Any) -> Any:
+    """Execute a PostgREST query builder in a worker thread."""
+    return await asyncio.to_thread(query.execute)
@@ -1,11 +1,19 @@
 """Skills service — Supabase CRUD operations for skills."""
 
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
 from supabase import Client as SupabaseClient
 
+from server.app.models.skill import SkillResponse
 from server.app.services.database import build_filtered_query
+from server.app.services.fieldsets import Fieldset
+from server.app.services.response_cache import invalidate_entities
+from server.app.services.sync import changes_since
+
+# ?fields= on GET /skills
+LIST_FIELDS = Fieldset(SkillResponse)
 
 
 async def list_skills(
@@ -15,6 +23,7 @@ async def list_skills(
     category: str | None = None,
     is_active: bool | None = None,
     search: str | None = None,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """List skills (RLS-scoped to current user)."""
     filters = {}
@@ -24,7 +33,8 @@ async def list_skills(
         filters["is_active"] = is_active
 
     query = build_filtered_query(
-        client, "skills", filters=filters, page=page, page_size=page_size,
+        client, "skills", select=LIST_FIELDS.select(fields),
+        filters=filters, page=page, page_size=page_size,
     )
     if search:
         query = query.ilike("name", f"%{search}%")
@@ -40,6 +50,11 @@ async def list_skills(
     }
 
 
+async def list_skill_changes(client: SupabaseClient, since: datetime | None) -> dict[str, Any]:
+    """Skills changed or deleted since a sync cursor (RLS-scoped to current user)."""
+    return await changes_since(client, "skills", since)
+
+
 async def get_skill(client: SupabaseClient, skill_id: str | UUID) -> dict | None:
     result = client.table("skills").select("*").eq("id", str(skill_id)).single().execute()
     return result.data
@@ -65,6 +80,7 @@ async def create_skill(client: SupabaseClient, data: dict[str, Any], user_id: st
         "output_format": data.get("output_format", "markdown"),
     }
     result = client.table("skills").insert(insert_data).execute()
+    await invalidate_entities("skill", result.data)
     return result.data[0] if result.data else {}
 
 
@@ -73,11 +89,13 @@ async def update_skill(client: SupabaseClient, skill_id: str | UUID, data: dict[
     if not update_data:
         return await get_skill(client, skill_id)
     result = client.table("skills").update(update_data).eq("id", str(skill_id)).execute()
+    await invalidate_entities("skill", result.data)
     return result.data[0] if result.data else None
 
 
 async def delete_skill(client: SupabaseClient, skill_id: str | UUID) -> bool:
     result = client.table("skills").delete().eq("id", str(skill_id)).execute()
+    await invalidate_entities("skill", result.data)
     return len(result.data) > 0
 
 
@@ -85,10 +103,12 @@ async def bulk_action(client: SupabaseClient, skill_ids: list[str], action: str)
     """Perform bulk action on skills."""
     if action == "delete":
         result = client.table("skills").delete().in_("id", skill_ids).execute()
+        await invalidate_entities("skill", result.data)
         return {"affected": len(result.data), "action": action}
     elif action in ("activate", "deactivate"):
         is_active = action == "activate"
         result = client.table("skills").update({"is_active": is_active}).in_("id", skill_ids).execute()
+        await invalidate_entities("skill", result.data)
         return {"affected": len(result.data), "action": action}
     return {"affected": 0, "action": action}
 
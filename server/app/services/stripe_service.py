@@ -17,6 +17,9 @@ logger = logging.getLogger(__name__)
 
 # Configure Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    # e.g. a local stripe-mock / stand-in for tests
+    stripe.api_base = settings.STRIPE_API_BASE
 
 # =============================================================================
 # Plan Pricing Configuration
@@ -150,15 +153,24 @@ def create_checkout_session(
     billing_interval: str,
     success_url: str,
     cancel_url: str,
+    org_id: str | None = None,
 ) -> stripe.checkout.Session:
     """Create a Stripe Checkout session with iDEAL + card support.
 
-    Returns a session with a URL to redirect the user to.
+    Returns a session with a URL to redirect the user to. ``org_id`` is
+    copied into the session and subscription metadata so webhooks can
+    tell which org's entitlements changed.
     """
     price_id = PLAN_PRICES.get((plan, billing_interval))
     if not price_id:
         raise ValueError(f"No price configured for {plan}/{billing_interval}")
 
+    metadata = {"plan": plan, "billing_interval": billing_interval}
+    extra = {}
+    if org_id:
+        metadata["org_id"] = org_id
+        extra["subscription_data"] = {"metadata": dict(metadata)}
+
     session = stripe.checkout.Session.create(
         customer=customer_id,
         mode="subscription",
@@ -166,13 +178,44 @@ def create_checkout_session(
         line_items=[{"price": price_id, "quantity": 1}],
         success_url=success_url + "?session_id={CHECKOUT_SESSION_ID}",
         cancel_url=cancel_url,
-        metadata={"plan": plan, "billing_interval": billing_interval},
+        metadata=metadata,
         locale="nl",
         allow_promotion_codes=True,
+        **extra,
     )
     return session
 
 
+# =============================================================================
+# Usage Metering
+# Mapping: usage category → Stripe Billing Meter event name.
+# Only counters are metered; seats and storage are plan limits, not usage.
+# =============================================================================
+
+METER_EVENTS: dict[str, str] = {
+    "api_calls": "kijko_api_calls",
+    "ingestions": "kijko_ingestions",
+    "oracle_queries": "kijko_oracle_queries",
+}
+
+
+def report_meter_event(
+    customer_id: str,
+    event_name: str,
+    value: int,
+    identifier: str,
+) -> stripe.billing.MeterEvent:
+    """Report ``value`` units of overage usage for a customer.
+
+    ``identifier`` must be stable for the same units: Stripe drops a
+    meter event whose identifier it has already seen, so resending is safe.
+    """
+    return stripe.billing.MeterEvent.create(
+        event_name=event_name,
+        payload={"stripe_customer_id": customer_id, "value": str(value)},
+        identifier=identifier,
+    )
+
 # =============================================================================
 # Subscription Management
 # =============================================================================
@@ -2,11 +2,26 @@
 
 Replaces KeycloakService for authentication. Uses Supabase GoTrue
 for user management and HS256 JWT validation with the shared secret.
+
+Signup, login and refresh call the GoTrue REST API directly over one
+pooled httpx client. No supabase client is built per call, and nothing
+keeps session state, so concurrent requests cannot see each other's
+sessions.
+
+Verified claims are cached per process (VerifiedClaimsCache), keyed by a
+digest of the token and dropped at the token's exp, so a dashboard
+session reusing one token is decoded once. logout() revokes the token
+in every process through Redis (REVOCATION_CHANNEL).
 """
 
+import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict
 from typing import Any
 
+import httpx
 import jwt
 from fastapi import HTTPException, status
 from supabase import Client as SupabaseClient
@@ -15,10 +30,161 @@ from server.app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# GoTrue HTTP client: per-call timeout and connection pool size
+GOTRUE_TIMEOUT = 10.0
+GOTRUE_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+REVOCATION_CHANNEL = "auth:revoked"
+REVOCATION_KEY = "auth:revoked:{digest}"
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
+
+def _copy_claims(claims: dict[str, Any]) -> dict[str, Any]:
+    # Callers may mutate what they get back; the cached entry must not change
+    return {**claims, "roles": list(claims.get("roles", []))}
+
+
+# =============================================================================
+# Verified Claims Cache
+# =============================================================================
+
+class VerifiedClaimsCache:
+    """Bounded LRU of token digest → normalised claims, plus revoked digests.
+
+    Entries expire at the token's own exp. Revoked digests are kept until
+    that exp too, after which the token is rejected as expired anyway.
+    """
+
+    def __init__(self, max_size: int | None = None) -> None:
+        self.max_size = settings.AUTH_CLAIMS_CACHE_SIZE if max_size is None else max_size
+        self._claims: OrderedDict[str, tuple[dict[str, Any], float]] = OrderedDict()
+        self._revoked: dict[str, float] = {}
+        self._listener_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest: str) -> dict[str, Any] | None:
+        cached = self._claims.get(digest)
+        if cached is None:
+            self.misses += 1
+            return None
+        if cached[1] <= time.time():
+            del self._claims[digest]
+            self.misses += 1
+            return None
+        self._claims.move_to_end(digest)
+        self.hits += 1
+        return _copy_claims(cached[0])
+
+    def put(self, digest: str, claims: dict[str, Any]) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)) or self.max_size <= 0:
+            return
+        self._claims[digest] = (_copy_claims(claims), float(exp))
+        self._claims.move_to_end(digest)
+        while len(self._claims) > self.max_size:
+            self._claims.popitem(last=False)
+
+    def is_revoked(self, digest: str) -> bool:
+        return digest in self._revoked
+
+    def revoke(self, digest: str, exp: float) -> None:
+        """Reject this token in this process until ``exp``."""
+        self._claims.pop(digest, None)
+        self._prune_revoked()
+        if exp > time.time():
+            self._revoked[digest] = exp
+
+    def _prune_revoked(self) -> None:
+        now = time.time()
+        for digest in [d for d, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[digest]
+
+    def clear(self) -> None:
+        """Drop cached claims (revocations are kept)."""
+        self._claims.clear()
+
+    # -------------------------------------------------------------------------
+    # Revocation listener
+    # -------------------------------------------------------------------------
+
+    def start_listener(self) -> None:
+        """Start the pub/sub revocation listener (idempotent)."""
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        """Cancel the pub/sub revocation listener."""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+            self._listener_task = None
+
+    async def _load_revoked(self, redis_client) -> None:
+        """Pick up revocations published before this process subscribed."""
+        prefix = REVOCATION_KEY.format(digest="")
+        keys = [key async for key in redis_client.scan_iter(match=prefix + "*", count=1000)]
+        if not keys:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        now = time.time()
+        for key, ttl in zip(keys, await pipe.execute()):
+            if ttl and ttl > 0:
+                self.revoke(key[len(prefix):], now + ttl)
+
+    async def _listen(self, redis_client=None) -> None:
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                await self._load_revoked(redis_client)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        digest, _, exp = message["data"].partition(":")
+                        self.revoke(digest, float(exp or 0))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Revocations may have been missed: re-verify every token
+                logger.warning("Token revocation listener disconnected: %s", e)
+                self.clear()
+                await asyncio.sleep(5.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._claims),
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Process-wide cache, shared by every SupabaseAuthService instance
+verified_claims = VerifiedClaimsCache()
+
 
 class SupabaseAuthService:
     """Authentication service backed by Supabase Auth (GoTrue)."""
 
+    _http_client: httpx.AsyncClient | None = None
+
     def __init__(self, client: SupabaseClient) -> None:
         self._client = client
         self._jwt_secret = settings.SUPABASE_JWT_SECRET
@@ -28,6 +194,26 @@ class SupabaseAuthService:
             settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY
         )
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Lazy-init pooled client for the GoTrue REST API (anon key)."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1",
+                headers={
+                    "apikey": settings.SUPABASE_ANON_KEY,
+                    "Authorization": f"Bearer {settings.SUPABASE_ANON_KEY}",
+                },
+                timeout=GOTRUE_TIMEOUT,
+                limits=GOTRUE_POOL_LIMITS,
+            )
+        return self._http_client
+
+    async def close(self) -> None:
+        """Close the GoTrue HTTP client."""
+        if self._http_client and not self._http_client.is_closed:
+            await self._http_client.aclose()
+
     # =========================================================================
     # Token Validation
     # =========================================================================
@@ -36,13 +222,28 @@ class SupabaseAuthService:
         """Validate a Supabase JWT and return normalised claims.
 
         Supabase JWTs are HS256 signed with the shared JWT secret.
+        Claims of a token verified before are served from
+        ``verified_claims`` until the token expires; revoked tokens are
+        rejected without decoding.
 
         Returns:
             Dict with: sub, email, org_id, roles, first_name, last_name
 
         Raises:
-            HTTPException(401) on invalid/expired token
+            HTTPException(401) on invalid/expired/revoked token
         """
+        digest = _token_digest(token)
+        if verified_claims.is_revoked(digest):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        cached = verified_claims.get(digest)
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(
                 token,
@@ -68,7 +269,9 @@ class SupabaseAuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        return self._extract_claims(payload)
+        claims = self._extract_claims(payload)
+        verified_claims.put(digest, claims)
+        return claims
 
     def _extract_claims(self, payload: dict[str, Any]) -> dict[str, Any]:
         """Extract normalised claims from Supabase JWT payload.
@@ -101,6 +304,7 @@ class SupabaseAuthService:
             "last_name": user_meta.get("last_name", ""),
             "org_id": org_id,
             "roles": roles,
+            "exp": payload.get("exp"),
         }
 
     # =========================================================================
@@ -120,72 +324,68 @@ class SupabaseAuthService:
         returns access + refresh tokens (auto-login).
         """
         try:
-            # Use a fresh client — sign_up mutates the client's auth state
-            from supabase import create_client
-            signup_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-            result = signup_client.auth.sign_up({
+            resp = await self.http_client.post("/signup", json={
                 "email": email,
                 "password": password,
-                "options": {
-                    "data": {
-                        "first_name": first_name,
-                        "last_name": last_name,
-                    },
+                "data": {
+                    "first_name": first_name,
+                    "last_name": last_name,
                 },
             })
-        except Exception as e:
-            error_msg = str(e)
+        except httpx.HTTPError as e:
+            logger.error("Supabase signup failed: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create user",
+            )
+
+        if resp.status_code >= 400:
+            error_msg = _gotrue_error(resp)
             if "already registered" in error_msg.lower() or "already been registered" in error_msg.lower():
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="A user with this email already exists",
                 )
-            logger.error("Supabase signup failed: %s", e)
+            logger.error("Supabase signup failed: %d %s", resp.status_code, error_msg)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create user",
             )
 
-        if not result.session:
+        result = resp.json()
+        if not result.get("access_token"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Signup succeeded but no session returned (email confirmation may be required)",
             )
 
         # Auto-assign org_id to the new user (use their user_id as default org)
-        user_id = result.user.id
+        user_id = str(result["user"]["id"])
         try:
-            self._admin_client.auth.admin.update_user_by_id(
-                str(user_id),
-                {"app_metadata": {"org_id": str(user_id), "roles": ["member"]}},
+            update = await self.http_client.put(
+                f"/admin/users/{user_id}",
+                json={"app_metadata": {"org_id": user_id, "roles": ["member"]}},
+                headers={
+                    "apikey": settings.SUPABASE_SERVICE_KEY,
+                    "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+                },
             )
-        except Exception as e:
+            update.raise_for_status()
+        except httpx.HTTPError as e:
             logger.warning("Failed to set org_id on new user: %s", e)
 
-        # Re-login with a throwaway client to get JWT with updated app_metadata
+        # Log in again to get a JWT with the updated app_metadata
         try:
-            from supabase import create_client
-            tmp_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-            login_result = tmp_client.auth.sign_in_with_password({
-                "email": email,
-                "password": password,
-            })
-            if login_result.session:
-                return {
-                    "access_token": login_result.session.access_token,
-                    "refresh_token": login_result.session.refresh_token,
-                    "token_type": "Bearer",
-                    "expires_in": login_result.session.expires_in or 3600,
-                }
-        except Exception as e:
+            relogin = await self._token_grant(
+                "password", {"email": email, "password": password}
+            )
+            if relogin.status_code < 400:
+                return _session_response(relogin.json())
+            logger.warning("Post-signup re-login failed, using initial token: %s", _gotrue_error(relogin))
+        except httpx.HTTPError as e:
             logger.warning("Post-signup re-login failed, using initial token: %s", e)
 
-        return {
-            "access_token": result.session.access_token,
-            "refresh_token": result.session.refresh_token,
-            "token_type": "Bearer",
-            "expires_in": result.session.expires_in or 3600,
-        }
+        return _session_response(result)
 
     async def login(self, email: str, password: str) -> dict[str, Any]:
         """Authenticate with email/password.
@@ -194,71 +394,95 @@ class SupabaseAuthService:
             Token response with access_token, refresh_token, expires_in
         """
         try:
-            # Use a fresh client — sign_in mutates the client's auth state
-            from supabase import create_client
-            login_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-            result = login_client.auth.sign_in_with_password({
-                "email": email,
-                "password": password,
-            })
-        except Exception as e:
-            error_msg = str(e)
-            if "invalid" in error_msg.lower() or "credentials" in error_msg.lower():
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid email or password",
-                )
+            resp = await self._token_grant("password", {"email": email, "password": password})
+        except httpx.HTTPError as e:
             logger.error("Supabase login failed: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Authentication service unavailable",
             )
 
-        if not result.session:
+        if resp.status_code >= 500:
+            logger.error("Supabase login failed: %d %s", resp.status_code, _gotrue_error(resp))
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service unavailable",
+            )
+
+        if resp.status_code >= 400 or not resp.json().get("access_token"):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password",
             )
 
-        return {
-            "access_token": result.session.access_token,
-            "refresh_token": result.session.refresh_token,
-            "token_type": "Bearer",
-            "expires_in": result.session.expires_in or 3600,
-        }
+        return _session_response(resp.json())
 
     async def refresh(self, refresh_token: str) -> dict[str, Any]:
         """Refresh an access token using a refresh token."""
         try:
-            from supabase import create_client
-            tmp_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
-            result = tmp_client.auth.refresh_session(refresh_token)
-        except Exception as e:
+            resp = await self._token_grant("refresh_token", {"refresh_token": refresh_token})
+        except httpx.HTTPError as e:
             logger.warning("Token refresh failed: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired refresh token",
             )
 
-        if not result.session:
+        if resp.status_code >= 400 or not resp.json().get("access_token"):
+            logger.warning("Token refresh failed: %d %s", resp.status_code, _gotrue_error(resp))
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid or expired refresh token",
             )
 
-        return {
-            "access_token": result.session.access_token,
-            "refresh_token": result.session.refresh_token,
-            "token_type": "Bearer",
-            "expires_in": result.session.expires_in or 3600,
-        }
+        return _session_response(resp.json())
+
+    async def _token_grant(self, grant_type: str, body: dict[str, Any]) -> httpx.Response:
+        """POST /token — GoTrue's password and refresh_token grants."""
+        return await self.http_client.post("/token", params={"grant_type": grant_type}, json=body)
 
     async def logout(self, access_token: str) -> None:
-        """Sign out (invalidate session server-side)."""
+        """Sign out (invalidate session server-side) and revoke the token."""
         try:
             self._admin_client.auth.admin.sign_out(access_token)
         except Exception as e:
             logger.warning("Logout failed: %s (best-effort)", e)
+        await self.revoke_token(access_token)
+
+    async def revoke_token(self, access_token: str, redis_client=None) -> None:
+        """Reject an access token until it expires, in every API process.
+
+        Only tokens we issued are revoked: anything that fails signature
+        verification (forged, not a JWT, e.g. a refresh token) or has
+        already expired is ignored, so unauthenticated callers cannot fill
+        the revocation set. Revocation is local first; the Redis broadcast
+        is best-effort.
+        """
+        try:
+            exp = jwt.decode(
+                access_token,
+                self._jwt_secret,
+                algorithms=["HS256"],
+                audience="authenticated",
+            ).get("exp")
+        except jwt.InvalidTokenError:
+            return
+        if not isinstance(exp, (int, float)) or exp <= time.time():
+            return
+
+        digest = _token_digest(access_token)
+        verified_claims.revoke(digest, exp)
+
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        try:
+            ttl = max(1, int(exp - time.time()) + 1)
+            await redis_client.set(REVOCATION_KEY.format(digest=digest), 1, ex=ttl)
+            await redis_client.publish(REVOCATION_CHANNEL, f"{digest}:{exp}")
+        except Exception as e:
+            logger.warning("Token revocation broadcast failed: %s", e)
 
     async def get_user(self, access_token: str) -> dict[str, Any] | None:
         """Get the user profile for a given access token."""
@@ -285,6 +509,30 @@ class SupabaseAuthService:
             return None
 
 
+def _session_response(session: dict[str, Any]) -> dict[str, Any]:
+    """Token response from a GoTrue session object."""
+    return {
+        "access_token": session["access_token"],
+        "refresh_token": session.get("refresh_token", ""),
+        "token_type": "Bearer",
+        "expires_in": session.get("expires_in") or 3600,
+    }
+
+
+def _gotrue_error(resp: httpx.Response) -> str:
+    """Error message from a GoTrue error response (old and new formats)."""
+    try:
+        data = resp.json()
+    except ValueError:
+        return resp.text
+    if not isinstance(data, dict):
+        return str(data)
+    for field in ("msg", "message", "error_description", "error"):
+        if isinstance(data.get(field), str):
+            return data[field]
+    return str(data)
+
+
 # ---------------------------------------------------------------------------
 # Singleton
 # ---------------------------------------------------------------------------
@@ -0,0 +1,84 @@
+"""Delta sync — rows changed and deleted since a client's cursor.
+
+Backs GET /skills/changes, /habits/changes, /reflexes/changes and
+/projects/changes. Instead of refetching whole lists, a client keeps its
+own copy and asks for what moved since the cursor it was last given:
+
+    changes   rows with updated_at >= since (upserts, same shape as the list)
+    deleted   IDs from deleted_records (tombstones written by a DB trigger,
+              database/008_sync_tombstones.sql) since the cursor
+
+The next cursor is the time the query started minus SYNC_CURSOR_OVERLAP:
+updated_at is the writing transaction's start time, so a slow transaction
+can commit rows stamped before our query began. Overlapping windows mean
+a row may be sent twice; applying changes is idempotent. A row is only
+missed if its transaction ran longer than SYNC_CURSOR_OVERLAP before
+committing.
+
+``reset`` tells the client to refetch the full list and sync from the
+returned cursor: on first sync (no cursor), when the cursor predates the
+tombstone retention window, or when more than SYNC_MAX_CHANGES rows moved
+or were deleted.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from supabase import Client as SupabaseClient
+
+from server.app.config import settings
+
+TOMBSTONE_TABLE = "deleted_records"
+
+
+def _reset(cursor: datetime) -> dict[str, Any]:
+    return {"changes": [], "deleted": [], "cursor": cursor, "reset": True}
+
+
+async def changes_since(
+    client: SupabaseClient,
+    table: str,
+    since: datetime | None,
+    select: str = "*",
+) -> dict[str, Any]:
+    """Rows of ``table`` changed or deleted since ``since`` (RLS-scoped)."""
+    now = datetime.now(timezone.utc)
+    cursor = now - timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+
+    if since is None:
+        return _reset(cursor)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if since < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        return _reset(cursor)
+
+    # Changes before tombstones: a row deleted in between shows up in both,
+    # and clients apply deletes last
+    changed = client.table(table) \
+        .select(select) \
+        .gte("updated_at", since.isoformat()) \
+        .order("updated_at") \
+        .limit(settings.SYNC_MAX_CHANGES + 1) \
+        .execute()
+    rows = changed.data or []
+    if len(rows) > settings.SYNC_MAX_CHANGES:
+        return _reset(cursor)
+
+    deleted = client.table(TOMBSTONE_TABLE) \
+        .select("record_id") \
+        .eq("table_name", table) \
+        .gte("created_at", since.isoformat()) \
+        .limit(settings.SYNC_MAX_CHANGES + 1) \
+        .execute()
+    tombstones = deleted.data or []
+    # PostgREST's max-rows truncates silently: a partial list would leave
+    # ghost rows on the client, so a bulk delete forces a resync instead
+    if len(tombstones) > settings.SYNC_MAX_CHANGES:
+        return _reset(cursor)
+
+    return {
+        "changes": rows,
+        "deleted": list(dict.fromkeys(row["record_id"] for row in tombstones)),
+        "cursor": cursor,
+        "reset": False,
+    }
@@ -4,13 +4,17 @@ Usage is tracked in Redis (fast, per-period) with fallback to Supabase.
 Each metric is keyed by: usage:{org_id}:{category}:{period}
 """
 
+import asyncio
 import logging
+import time
+import uuid
 from datetime import datetime, timezone
 from typing import Any
 
-from server.app.models.enums import PlanTier
 from supabase import Client as SupabaseClient
 
+from server.app.models.enums import PlanTier
+
 logger = logging.getLogger(__name__)
 
 
@@ -64,6 +68,9 @@ def _get_limits_for_plan(plan: str) -> dict[str, int]:
 # Redis-backed Usage Tracking
 # =============================================================================
 
+# Counter TTL: 45 days covers the billing period plus a buffer
+USAGE_TTL_SECONDS = 45 * 86400
+
 async def increment_usage(
     org_id: str,
     category: str,
@@ -85,7 +92,7 @@ async def increment_usage(
 
     # Set TTL on first increment (45 days — covers billing period + buffer)
     if new_total == amount:
-        await redis_client.expire(key, 45 * 86400)
+        await redis_client.expire(key, USAGE_TTL_SECONDS)
 
     return new_total
 
@@ -127,57 +134,528 @@ async def check_quota(
     return used < limit, used, limit
 
 
-async def get_all_usage(
+# =============================================================================
+# Atomic Quota Reservation
+# =============================================================================
+
+# Units leased to processes but not yet spent (see QuotaLeaser), per usage
+# key: a hash of lease ID → "units:expires_at_ms". Enforcement adds these on
+# top of the usage counter; billing and usage views never see them.
+LEASES_KEY = "quota:leases:{key}"
+
+# Shared Lua: the current time, and the sum of unexpired leases in a lease
+# hash other than ``skip`` (expired entries are dropped on the way)
+_LEASES_LUA = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local function outstanding(hash, skip)
+    local total = 0
+    local fields = redis.call('HGETALL', hash)
+    for i = 1, #fields, 2 do
+        local units, expires = string.match(fields[i + 1], '^(%d+):(%d+)$')
+        if not units or tonumber(expires) <= now then
+            redis.call('HDEL', hash, fields[i])
+        elseif fields[i] ~= skip then
+            total = total + tonumber(units)
+        end
+    end
+    return total
+end
+"""
+
+# Check-and-increment in one step: concurrent requests can no longer all
+# pass the check before any of them increments.
+# KEYS[1] = usage key, KEYS[2] = lease hash; ARGV = amount, limit, ttl_seconds
+# Returns {granted (0/1), used} — used (including outstanding leases) is the
+# new total, or the current one if denied
+RESERVE_SCRIPT = _LEASES_LUA + """
+local amount = tonumber(ARGV[1])
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local leased = outstanding(KEYS[2], '')
+if used + leased + amount > tonumber(ARGV[2]) then
+    return {0, used + leased}
+end
+local total = redis.call('INCRBY', KEYS[1], amount)
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, total + leased}
+"""
+
+# Refund a reservation without going below zero (e.g. after a counter reset)
+RELEASE_SCRIPT = """
+local total = redis.call('DECRBY', KEYS[1], ARGV[1])
+if total < 0 then
+    redis.call('SET', KEYS[1], 0, 'KEEPTTL')
+    return 0
+end
+return total
+"""
+
+
+class QuotaReservation:
+    """Usage reserved by reserve_quota(); hand back with release_quota()."""
+
+    __slots__ = ("granted", "used", "limit", "key", "amount", "released", "lease")
+
+    def __init__(
+        self,
+        granted: bool,
+        used: int,
+        limit: int,
+        key: str,
+        amount: int,
+        lease: "_Lease | None" = None,
+    ) -> None:
+        self.granted = granted
+        self.used = used
+        self.limit = limit
+        # Key of the billing period the units were taken from
+        self.key = key
+        self.amount = amount
+        self.released = False
+        # Set when the units came from a local lease rather than Redis
+        self.lease = lease
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+
+async def reserve_quota(
     org_id: str,
+    category: str,
     plan: str = PlanTier.FREE,
+    amount: int = 1,
     redis_client=None,
-) -> list[dict[str, Any]]:
-    """Get all usage metrics for an organization.
+) -> QuotaReservation:
+    """Atomically check the plan limit and take ``amount`` units.
 
-    Returns a list of UsageMetric-compatible dicts.
+    One Redis round-trip (EVALSHA). Nothing is taken when the limit would
+    be exceeded; ``granted`` is False and ``used`` is the current total.
     """
-    limits = _get_limits_for_plan(plan)
-    metrics = []
+    limit = _get_limits_for_plan(plan).get(category, 0)
+    key = f"usage:{org_id}:{category}:{_get_billing_period()}"
+    if limit <= 0:
+        return QuotaReservation(False, 0, 0, key, amount)
 
-    category_units = {
-        "api_calls": "calls",
-        "ingestions": "ingestions",
-        "storage_gb": "GB",
-        "seats": "seats",
-        "oracle_queries": "queries",
-    }
+    if redis_client is None:
+        from server.app.dependencies import get_redis
+        redis_client = await get_redis()
+
+    script = redis_client.register_script(RESERVE_SCRIPT)
+    granted, used = await script(
+        keys=[key, LEASES_KEY.format(key=key)], args=[amount, limit, USAGE_TTL_SECONDS],
+    )
+    return QuotaReservation(bool(int(granted)), int(used), limit, key, amount)
+
+
+async def release_quota(
+    reservation: QuotaReservation,
+    redis_client=None,
+) -> None:
+    """Refund a granted reservation (idempotent)."""
+    if not reservation.granted or reservation.released:
+        return
+    reservation.released = True
+
+    # Leased units go back into the lease while it is still held
+    lease = reservation.lease
+    if lease is not None and not lease.closed:
+        lease.available += reservation.amount
+        lease.spent -= reservation.amount
+        lease.used -= reservation.amount
+        return
+
+    if redis_client is None:
+        from server.app.dependencies import get_redis
+        redis_client = await get_redis()
+
+    script = redis_client.register_script(RELEASE_SCRIPT)
+    await script(keys=[reservation.key], args=[reservation.amount])
+
+
+# =============================================================================
+# Local Quota Leases
+# =============================================================================
+
+# Add spent leased units to the usage counter (negative after refunds)
+_COMMIT_LUA = """
+local function commit(key, spent, ttl)
+    if spent == 0 then
+        return tonumber(redis.call('GET', key) or '0')
+    end
+    local total = redis.call('INCRBY', key, spent)
+    if total < 0 then
+        redis.call('SET', key, 0, 'KEEPTTL')
+        total = 0
+    end
+    if redis.call('TTL', key) < 0 then
+        redis.call('EXPIRE', key, ttl)
+    end
+    return total
+end
+"""
+
+# Commit this process's spent units, then lease it a block of ``fraction``
+# of the org's remaining allowance on top of the units it still holds.
+# KEYS[1] = usage key, KEYS[2] = lease hash
+# ARGV = limit, fraction, min_block, ttl_seconds, lease_id, spent, held, lease_ttl_ms
+# Returns {block, total} — block is 0 when the org is too close to its limit;
+# total is usage plus every outstanding lease
+LEASE_SCRIPT = _LEASES_LUA + _COMMIT_LUA + """
+local used = commit(KEYS[1], tonumber(ARGV[6]), ARGV[4])
+local held = tonumber(ARGV[7])
+local leased = outstanding(KEYS[2], ARGV[5]) + held
+local block = math.floor((tonumber(ARGV[1]) - used - leased) * tonumber(ARGV[2]))
+if block < tonumber(ARGV[3]) then
+    block = 0
+end
+if held + block > 0 then
+    redis.call('HSET', KEYS[2], ARGV[5], (held + block) .. ':' .. (now + tonumber(ARGV[8])))
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+else
+    redis.call('HDEL', KEYS[2], ARGV[5])
+end
+return {block, used + leased + block}
+"""
+
+# Commit a lease's spent units and drop the rest.
+# KEYS[1] = usage key, KEYS[2] = lease hash; ARGV = lease_id, spent, ttl_seconds
+RETURN_SCRIPT = _COMMIT_LUA + """
+redis.call('HDEL', KEYS[2], ARGV[1])
+return commit(KEYS[1], tonumber(ARGV[2]), ARGV[3])
+"""
+
+
+class _Lease:
+    """Units of one usage key held by this process, counted in its lease hash."""
+
+    __slots__ = ("key", "available", "spent", "used", "expires_at", "closed")
+
+    def __init__(self, key: str, available: int, used: int, expires_at: float) -> None:
+        self.key = key
+        self.available = available
+        # Handed out since the last commit to the usage counter
+        self.spent = 0
+        # Org total as seen by this process: usage plus leases, minus our unspent units
+        self.used = used
+        self.expires_at = expires_at
+        self.closed = False
+
+
+class QuotaLeaser:
+    """Serve quota reservations from per-process leases.
+
+    Each process takes a block of ``fraction`` of the org's remaining
+    allowance with one Redis script and hands it out from memory, so an
+    org with 100k api_calls/month costs a Redis call every few thousand
+    requests instead of every request.
+
+    Leased units are recorded in a lease hash next to the usage counter
+    (LEASES_KEY), not in the counter itself. Enforcement adds outstanding
+    leases on top of usage, so the plan limit is never exceeded; an org can
+    be refused early, by at most the units other processes hold unspent.
+    Only spent units reach the usage counter — and so the usage views and
+    the billing ledger — when the process refills, when a background sweep
+    (start_sweeper, every ``ttl / 2`` seconds) returns a lease older than
+    ``ttl`` seconds, and on shutdown (release_all). Once a block would drop
+    below ``min_block`` units, requests fall back to reserve_quota() one at
+    a time.
+
+    A process that dies without shutting down stops holding its leases
+    after 2 × ``ttl``; the units it had spent but not yet committed (at most
+    one block per key) are never billed.
+    """
+
+    def __init__(
+        self,
+        fraction: float | None = None,
+        min_block: int | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        from server.app.config import settings
+
+        self.fraction = settings.QUOTA_LEASE_FRACTION if fraction is None else fraction
+        self.min_block = settings.QUOTA_LEASE_MIN_BLOCK if min_block is None else min_block
+        self.ttl = settings.QUOTA_LEASE_TTL if ttl is None else ttl
+        # Field of this process in every lease hash
+        self.lease_id = uuid.uuid4().hex
+        self._leases: dict[str, _Lease] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.local_hits = 0
+        self.refills = 0
+        self.fallbacks = 0
+        self._sweeper_task: asyncio.Task | None = None
+
+    def _take(self, key: str, limit: int, amount: int, now: float) -> QuotaReservation | None:
+        lease = self._leases.get(key)
+        if lease is None or lease.available < amount or lease.expires_at <= now:
+            return None
+        lease.available -= amount
+        lease.spent += amount
+        lease.used += amount
+        self.local_hits += 1
+        return QuotaReservation(True, lease.used, limit, key, amount, lease=lease)
+
+    async def reserve(
+        self,
+        org_id: str,
+        category: str,
+        plan: str = PlanTier.FREE,
+        amount: int = 1,
+        redis_client=None,
+    ) -> QuotaReservation:
+        """Drop-in for reserve_quota() that usually skips Redis."""
+        if self.fraction <= 0:
+            return await reserve_quota(org_id, category, plan, amount, redis_client)
+
+        limit = _get_limits_for_plan(plan).get(category, 0)
+        key = f"usage:{org_id}:{category}:{_get_billing_period()}"
+        if limit <= 0:
+            return QuotaReservation(False, 0, 0, key, amount)
+
+        reservation = self._take(key, limit, amount, time.monotonic())
+        if reservation is not None:
+            return reservation
+
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        # One refill per key at a time; the others wait and take from it
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            reservation = self._take(key, limit, amount, now)
+            if reservation is not None:
+                return reservation
+
+            await self._return_expired(now, redis_client, current=key)
+
+            lease = self._leases.get(key)
+            if lease is None:
+                lease = self._leases[key] = _Lease(key, 0, 0, 0.0)
+            spent, held = lease.spent, lease.available
+            script = redis_client.register_script(LEASE_SCRIPT)
+            block, total = await script(
+                keys=[key, LEASES_KEY.format(key=key)],
+                args=[
+                    limit, self.fraction, max(self.min_block, amount), USAGE_TTL_SECONDS,
+                    self.lease_id, spent, held, int(self.ttl * 2000),
+                ],
+            )
+            block, total = int(block), int(total)
+            # Units taken meanwhile stay in ``spent`` for the next commit
+            lease.spent -= spent
+            if block:
+                self.refills += 1
+                lease.available += block
+                lease.used = total - lease.available
+                lease.expires_at = now + self.ttl
+                return self._take(key, limit, amount, now)
+            if not lease.available and not lease.spent:
+                # Nothing held or owed; the script already dropped our entry
+                lease.closed = True
+                self._leases.pop(key, None)
+
+        # Too close to the limit to lease: check every request against Redis
+        self.fallbacks += 1
+        return await reserve_quota(org_id, category, plan, amount, redis_client)
+
+    async def _return(self, lease: _Lease, redis_client) -> None:
+        if lease.closed:
+            return
+        lease.closed = True
+        self._leases.pop(lease.key, None)
+        lock = self._locks.get(lease.key)
+        if lock is not None and not lock.locked():
+            del self._locks[lease.key]
+        script = redis_client.register_script(RETURN_SCRIPT)
+        await script(
+            keys=[lease.key, LEASES_KEY.format(key=lease.key)],
+            args=[self.lease_id, lease.spent, USAGE_TTL_SECONDS],
+        )
+
+    async def _return_expired(self, now: float, redis_client, current: str | None = None) -> None:
+        """Return leases past their ttl; failures are logged and retried next time.
+
+        Keys being refilled (other than ``current``, whose lock the caller
+        holds) are skipped: the refill commits their spent units itself.
+        """
+        for lease in [lease for lease in self._leases.values() if lease.expires_at <= now]:
+            lock = self._locks.get(lease.key)
+            if lease.key != current and lock is not None and lock.locked():
+                continue
+            try:
+                await self._return(lease, redis_client)
+            except Exception as e:
+                logger.warning("Failed to return quota lease %s: %s", lease.key, e)
+                # Keep it for the next sweep; its lease hash entry outlives ttl
+                if lease.key not in self._leases:
+                    lease.closed = False
+                    self._leases[lease.key] = lease
+
+    async def sweep(self, redis_client=None) -> None:
+        """Return expired leases of keys with no reservation since (one pass)."""
+        if not self._leases:
+            return
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+        await self._return_expired(time.monotonic(), redis_client)
+
+    def start_sweeper(self) -> None:
+        """Start the background sweep loop (idempotent)."""
+        if self.fraction <= 0 or self.ttl <= 0:
+            return
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweeper_loop())
+
+    async def stop_sweeper(self) -> None:
+        """Cancel the background sweep loop."""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+
+    async def _sweeper_loop(self) -> None:
+        # Twice per ttl: a lease is committed well before its hash entry (2 × ttl) expires
+        while True:
+            await asyncio.sleep(self.ttl / 2)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Quota lease sweep failed")
+
+    async def release_all(self, redis_client=None) -> None:
+        """Commit spent leased units and drop the rest (call on shutdown)."""
+        if not self._leases:
+            return
+        if redis_client is None:
+            from server.app.dependencies import get_redis
+            redis_client = await get_redis()
+
+        for lease in list(self._leases.values()):
+            try:
+                await self._return(lease, redis_client)
+            except Exception as e:
+                logger.warning("Failed to return quota lease %s: %s", lease.key, e)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "leases": len(self._leases),
+            "leased_units": sum(lease.available for lease in self._leases.values()),
+            "local_hits": self.local_hits,
+            "refills": self.refills,
+            "fallbacks": self.fallbacks,
+        }
+
+
+# Process-wide leaser used by require_quota
+quota_leases = QuotaLeaser()
+
+
+CATEGORY_UNITS: dict[str, str] = {
+    "api_calls": "calls",
+    "ingestions": "ingestions",
+    "storage_gb": "GB",
+    "seats": "seats",
+    "oracle_queries": "queries",
+}
+
+# Keys per MGET when reading many orgs at once (all sent in one pipeline)
+_MGET_CHUNK = 1000
 
-    for category, limit in limits.items():
-        used = await get_usage(org_id, category, redis_client)
+
+def _build_metrics(limits: dict[str, int], values: list) -> list[dict[str, Any]]:
+    """UsageMetric-compatible dicts from limits and raw counter values (same order)."""
+    metrics = []
+    for (category, limit), value in zip(limits.items(), values):
+        used = int(value) if value else 0
         percentage = round((used / max(limit, 1)) * 100, 1)
         metrics.append({
             "category": category,
             "used": used,
             "limit": limit,
             "percentage": min(percentage, 100.0),
-            "unit": category_units.get(category, "units"),
+            "unit": CATEGORY_UNITS.get(category, "units"),
         })
-
     return metrics
 
 
+async def get_all_usage(
+    org_id: str,
+    plan: str = PlanTier.FREE,
+    redis_client=None,
+) -> list[dict[str, Any]]:
+    """Get all usage metrics for an organization.
+
+    Reads every category with a single MGET.
+    Returns a list of UsageMetric-compatible dicts.
+    """
+    if redis_client is None:
+        from server.app.dependencies import get_redis
+        redis_client = await get_redis()
+
+    limits = _get_limits_for_plan(plan)
+    period = _get_billing_period()
+    keys = [f"usage:{org_id}:{category}:{period}" for category in limits]
+
+    values = await redis_client.mget(keys)
+    return _build_metrics(limits, values)
+
+
+async def get_usage_for_orgs(
+    org_plans: dict[str, str],
+    redis_client=None,
+) -> dict[str, list[dict[str, Any]]]:
+    """Usage metrics for many orgs at once (admin views).
+
+    ``org_plans`` maps org ID → plan tier. All counters are fetched in one
+    pipelined round-trip of MGETs, however many orgs are asked for.
+    Returns org ID → list of UsageMetric-compatible dicts.
+    """
+    if not org_plans:
+        return {}
+    if redis_client is None:
+        from server.app.dependencies import get_redis
+        redis_client = await get_redis()
+
+    period = _get_billing_period()
+    org_limits = {org_id: _get_limits_for_plan(plan) for org_id, plan in org_plans.items()}
+    keys = [
+        f"usage:{org_id}:{category}:{period}"
+        for org_id, limits in org_limits.items()
+        for category in limits
+    ]
+
+    pipe = redis_client.pipeline(transaction=False)
+    for start in range(0, len(keys), _MGET_CHUNK):
+        pipe.mget(keys[start:start + _MGET_CHUNK])
+    values = [value for chunk in await pipe.execute() for value in chunk]
+
+    result = {}
+    offset = 0
+    for org_id, limits in org_limits.items():
+        result[org_id] = _build_metrics(limits, values[offset:offset + len(limits)])
+        offset += len(limits)
+    return result
+
+
 async def get_usage_overview(
     client: SupabaseClient,
     org_id: str,
 ) -> dict[str, Any]:
     """Get complete usage overview for the billing page.
 
-    Fetches plan from DB, then computes usage from Redis.
+    Gets the plan from the entitlements cache, then computes usage from Redis.
     """
-    # Get org plan from DB
-    result = (
-        client.table("organizations")
-        .select("plan")
-        .eq("id", org_id)
-        .single()
-        .execute()
-    )
-    plan = (result.data or {}).get("plan", PlanTier.FREE)
+    from server.app.services.entitlements import get_entitlements
+    plan = (await get_entitlements(org_id, client)).plan
 
     # Get all usage metrics
     metrics = await get_all_usage(org_id, plan)
@@ -211,10 +689,9 @@ async def reset_usage(
         redis_client = await get_redis()
 
     period = _get_billing_period()
-    categories = list(PLAN_LIMITS[PlanTier.FREE].keys())
+    keys = [f"usage:{org_id}:{category}:{period}" for category in PLAN_LIMITS[PlanTier.FREE]]
 
-    for category in categories:
-        key = f"usage:{org_id}:{category}:{period}"
-        await redis_client.delete(key)
+    # One round-trip; UNLINK frees the memory off the main Redis thread
+    await redis_client.unlink(*keys)
 
     logger.info("Reset usage counters for org %s", org_id)
@@ -0,0 +1,165 @@
+"""Usage export — report metered overage from the usage ledger to Stripe.
+
+Runs periodically (export_usage_to_stripe_task), never on the request
+path. For each usage_metrics row of a metered category:
+
+    overage = max(0, used − plan limit)
+    send    = overage − exported
+
+The plan limit is the one the ledger flush recorded on the row while its
+period was current (plan_limit); rows from before that was recorded fall
+back to the org's current plan.
+
+New overage is first staged in the DB (export_target), then sent as one
+Stripe meter event per org/category, then marked exported. A staged row
+is resent with the same meter event identifier until Stripe acknowledges
+it, and Stripe drops identifiers it has seen, so crashes and retries never
+bill twice. Stripe calls run in threads, at most ``concurrency`` at once.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from supabase import Client as SupabaseClient
+
+from server.app.models.enums import PlanTier
+from server.app.services import stripe_service
+from server.app.services.usage import _get_limits_for_plan
+from server.app.services.usage_ledger import _fetch_plans
+
+logger = logging.getLogger(__name__)
+
+
+def _periods_to_export() -> list[str]:
+    """Previous and current billing period (late usage of last month still counts)."""
+    now = datetime.now(timezone.utc)
+    previous = now.replace(day=1) - timedelta(days=1)
+    return [previous.strftime("%Y-%m"), now.strftime("%Y-%m")]
+
+
+def _meter_identifier(row: dict[str, Any], target: int) -> str:
+    # Same row, same range of units → same identifier
+    return f"kijko-usage-{row['id']}-{int(row['exported'])}-{target}"
+
+
+def _fetch_rows(client: SupabaseClient, periods: list[str], page_size: int) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    start = 0
+    while True:
+        result = (
+            client.table("usage_metrics")
+            .select("id, org_id, category, period, used, plan_limit, exported, export_target")
+            .in_("period", periods)
+            .in_("category", list(stripe_service.METER_EVENTS))
+            .order("id")
+            .range(start, start + page_size - 1)
+            .execute()
+        )
+        page = result.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+async def export_usage_to_stripe(
+    client: SupabaseClient,
+    periods: list[str] | None = None,
+    concurrency: int = 8,
+    page_size: int = 1000,
+) -> dict[str, int]:
+    """Send unreported overage for ``periods`` (default: previous + current) to Stripe.
+
+    Returns counts of rows considered, events sent, events failed and
+    rows skipped because the org has no Stripe customer.
+    """
+    periods = periods or _periods_to_export()
+    rows = _fetch_rows(client, periods, page_size)
+    stats = {"rows": len(rows), "sent": 0, "failed": 0, "no_customer": 0}
+    if not rows:
+        return stats
+
+    # 1. Work out what each row owes; in-flight rows keep their staged target
+    plans = _fetch_plans(client, sorted({row["org_id"] for row in rows if row.get("plan_limit") is None}))
+    pending: list[tuple[dict[str, Any], int]] = []
+    candidates: list[tuple[dict[str, Any], int]] = []
+    for row in rows:
+        if row.get("export_target") is not None:
+            pending.append((row, int(row["export_target"])))
+            continue
+        limit = row.get("plan_limit")
+        if limit is None:
+            limit = _get_limits_for_plan(plans.get(row["org_id"], PlanTier.FREE)).get(row["category"], 0)
+        overage = max(0, int(row["used"]) - int(limit))
+        if overage > int(row["exported"]):
+            candidates.append((row, overage))
+
+    if not pending and not candidates:
+        return stats
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def limited(fn, *args):
+        async with semaphore:
+            return await asyncio.to_thread(fn, *args)
+
+    # 2. Stripe customer per org, looked up once per run
+    org_ids = sorted({row["org_id"] for row, _ in pending + candidates})
+    customers = await asyncio.gather(
+        *(limited(stripe_service.get_customer_by_org, org_id) for org_id in org_ids),
+        return_exceptions=True,
+    )
+    customer_ids: dict[str, str] = {}
+    for org_id, customer in zip(org_ids, customers):
+        if isinstance(customer, Exception):
+            logger.warning("Stripe customer lookup failed (org=%s): %s", org_id, customer)
+        elif customer is not None:
+            customer_ids[org_id] = customer.id
+
+    # 3. Stage new targets in one call; only rows we actually claimed are sent
+    billable = [(row, target) for row, target in candidates if row["org_id"] in customer_ids]
+    stats["no_customer"] = len(candidates) - len(billable)
+    if billable:
+        result = client.rpc("stage_usage_export", {
+            "p_rows": [{"id": row["id"], "target": target} for row, target in billable],
+        }).execute()
+        staged = {item["id"] for item in result.data or []}
+        billable = [(row, target) for row, target in billable if row["id"] in staged]
+
+    to_send = [(row, target) for row, target in pending if row["org_id"] in customer_ids] + billable
+
+    # 4. One meter event per org/category, bounded concurrency
+    async def send(row: dict[str, Any], target: int):
+        await limited(
+            stripe_service.report_meter_event,
+            customer_ids[row["org_id"]],
+            stripe_service.METER_EVENTS[row["category"]],
+            target - int(row["exported"]),
+            _meter_identifier(row, target),
+        )
+
+    outcomes = await asyncio.gather(*(send(row, target) for row, target in to_send), return_exceptions=True)
+
+    acknowledged = []
+    for (row, target), outcome in zip(to_send, outcomes):
+        if isinstance(outcome, Exception):
+            stats["failed"] += 1
+            logger.warning(
+                "Meter event failed (org=%s, category=%s, period=%s): %s",
+                row["org_id"], row["category"], row["period"], outcome,
+            )
+        else:
+            acknowledged.append({"id": row["id"], "exported": target})
+
+    # 5. Record what Stripe has, in one call
+    if acknowledged:
+        client.rpc("mark_usage_exported", {"p_rows": acknowledged}).execute()
+    stats["sent"] = len(acknowledged)
+
+    logger.info(
+        "Usage export: %d row(s), %d sent, %d failed, %d without customer",
+        stats["rows"], stats["sent"], stats["failed"], stats["no_customer"],
+    )
+    return stats
@@ -0,0 +1,270 @@
+"""Usage ledger — durable copy of the Redis usage counters in Postgres.
+
+The request path only touches Redis (usage:{org_id}:{category}:{period}).
+A periodic worker task (flush_usage_ledger_task) copies what changed into
+the usage_metrics table (database/006_usage_ledger.sql); API startup
+rehydrates Redis from it after a Redis flush.
+
+Flush protocol:
+  - Per period, a Redis hash (ledger:usage:checkpoint:{period}) holds the
+    counter value last written to the ledger for each key.
+  - Each flush sends only the signed difference (current − checkpoint):
+    refunds and reset_usage() move the ledger down.
+  - Deltas go out in batches through apply_usage_deltas(), which ignores a
+    batch ID it has already applied. The batch is parked in Redis until
+    its checkpoints are committed, so a crash or retry resends the same
+    batch instead of double counting.
+  - A Redis lock keeps flushes from overlapping.
+  - Rows of the current period also carry the org's plan limit
+    (plan_limit), so the Stripe export prices a past period with the plan
+    that was in effect for it, not the org's plan at export time.
+  - Rehydration marks each period it restored (ledger:usage:ready:{period}).
+    If Redis loses data while the API is up, that marker goes with the
+    checkpoints; the next flush then rehydrates the period before diffing
+    instead of writing the post-loss counters as fresh deltas.
+"""
+
+import json
+import logging
+import uuid
+from typing import Any
+
+from supabase import Client as SupabaseClient
+
+from server.app.models.enums import PlanTier
+from server.app.services.usage import _MGET_CHUNK, USAGE_TTL_SECONDS, _get_billing_period, _get_limits_for_plan
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_KEY = "ledger:usage:checkpoint:{period}"
+PENDING_KEY = "ledger:usage:pending"
+LOCK_KEY = "ledger:usage:lock"
+# Set once a period's counters have been rehydrated into this Redis
+READY_KEY = "ledger:usage:ready:{period}"
+
+# Rows per apply_usage_deltas() call
+DEFAULT_BATCH_SIZE = 500
+
+# Restore a counter from the ledger unless this Redis already knows about it.
+# KEYS[1] = usage key, KEYS[2] = checkpoint hash; ARGV = ledger value, ttl_seconds
+# A missing checkpoint means Redis lost the key since the last flush: any
+# units counted since then are kept on top of the ledger value.
+REHYDRATE_SCRIPT = """
+if redis.call('HEXISTS', KEYS[2], KEYS[1]) == 1 then
+    return -1
+end
+local total = redis.call('INCRBY', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[2], KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < 0 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return total
+"""
+
+
+def _parse_key(key: str) -> tuple[str, str, str] | None:
+    """(org_id, category, period) of a usage counter key, or None if malformed."""
+    parts = key.split(":")
+    if len(parts) != 4 or parts[0] != "usage":
+        return None
+    _, org_id, category, period = parts
+    try:
+        uuid.UUID(org_id)
+    except ValueError:
+        return None
+    return org_id, category, period
+
+
+def _fetch_plans(client: SupabaseClient, org_ids: list[str]) -> dict[str, str]:
+    """Current plan of each org (orgs without one are on the free plan)."""
+    plans: dict[str, str] = {}
+    for start in range(0, len(org_ids), 500):
+        result = (
+            client.table("organizations")
+            .select("id, plan")
+            .in_("id", org_ids[start:start + 500])
+            .execute()
+        )
+        for org in result.data or []:
+            plans[org["id"]] = org.get("plan") or PlanTier.FREE
+    return plans
+
+
+# =============================================================================
+# Flush (Redis → Postgres)
+# =============================================================================
+
+async def _read_counters(redis_client, keys: list[str]) -> list[int]:
+    pipe = redis_client.pipeline(transaction=False)
+    for start in range(0, len(keys), _MGET_CHUNK):
+        pipe.mget(keys[start:start + _MGET_CHUNK])
+    return [int(v) if v else 0 for chunk in await pipe.execute() for v in chunk]
+
+
+async def _apply_batch(client: SupabaseClient, redis_client, batch: dict[str, Any]) -> None:
+    """Write one parked batch to the ledger, then commit its checkpoints."""
+    client.rpc("apply_usage_deltas", {
+        "p_batch_id": batch["batch_id"],
+        "p_rows": batch["rows"],
+    }).execute()
+
+    pipe = redis_client.pipeline(transaction=True)
+    for period, values in batch["checkpoints"].items():
+        hash_key = CHECKPOINT_KEY.format(period=period)
+        pipe.hset(hash_key, mapping=values)
+        pipe.expire(hash_key, USAGE_TTL_SECONDS)
+    pipe.delete(PENDING_KEY)
+    await pipe.execute()
+
+
+async def flush_usage_to_ledger(
+    client: SupabaseClient,
+    redis_client,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    lock_timeout: int = 240,
+) -> dict[str, int]:
+    """Copy changed usage counters into usage_metrics.
+
+    Safe to run repeatedly and to retry after a failure. Returns counts of
+    keys scanned, rows written and batches sent.
+    """
+    token = uuid.uuid4().hex
+    if not await redis_client.set(LOCK_KEY, token, nx=True, ex=lock_timeout):
+        logger.info("Usage ledger flush already running, skipping")
+        return {"keys": 0, "rows": 0, "batches": 0, "skipped": 1}
+
+    try:
+        batches = 0
+
+        # 1. Finish a batch a previous run sent but never committed
+        parked = await redis_client.get(PENDING_KEY)
+        if parked:
+            await _apply_batch(client, redis_client, json.loads(parked))
+            batches += 1
+
+        # 2. Every live counter, plus current-period keys that have vanished (reset)
+        keys: dict[str, tuple[str, str, str]] = {}
+        async for key in redis_client.scan_iter(match="usage:*", count=1000):
+            parsed = _parse_key(key)
+            if parsed is not None:
+                keys[key] = parsed
+
+        periods = sorted({parsed[2] for parsed in keys.values()} | {_get_billing_period()})
+
+        # 3. A period without its ready marker lost its checkpoints with the
+        # rest of Redis: restore it from the ledger first (raises → no flush)
+        pipe = redis_client.pipeline(transaction=False)
+        for period in periods:
+            pipe.exists(READY_KEY.format(period=period))
+        for period, ready in zip(periods, await pipe.execute()):
+            if not ready:
+                await rehydrate_usage_from_ledger(client, redis_client, period=period)
+
+        pipe = redis_client.pipeline(transaction=False)
+        for period in periods:
+            pipe.hgetall(CHECKPOINT_KEY.format(period=period))
+        checkpoints: dict[str, int] = {}
+        for period, values in zip(periods, await pipe.execute()):
+            for key, value in values.items():
+                if period == _get_billing_period() and key not in keys:
+                    parsed = _parse_key(key)
+                    if parsed is not None:
+                        keys[key] = parsed
+                checkpoints[key] = int(value)
+
+        ordered = list(keys)
+        current = await _read_counters(redis_client, ordered) if ordered else []
+
+        # 4. Signed deltas since the last flush
+        changed = [
+            (key, value, value - checkpoints.get(key, 0))
+            for key, value in zip(ordered, current)
+            if value != checkpoints.get(key, 0)
+        ]
+
+        # Plan limits are only recorded while their period is current; late
+        # deltas of a past period keep the limit the ledger already has
+        current_period = _get_billing_period()
+        plans = _fetch_plans(client, sorted({
+            keys[key][0] for key, _, _ in changed if keys[key][2] == current_period
+        }))
+
+        rows_written = 0
+        for start in range(0, len(changed), batch_size):
+            chunk = changed[start:start + batch_size]
+            batch: dict[str, Any] = {"batch_id": str(uuid.uuid4()), "rows": [], "checkpoints": {}}
+            for key, value, delta in chunk:
+                org_id, category, period = keys[key]
+                plan_limit = None
+                if period == current_period:
+                    plan_limit = _get_limits_for_plan(plans.get(org_id, PlanTier.FREE)).get(category, 0)
+                batch["rows"].append({
+                    "org_id": org_id, "category": category, "period": period, "delta": delta,
+                    "plan_limit": plan_limit,
+                })
+                batch["checkpoints"].setdefault(period, {})[key] = value
+
+            # Park the batch first so a crash mid-write is retried, not recounted
+            await redis_client.set(PENDING_KEY, json.dumps(batch))
+            await _apply_batch(client, redis_client, batch)
+            rows_written += len(chunk)
+            batches += 1
+
+        logger.info(
+            "Usage ledger flush: %d key(s), %d row(s), %d batch(es)",
+            len(keys), rows_written, batches,
+        )
+        return {"keys": len(keys), "rows": rows_written, "batches": batches}
+    finally:
+        if await redis_client.get(LOCK_KEY) == token:
+            await redis_client.delete(LOCK_KEY)
+
+
+# =============================================================================
+# Rehydrate (Postgres → Redis)
+# =============================================================================
+
+async def rehydrate_usage_from_ledger(
+    client: SupabaseClient,
+    redis_client,
+    period: str | None = None,
+    page_size: int = 1000,
+) -> int:
+    """Restore the period's counters (default: current) from usage_metrics.
+
+    Only keys this Redis has no checkpoint for are touched, so running it
+    on every startup is a no-op unless Redis lost data. Marks the period
+    ready for flushing. Returns the number of counters restored.
+    """
+    period = period or _get_billing_period()
+    hash_key = CHECKPOINT_KEY.format(period=period)
+    script = redis_client.register_script(REHYDRATE_SCRIPT)
+
+    restored = 0
+    start = 0
+    while True:
+        result = (
+            client.table("usage_metrics")
+            .select("org_id, category, period, used")
+            .eq("period", period)
+            .order("id")
+            .range(start, start + page_size - 1)
+            .execute()
+        )
+        rows = result.data or []
+        if rows:
+            # One round-trip per page
+            pipe = redis_client.pipeline(transaction=False)
+            for row in rows:
+                key = f"usage:{row['org_id']}:{row['category']}:{row['period']}"
+                await script(keys=[key, hash_key], args=[int(row["used"]), USAGE_TTL_SECONDS], client=pipe)
+            restored += sum(1 for total in await pipe.execute() if int(total) >= 0)
+        if len(rows) < page_size:
+            break
+        start += page_size
+
+    await redis_client.set(READY_KEY.format(period=period), 1, ex=USAGE_TTL_SECONDS)
+    if restored:
+        logger.warning("Rehydrated %d usage counter(s) for %s from the ledger", restored, period)
+    return restored
@@ -2,17 +2,118 @@
 
 Supports rooms (org, project, user) and JWT authentication.
 Events: ingestion_progress, execution_update, notification.
+
+Wire formats (negotiated via Sec-WebSocket-Protocol):
+- kijko.json.v1 (default) — text frames, compact JSON
+- kijko.msgpack.v1 — binary frames, MessagePack (requires msgpack)
+
+Clients behind proxies that break WebSockets subscribe to the same rooms
+over Server-Sent Events (GET /events) through SSEConnection. Room
+broadcasts carry an event id and are kept in a bounded per-room replay
+buffer so SSE clients can resume with Last-Event-ID.
 """
 
+import asyncio
 import json
 import logging
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
 from typing import Any
 
 from fastapi import WebSocket
 
+from server.app.config import settings
+
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# Wire Protocol
+# =============================================================================
+
+SUBPROTOCOL_JSON = "kijko.json.v1"
+SUBPROTOCOL_MSGPACK = "kijko.msgpack.v1"
+# Pseudo-protocol for SSEConnection subscribers (JSON payloads, never negotiated)
+PROTOCOL_SSE = "sse"
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover — optional dependency
+    msgpack = None
+
+
+def negotiate_subprotocol(offered: list[str] | None) -> str | None:
+    """Pick the wire format from the client's Sec-WebSocket-Protocol list.
+
+    MessagePack wins when offered and available; otherwise JSON. Returns
+    None when the client offered nothing we speak (plain JSON, no header).
+    """
+    offered = offered or []
+    if SUBPROTOCOL_MSGPACK in offered and msgpack is not None:
+        return SUBPROTOCOL_MSGPACK
+    if SUBPROTOCOL_JSON in offered:
+        return SUBPROTOCOL_JSON
+    return None
+
+
+def encode_frame(data: dict[str, Any], subprotocol: str | None) -> str | bytes:
+    """Serialize an event for the given wire format."""
+    if subprotocol == SUBPROTOCOL_MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def decode_frame(message: dict[str, Any]) -> dict[str, Any]:
+    """Decode an ASGI websocket.receive message into a client action.
+
+    Raises ValueError on malformed payloads.
+    """
+    if message.get("bytes") is not None:
+        if msgpack is None:
+            raise ValueError("Binary frames not supported")
+        try:
+            data = msgpack.unpackb(message["bytes"], raw=False)
+        except Exception as e:
+            raise ValueError(str(e)) from e
+    else:
+        data = json.loads(message.get("text") or "")
+
+    if not isinstance(data, dict):
+        raise ValueError("Message must be an object")
+    return data
+
+
+# Close codes sent by the server (4000-4999 are application-defined)
+CLOSE_RECONNECT = 4000       # Max connection age reached — client should reconnect
+CLOSE_AUTH_EXPIRED = 4001    # Missing, invalid or expired token
+CLOSE_HEARTBEAT_TIMEOUT = 4002
+
+
+class _ConnectionState:
+    """Liveness bookkeeping for a single connection."""
+
+    __slots__ = ("connected_at", "last_seen", "ping_sent_at")
+
+    def __init__(self, now: float) -> None:
+        self.connected_at = now
+        self.last_seen = now
+        self.ping_sent_at: float | None = None
+
+
+class _RoomHistory:
+    """Recent broadcasts to one room, for Last-Event-ID replay."""
+
+    __slots__ = ("events", "evicted_upto")
+
+    def __init__(self, maxlen: int) -> None:
+        self.events: deque[tuple[int, dict[str, Any]]] = deque(maxlen=maxlen)
+        # Highest event seq that fell out of the buffer (0 = nothing lost)
+        self.evicted_upto = 0
+
+
 class ConnectionManager:
     """Manage WebSocket connections and rooms.
 
@@ -21,26 +122,73 @@ class ConnectionManager:
     - project:{project_id} — project-specific events (ingestion)
     - user:{user_id} — user-specific notifications
 
+    Liveness is server-driven: a single heartbeat task pings quiet
+    connections and evicts those that miss the pong deadline, outlive
+    WS_MAX_CONNECTION_AGE, or hold a JWT past its ``exp`` claim.
+
+    Room broadcasts get a process-unique event id ("<epoch>-<seq>") and are
+    recorded in a bounded replay buffer (SSE_REPLAY_EVENTS per room, at most
+    SSE_REPLAY_ROOMS rooms, least recently published dropped first).
+
     Usage:
         manager = ConnectionManager()
         await manager.connect(websocket, user_claims)
         await manager.broadcast_to_room("org:abc", {"type": "notification", ...})
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        ping_interval: float | None = None,
+        pong_timeout: float | None = None,
+        max_connection_age: float | None = None,
+        replay_events: int | None = None,
+        replay_rooms: int | None = None,
+    ):
         # Active connections: websocket → user_claims
         self._connections: dict[WebSocket, dict] = {}
         # Room memberships: room_name → set of websockets
         self._rooms: dict[str, set[WebSocket]] = {}
+        # Reverse index: websocket → rooms it joined (O(1) disconnect)
+        self._memberships: dict[WebSocket, set[str]] = {}
+        # Liveness state per connection
+        self._state: dict[WebSocket, _ConnectionState] = {}
+        # Negotiated subprotocol per connection (absent → JSON)
+        self._protocols: dict[WebSocket, str] = {}
+
+        self.ping_interval = settings.WS_PING_INTERVAL if ping_interval is None else ping_interval
+        self.pong_timeout = settings.WS_PONG_TIMEOUT if pong_timeout is None else pong_timeout
+        self.max_connection_age = (
+            settings.WS_MAX_CONNECTION_AGE if max_connection_age is None else max_connection_age
+        )
+        self._heartbeat_task: asyncio.Task | None = None
+        # Housekeeping of other components, run at the end of every sweep
+        self._sweep_hooks: list[Callable[[], Any]] = []
+
+        # Event ids and replay buffer for SSE resume
+        self._epoch = os.urandom(4).hex()
+        self._event_seq = 0
+        self.replay_events = settings.SSE_REPLAY_EVENTS if replay_events is None else replay_events
+        self.replay_rooms = settings.SSE_REPLAY_ROOMS if replay_rooms is None else replay_rooms
+        self._history: OrderedDict[str, _RoomHistory] = OrderedDict()
+        # Highest seq of any room history dropped from the LRU
+        self._history_floor = 0
 
     @property
     def active_connections(self) -> int:
         return len(self._connections)
 
-    async def connect(self, websocket: WebSocket, user_claims: dict) -> None:
+    async def connect(
+        self,
+        websocket: WebSocket,
+        user_claims: dict,
+        subprotocol: str | None = None,
+    ) -> None:
         """Accept a WebSocket connection and auto-join default rooms."""
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
         self._connections[websocket] = user_claims
+        if subprotocol in (SUBPROTOCOL_MSGPACK, PROTOCOL_SSE):
+            self._protocols[websocket] = subprotocol
+        self._state[websocket] = _ConnectionState(time.monotonic())
 
         # Auto-join user and org rooms
         user_id = user_claims.get("sub", "")
@@ -58,19 +206,22 @@ class ConnectionManager:
 
     def disconnect(self, websocket: WebSocket) -> None:
         """Remove a WebSocket from all rooms and tracking."""
-        # Remove from all rooms
-        rooms_to_clean = []
-        for room_name, members in self._rooms.items():
+        # Remove from the rooms this socket joined
+        for room in self._memberships.pop(websocket, ()):
+            members = self._rooms.get(room)
+            if members is None:
+                continue
             members.discard(websocket)
             if not members:
-                rooms_to_clean.append(room_name)
+                del self._rooms[room]
 
-        # Clean empty rooms
-        for room in rooms_to_clean:
-            del self._rooms[room]
+        self._state.pop(websocket, None)
+        self._protocols.pop(websocket, None)
 
         # Remove from connections
-        user_claims = self._connections.pop(websocket, {})
+        if websocket not in self._connections:
+            return
+        user_claims = self._connections.pop(websocket)
         logger.info(
             "WebSocket disconnected: user=%s, total=%d",
             user_claims.get("sub", "unknown"),
@@ -82,6 +233,7 @@ class ConnectionManager:
         if room not in self._rooms:
             self._rooms[room] = set()
         self._rooms[room].add(websocket)
+        self._memberships.setdefault(websocket, set()).add(room)
 
     def leave_room(self, websocket: WebSocket, room: str) -> None:
         """Remove a WebSocket from a room."""
@@ -89,23 +241,46 @@ class ConnectionManager:
             self._rooms[room].discard(websocket)
             if not self._rooms[room]:
                 del self._rooms[room]
+        rooms = self._memberships.get(websocket)
+        if rooms is not None:
+            rooms.discard(room)
+            if not rooms:
+                del self._memberships[websocket]
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record inbound activity — any client frame counts as a pong."""
+        state = self._state.get(websocket)
+        if state is not None:
+            state.last_seen = time.monotonic()
+            state.ping_sent_at = None
+
+    def update_claims(self, websocket: WebSocket, user_claims: dict) -> None:
+        """Replace the claims of a connection after an in-band token refresh."""
+        if websocket in self._connections:
+            self._connections[websocket] = user_claims
 
     async def send_personal(self, websocket: WebSocket, data: dict[str, Any]) -> None:
         """Send data to a specific WebSocket connection."""
         try:
-            await websocket.send_json(data)
+            await self._send_frame(websocket, data, {})
         except Exception:
             self.disconnect(websocket)
 
     async def broadcast_to_room(self, room: str, data: dict[str, Any]) -> None:
-        """Send data to all connections in a room."""
+        """Send data to all connections in a room.
+
+        The payload is serialized once per wire format, not once per socket.
+        """
+        event_id = self._record(room, data)
         if room not in self._rooms:
             return
 
+        frames: dict[str | None, str | bytes] = {}
         disconnected = []
-        for ws in self._rooms[room]:
+        # Snapshot: membership may change while we await sends
+        for ws in list(self._rooms[room]):
             try:
-                await ws.send_json(data)
+                await self._send_frame(ws, data, frames, event_id)
             except Exception:
                 disconnected.append(ws)
 
@@ -114,25 +289,425 @@ class ConnectionManager:
 
     async def broadcast_all(self, data: dict[str, Any]) -> None:
         """Send data to all connected clients."""
+        frames: dict[str | None, str | bytes] = {}
         disconnected = []
-        for ws in self._connections:
+        for ws in list(self._connections):
             try:
-                await ws.send_json(data)
+                await self._send_frame(ws, data, frames)
             except Exception:
                 disconnected.append(ws)
 
         for ws in disconnected:
             self.disconnect(ws)
 
+    async def _send_frame(
+        self,
+        websocket: WebSocket,
+        data: dict[str, Any],
+        frames: dict[str | None, str | bytes],
+        event_id: str | None = None,
+        protocol: str | None = None,
+    ) -> None:
+        """Encode (memoized in ``frames``) and send in the socket's format."""
+        protocol = protocol or self._protocols.get(websocket)
+        # SSE subscribers share the JSON encoding
+        fmt = SUBPROTOCOL_MSGPACK if protocol == SUBPROTOCOL_MSGPACK else None
+        frame = frames.get(fmt)
+        if frame is None:
+            frame = frames[fmt] = encode_frame(data, fmt)
+        if protocol == PROTOCOL_SSE:
+            await websocket.send_event(frame, event_id)
+        elif isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
     def get_room_members(self, room: str) -> int:
         """Get the number of connections in a room."""
         return len(self._rooms.get(room, set()))
 
+    # =========================================================================
+    # Event Ids & Replay
+    # =========================================================================
+
+    def _record(self, room: str, data: dict[str, Any]) -> str:
+        """Assign the next event id and append the event to the room history."""
+        self._event_seq += 1
+        seq = self._event_seq
+        if self.replay_events > 0:
+            history = self._history.get(room)
+            if history is None:
+                history = self._history[room] = _RoomHistory(self.replay_events)
+                while len(self._history) > self.replay_rooms:
+                    _, dropped = self._history.popitem(last=False)
+                    if dropped.events:
+                        self._history_floor = max(self._history_floor, dropped.events[-1][0])
+            else:
+                self._history.move_to_end(room)
+            if len(history.events) == history.events.maxlen:
+                history.evicted_upto = history.events[0][0]
+            history.events.append((seq, data))
+        return f"{self._epoch}-{seq}"
+
+    def parse_event_id(self, event_id: str | None) -> int | None:
+        """Return the seq of an id issued by this process, else None."""
+        if not event_id:
+            return None
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit() or int(seq) > self._event_seq:
+            return None
+        return int(seq)
+
+    def replay(self, rooms: set[str], last_event_id: str) -> tuple[list[tuple[str, dict[str, Any]]], bool]:
+        """Events published to ``rooms`` after ``last_event_id``, oldest first.
+
+        Returns (events, complete). ``complete`` is False when the id is
+        unknown (other process, restart) or the buffer already dropped some
+        of the events in between — the client must then refetch state.
+        """
+        after = self.parse_event_id(last_event_id)
+        if after is None:
+            return [], False
+
+        complete = True
+        merged: dict[int, dict[str, Any]] = {}
+        for room in rooms:
+            history = self._history.get(room)
+            if history is None:
+                if after < self._history_floor:
+                    complete = False
+                continue
+            if after < history.evicted_upto:
+                complete = False
+            for seq, data in reversed(history.events):
+                if seq <= after:
+                    break
+                merged[seq] = data
+
+        events = [(f"{self._epoch}-{seq}", merged[seq]) for seq in sorted(merged)]
+        return events, complete
+
+    def rooms_of(self, websocket: WebSocket) -> set[str]:
+        """Rooms a connection currently belongs to."""
+        return set(self._memberships.get(websocket, ()))
+
+    # =========================================================================
+    # Heartbeat & Reaping
+    # =========================================================================
+
+    def start_heartbeat(self) -> None:
+        """Start the background heartbeat loop (idempotent)."""
+        if self.ping_interval <= 0:
+            return
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    async def stop_heartbeat(self) -> None:
+        """Cancel the background heartbeat loop."""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    async def _heartbeat_loop(self) -> None:
+        tick = min(self.ping_interval, self.pong_timeout) if self.pong_timeout > 0 else self.ping_interval
+        while True:
+            await asyncio.sleep(tick)
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("WebSocket heartbeat sweep failed")
+
+    def add_sweep_hook(self, hook: Callable[[], Any]) -> None:
+        """Run ``hook()`` at the end of every heartbeat sweep."""
+        self._sweep_hooks.append(hook)
+
+    async def sweep(self) -> int:
+        """Run one heartbeat pass. Returns the number of evicted connections.
+
+        - Quiet for ping_interval → send {"type": "ping"}
+        - Ping unanswered for pong_timeout → close (4002)
+        - JWT past its exp claim → {"type": "token_expired"}, close (4001)
+        - Older than max_connection_age → {"type": "reconnect"}, close (4000)
+        - Then each sweep hook (e.g. ProgressCoalescer.evict_idle)
+        """
+        now = time.monotonic()
+        wall_now = time.time()
+        evicted = 0
+        to_ping: list[WebSocket] = []
+
+        for ws, claims in list(self._connections.items()):
+            state = self._state.get(ws)
+            if state is None:
+                continue
+
+            if state.ping_sent_at is not None and now - state.ping_sent_at > self.pong_timeout:
+                await self._evict(ws, CLOSE_HEARTBEAT_TIMEOUT, "Heartbeat timeout")
+                evicted += 1
+                continue
+
+            exp = claims.get("exp")
+            if exp and exp <= wall_now:
+                await self._evict(
+                    ws, CLOSE_AUTH_EXPIRED, "Token expired",
+                    notice={"type": "token_expired"},
+                )
+                evicted += 1
+                continue
+
+            if self.max_connection_age > 0 and now - state.connected_at > self.max_connection_age:
+                await self._evict(
+                    ws, CLOSE_RECONNECT, "Max connection age",
+                    notice={
+                        "type": "reconnect",
+                        "reason": "max_age",
+                        # Jitter so a cohort of clients doesn't reconnect at once
+                        "retry_after_ms": random.randint(0, 5000),
+                    },
+                )
+                evicted += 1
+                continue
+
+            if state.ping_sent_at is None and now - state.last_seen >= self.ping_interval:
+                state.ping_sent_at = now
+                to_ping.append(ws)
+
+        if to_ping:
+            await asyncio.gather(*(self.send_personal(ws, {"type": "ping"}) for ws in to_ping))
+
+        for hook in self._sweep_hooks:
+            hook()
+
+        if evicted:
+            logger.info("WebSocket sweep evicted %d connection(s), total=%d", evicted, self.active_connections)
+        return evicted
+
+    async def _evict(
+        self,
+        websocket: WebSocket,
+        code: int,
+        reason: str,
+        notice: dict[str, Any] | None = None,
+    ) -> None:
+        """Drop a connection from tracking, then try to close it politely."""
+        protocol = self._protocols.get(websocket)
+        self.disconnect(websocket)
+        try:
+            if notice is not None:
+                await asyncio.wait_for(
+                    self._send_frame(websocket, notice, {}, protocol=protocol), timeout=1.0,
+                )
+            await asyncio.wait_for(websocket.close(code=code, reason=reason), timeout=1.0)
+        except Exception:
+            # Half-open sockets may not accept the close frame — already untracked
+            pass
+
 
 # Singleton instance
 manager = ConnectionManager()
 
 
+# =============================================================================
+# SSE Transport
+# =============================================================================
+
+class SSEConnection:
+    """Adapts a Server-Sent Events stream to the ConnectionManager.
+
+    Registered with ``manager.connect(conn, claims, subprotocol=PROTOCOL_SSE)``
+    it joins rooms and receives broadcasts like a WebSocket. Frames are
+    queued (bounded by SSE_MAX_QUEUE) and drained by the HTTP response via
+    ``stream()``. A consumer that falls behind is cut off; its EventSource
+    reconnects with Last-Event-ID and resumes from the replay buffer.
+    """
+
+    def __init__(self, max_queue: int | None = None) -> None:
+        size = settings.SSE_MAX_QUEUE if max_queue is None else max_queue
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue(maxsize=size + 1)
+        self._max_queue = size
+        self.closed = False
+
+    async def accept(self, subprotocol: str | None = None) -> None:
+        """No handshake — response headers are sent by the endpoint."""
+
+    async def send_event(self, frame: str, event_id: str | None = None) -> None:
+        if self.closed:
+            raise RuntimeError("SSE stream closed")
+        if self._queue.qsize() >= self._max_queue:
+            self._shutdown()
+            raise RuntimeError("SSE consumer too slow")
+        self._queue.put_nowait(format_sse(frame, event_id))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # The extra slot guarantees room for the end-of-stream marker
+        self._queue.put_nowait(None)
+
+    async def stream(self, keepalive: float):
+        """Yield queued SSE chunks, or a keepalive comment when idle."""
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self._queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if chunk is None:
+                return
+            yield chunk
+
+
+def format_sse(data: str, event_id: str | None = None) -> str:
+    """Render one SSE message; ``data`` is a single-line JSON document."""
+    if event_id is None:
+        return f"data: {data}\n\n"
+    return f"id: {event_id}\ndata: {data}\n\n"
+
+
+# =============================================================================
+# Progress Coalescing
+# =============================================================================
+
+# Phases that end an ingestion run — always delivered immediately
+TERMINAL_PHASES = frozenset({"completed", "failed", "cancelled", "error"})
+
+
+class _RoomProgress:
+    """Coalescing state for a single room."""
+
+    __slots__ = ("phase", "last_sent", "pending", "timer")
+
+    def __init__(self) -> None:
+        self.phase: str | None = None
+        self.last_sent: float = 0.0
+        self.pending: dict[str, Any] | None = None
+        self.timer: asyncio.Task | None = None
+
+
+class ProgressCoalescer:
+    """Throttle high-frequency progress events per room.
+
+    Within a phase the latest value wins: at most one event per room is
+    sent every ``1 / max_hz`` seconds and intermediate ticks are dropped.
+    Phase transitions and final events bypass the throttle; any pending
+    update for the previous phase is flushed first so clients still see
+    where the old phase ended.
+
+    A room's state is dropped on its final event, or by the connection
+    manager's heartbeat sweep once nothing was sent to it for
+    ``idle_timeout`` seconds (a crashed worker never sends a final event).
+    A later tick for an evicted room is simply delivered as a new phase.
+
+    Usage:
+        coalescer = ProgressCoalescer(manager, max_hz=4)
+        await coalescer.publish("project:abc", "parsing", payload)
+    """
+
+    def __init__(
+        self,
+        connection_manager: ConnectionManager,
+        max_hz: float,
+        idle_timeout: float | None = None,
+    ) -> None:
+        self._manager = connection_manager
+        self._interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self._rooms: dict[str, _RoomProgress] = {}
+        self.idle_timeout = settings.WS_PROGRESS_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        connection_manager.add_sweep_hook(self.evict_idle)
+
+    @property
+    def pending_rooms(self) -> int:
+        """Number of rooms with an update waiting to be flushed."""
+        return sum(1 for state in self._rooms.values() if state.pending is not None)
+
+    async def publish(
+        self,
+        room: str,
+        phase: str,
+        data: dict[str, Any],
+        final: bool = False,
+    ) -> None:
+        """Send or coalesce a progress event for a room."""
+        if self._interval <= 0:
+            await self._manager.broadcast_to_room(room, data)
+            return
+
+        state = self._rooms.get(room)
+        if state is None:
+            state = self._rooms[room] = _RoomProgress()
+
+        final = final or phase in TERMINAL_PHASES
+
+        if final or phase != state.phase:
+            # Flush the tail of the previous phase, then deliver immediately
+            await self._flush_pending(room, state)
+            state.phase = phase
+            await self._send(room, state, data)
+            if final:
+                self._rooms.pop(room, None)
+            return
+
+        now = time.monotonic()
+        wait = state.last_sent + self._interval - now
+        if wait <= 0 and state.pending is None:
+            await self._send(room, state, data)
+            return
+
+        # Latest value wins; one delayed flush per room
+        state.pending = data
+        if state.timer is None:
+            state.timer = asyncio.create_task(self._delayed_flush(room, state, max(wait, 0.0)))
+
+    def evict_idle(self) -> int:
+        """Drop rooms with nothing pending and no event for idle_timeout. Returns the count."""
+        if self.idle_timeout <= 0:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [
+            room for room, state in self._rooms.items()
+            if state.pending is None and state.timer is None and state.last_sent <= cutoff
+        ]
+        for room in idle:
+            del self._rooms[room]
+        if idle:
+            logger.info("Progress coalescer evicted %d idle room(s)", len(idle))
+        return len(idle)
+
+    async def flush(self) -> None:
+        """Deliver all pending updates immediately (e.g. on shutdown)."""
+        for room, state in list(self._rooms.items()):
+            await self._flush_pending(room, state)
+
+    async def _delayed_flush(self, room: str, state: _RoomProgress, delay: float) -> None:
+        await asyncio.sleep(delay)
+        state.timer = None
+        if state.pending is not None:
+            data, state.pending = state.pending, None
+            await self._send(room, state, data)
+
+    async def _flush_pending(self, room: str, state: _RoomProgress) -> None:
+        if state.timer is not None:
+            state.timer.cancel()
+            state.timer = None
+        if state.pending is not None:
+            data, state.pending = state.pending, None
+            await self._send(room, state, data)
+
+    async def _send(self, room: str, state: _RoomProgress, data: dict[str, Any]) -> None:
+        state.last_sent = time.monotonic()
+        await self._manager.broadcast_to_room(room, data)
+
+
+progress_coalescer = ProgressCoalescer(manager, max_hz=settings.WS_PROGRESS_MAX_HZ)
+
+
 # =============================================================================
 # Event Publishing Utilities (for use by other services)
 # =============================================================================
@@ -142,15 +717,20 @@ async def publish_ingestion_progress(
     phase: str,
     progress: float,
     message: str | None = None,
+    final: bool = False,
 ) -> None:
-    """Publish ingestion progress to project room."""
-    await manager.broadcast_to_room(f"project:{project_id}", {
+    """Publish ingestion progress to project room.
+
+    Ticks are coalesced per room (see ProgressCoalescer). Phase changes,
+    terminal phases and ``final=True`` are always delivered immediately.
+    """
+    await progress_coalescer.publish(f"project:{project_id}", phase, {
         "type": "ingestion_progress",
         "project_id": project_id,
         "phase": phase,
         "progress": progress,
         "message": message,
-    })
+    }, final=final)
 
 
 async def publish_execution_update(
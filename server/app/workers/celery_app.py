@@ -55,6 +55,16 @@ celery_app.conf.update(
             "args": (90,),  # Keep 90 days
             "options": {"queue": "maintenance"},
         },
+        "flush-usage-ledger": {
+            "task": "server.app.workers.tasks.flush_usage_ledger_task",
+            "schedule": settings.USAGE_LEDGER_FLUSH_INTERVAL,
+            "options": {"queue": "maintenance"},
+        },
+        "export-usage-to-stripe": {
+            "task": "server.app.workers.tasks.export_usage_to_stripe_task",
+            "schedule": settings.USAGE_EXPORT_INTERVAL,
+            "options": {"queue": "maintenance"},
+        },
     },
 
     # Task routing
@@ -64,6 +74,8 @@ celery_app.conf.update(
         "server.app.workers.tasks.process_reflex_task": {"queue": "reflexes"},
         "server.app.workers.tasks.cleanup_old_executions_task": {"queue": "maintenance"},
         "server.app.workers.tasks.check_due_habits_task": {"queue": "habits"},
+        "server.app.workers.tasks.flush_usage_ledger_task": {"queue": "maintenance"},
+        "server.app.workers.tasks.export_usage_to_stripe_task": {"queue": "maintenance"},
     },
 )
 
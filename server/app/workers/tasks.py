@@ -463,6 +463,46 @@ def cleanup_old_executions_task(days: int = 90):
     return {"deleted": deleted_count, "cutoff": cutoff}
 
 
+@shared_task(name="server.app.workers.tasks.flush_usage_ledger_task")
+def flush_usage_ledger_task():
+    """Copy changed Redis usage counters into the usage_metrics ledger.
+
+    Runs every USAGE_LEDGER_FLUSH_INTERVAL seconds via Celery Beat.
+    Idempotent: overlapping or retried runs never double count.
+    """
+    async def _run():
+        import redis.asyncio as aioredis
+
+        from server.app.config import settings
+        from server.app.services.usage_ledger import flush_usage_to_ledger
+
+        client = _get_supabase_client()
+        # Own connection: asyncio.run() gives each task a fresh event loop
+        redis_client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        try:
+            return await flush_usage_to_ledger(
+                client, redis_client, batch_size=settings.USAGE_LEDGER_BATCH_SIZE,
+            )
+        finally:
+            await redis_client.aclose()
+
+    return asyncio.run(_run())
+
+
+@shared_task(name="server.app.workers.tasks.export_usage_to_stripe_task")
+def export_usage_to_stripe_task():
+    """Report new plan overage from the usage ledger to Stripe meters.
+
+    Runs every USAGE_EXPORT_INTERVAL seconds via Celery Beat. Idempotent:
+    a retried or overlapping run never reports the same units twice.
+    """
+    from server.app.config import settings
+    from server.app.services.usage_export import export_usage_to_stripe
+
+    client = _get_supabase_client()
+    return asyncio.run(export_usage_to_stripe(client, concurrency=settings.USAGE_EXPORT_CONCURRENCY))
+
+
 # =============================================================================
 # Helpers
 # =============================================================================
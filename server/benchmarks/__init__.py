@@ -0,0 +1 @@
+# Local load-test harnesses and micro-benchmarks
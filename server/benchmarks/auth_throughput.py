@@ -0,0 +1,201 @@
+"""Throughput of POST /auth/login and /auth/refresh against a local GoTrue.
+
+Compares two implementations of SupabaseAuthService.login/refresh:
+
+- client — the previous path: create_client(SUPABASE_URL, ANON_KEY) per
+           call, then the supabase-py auth client (sync, new connection)
+- http   — the current path: GoTrue REST calls over one pooled httpx client
+
+A threaded stand-in GoTrue serves /auth/v1/token on a local port, so both
+variants pay real sockets and JSON, but no network or password hashing.
+The API app (auth router only) is driven in-process through httpx's ASGI
+transport. Latency percentiles come from a sequential pass; throughput
+from a pass with --concurrency clients.
+
+Usage (from the repository root):
+    python -m server.benchmarks.auth_throughput --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from server.benchmarks.ws_load import percentile
+
+BENCH_USER_ID = str(uuid.UUID(int=1))
+
+
+def _session() -> dict:
+    now = time.time()
+    return {
+        "access_token": "bench-access-token",
+        "refresh_token": "bench-refresh-token",
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "expires_at": int(now) + 3600,
+        "user": {
+            "id": BENCH_USER_ID,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": "bench@example.com",
+            "app_metadata": {"org_id": BENCH_USER_ID, "roles": ["member"]},
+            "user_metadata": {"first_name": "Bench", "last_name": "User"},
+            "created_at": "2026-01-01T00:00:00Z",
+        },
+    }
+
+
+class _GoTrueHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        if not self.path.startswith("/auth/v1/token"):
+            self.send_error(404)
+            return
+        body = json.dumps(_session()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_gotrue() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GoTrueHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_service(variant: str):
+    from server.app.config import settings
+    from server.app.services.supabase_auth import SupabaseAuthService, _session_response
+
+    class _BenchAuthService(SupabaseAuthService):
+        """No admin client: login/refresh never use it."""
+
+        def __init__(self) -> None:
+            self._client = None
+            self._admin_client = None
+            self._jwt_secret = "bench-secret"
+
+    class _CreateClientAuthService(_BenchAuthService):
+        """login/refresh as they were: one supabase client per call."""
+
+        async def login(self, email: str, password: str) -> dict:
+            from supabase import create_client
+            login_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+            result = login_client.auth.sign_in_with_password({"email": email, "password": password})
+            return _session_response(result.session.model_dump())
+
+        async def refresh(self, refresh_token: str) -> dict:
+            from supabase import create_client
+            tmp_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+            result = tmp_client.auth.refresh_session(refresh_token)
+            return _session_response(result.session.model_dump())
+
+    return {"client": _CreateClientAuthService, "http": _BenchAuthService}[variant]()
+
+
+def build_app(service):
+    from fastapi import FastAPI
+
+    from server.app.routers import auth
+    from server.app.services.supabase_auth import get_supabase_auth
+
+    app = FastAPI()
+    app.include_router(auth.router, prefix="/api/v1")
+    app.dependency_overrides[get_supabase_auth] = lambda: service
+    return app
+
+
+async def _run_clients(client, path: str, body: dict, requests: int, concurrency: int):
+    latencies: list[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            resp = await client.post(path, json=body)
+            resp.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1e3)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def _drive(app, path: str, body: dict, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await _run_clients(client, path, body, 20, 1)
+        latencies, _ = await _run_clients(client, path, body, requests, 1)
+        completed, elapsed = await _run_clients(client, path, body, requests, concurrency)
+
+    return {
+        "rps": round(len(completed) / elapsed),
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    from server.app.config import settings
+
+    gotrue = start_gotrue()
+    settings.SUPABASE_URL = f"http://127.0.0.1:{gotrue.server_address[1]}"
+    settings.SUPABASE_ANON_KEY = settings.SUPABASE_ANON_KEY or "bench-anon-key"
+
+    endpoints = {
+        "login": ("/api/v1/auth/login", {"email": "bench@example.com", "password": "bench-password"}),
+        "refresh": ("/api/v1/auth/refresh", {"refresh_token": "bench-refresh-token"}),
+    }
+    report: dict = {}
+    try:
+        for variant in args.variants:
+            service = build_service(variant)
+            app = build_app(service)
+            report[variant] = {
+                name: await _drive(app, path, body, args.requests, args.concurrency)
+                for name, (path, body) in endpoints.items()
+            }
+            await service.close()
+    finally:
+        gotrue.shutdown()
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", "-n", type=int, default=2000)
+    parser.add_argument("--concurrency", "-c", type=int, default=32)
+    parser.add_argument("--variants", nargs="+", choices=("client", "http"), default=["client", "http"])
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmark(args))
+    for endpoint in ("login", "refresh"):
+        print(f"POST /auth/{endpoint}")
+        for variant, results in report.items():
+            r = results[endpoint]
+            print(f"  {variant:<7} {r['rps']:>7} req/s  mean {r['mean_ms']:>7.2f} ms  "
+                  f"p50 {r['p50_ms']:>7.2f} ms  p99 {r['p99_ms']:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
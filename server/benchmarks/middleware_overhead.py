@@ -0,0 +1,162 @@
+"""Per-request overhead of the HTTP middleware stack.
+
+Compares three builds of the same tiny app, driven in-process through
+httpx's ASGI transport (no sockets, so only framework cost is measured):
+
+- none      — no middleware
+- basehttp  — the previous BaseHTTPMiddleware-style Observability + RateLimit
+- asgi      — the current pure-ASGI ObservabilityMiddleware + RateLimitMiddleware
+
+Each build serves a small JSON GET and a streamed export. Latency
+percentiles come from a sequential pass (so they exclude queueing behind
+other requests); throughput from a pass with --concurrency clients.
+
+Usage (from the repository root):
+    python -m server.benchmarks.middleware_overhead --requests 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import uuid
+
+from server.benchmarks.ws_load import percentile
+
+
+def _basehttp_stack():
+    """BaseHTTPMiddleware equivalents of the two middlewares, for comparison."""
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    from server.app.middleware.observability import QUIET_PATHS, logger
+    from server.app.middleware.rate_limit import RATE_LIMITS
+
+    class Observability(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            request_id = request.headers.get("X-Request-ID", str(uuid.uuid4())[:8])
+            start = time.monotonic()
+            response = await call_next(request)
+            duration_ms = int((time.monotonic() - start) * 1000)
+            response.headers["X-Request-ID"] = request_id
+            response.headers["X-Process-Time"] = f"{duration_ms}ms"
+            if request.url.path not in QUIET_PATHS:
+                logger.info(
+                    "request_id=%s method=%s path=%s status=%d duration_ms=%d",
+                    request_id, request.method, request.url.path, response.status_code, duration_ms,
+                )
+            return response
+
+    class RateLimit(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            for path_prefix in RATE_LIMITS:
+                if request.url.path.startswith(path_prefix) and request.method == "POST":
+                    break
+            return await call_next(request)
+
+    return [Observability, RateLimit]
+
+
+def _asgi_stack():
+    from server.app.middleware.observability import ObservabilityMiddleware
+    from server.app.middleware.rate_limit import RateLimitMiddleware
+
+    return [ObservabilityMiddleware, RateLimitMiddleware]
+
+
+def build_app(variant: str, export_chunks: int):
+    from fastapi import FastAPI
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI()
+    stack = {"none": [], "basehttp": _basehttp_stack(), "asgi": _asgi_stack()}[variant]
+    # Same order as main.py: Observability outermost
+    for middleware in reversed(stack):
+        app.add_middleware(middleware)
+
+    @app.get("/item")
+    async def item():
+        return {"id": "b7f3", "name": "bench", "status": "ready"}
+
+    @app.get("/export")
+    async def export():
+        async def rows():
+            for i in range(export_chunks):
+                yield f'{{"row": {i}, "payload": "{"x" * 200}"}}\n'
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def _run_clients(client, path: str, requests: int, concurrency: int) -> tuple[list[float], float]:
+    """Issue ``requests`` GETs from ``concurrency`` clients; return (latencies, elapsed)."""
+    latencies: list[float] = []
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            resp = await client.get(path)
+            resp.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def _drive(app, path: str, requests: int, concurrency: int) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up routing and imports
+        await _run_clients(client, path, 50, 1)
+        latencies, _ = await _run_clients(client, path, requests, 1)
+        completed, elapsed = await _run_clients(client, path, requests, concurrency)
+
+    return {
+        "rps": round(len(completed) / elapsed),
+        "mean_us": round(statistics.fmean(latencies), 1),
+        "p50_us": round(percentile(latencies, 50), 1),
+        "p99_us": round(percentile(latencies, 99), 1),
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    # Keep log I/O out of the measurement; the formatting cost still counts
+    logging.getLogger("kijko.http").setLevel(logging.WARNING)
+
+    report: dict = {}
+    for variant in args.variants:
+        app = build_app(variant, args.export_chunks)
+        report[variant] = {
+            "item": await _drive(app, "/item", args.requests, args.concurrency),
+            "export": await _drive(app, "/export", max(1, args.requests // 10), args.concurrency),
+        }
+    return report
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", "-n", type=int, default=5000)
+    parser.add_argument("--concurrency", "-c", type=int, default=32)
+    parser.add_argument("--export-chunks", type=int, default=500, help="rows per streamed export")
+    parser.add_argument("--variants", nargs="+", choices=("none", "basehttp", "asgi"),
+                        default=["none", "basehttp", "asgi"])
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmark(args))
+    for endpoint in ("item", "export"):
+        print(f"GET /{endpoint}")
+        for variant, results in report.items():
+            r = results[endpoint]
+            print(f"  {variant:<9} {r['rps']:>7} req/s  mean {r['mean_us']:>9.1f} us  "
+                  f"p50 {r['p50_us']:>9.1f} us  p99 {r['p99_us']:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""WebSocket load-test harness — connection scale and fan-out latency.
+
+Spawns a uvicorn worker serving the real /ws router, opens N authenticated
+sockets against it, joins rooms, drives the publish_* helpers inside the
+worker and reports:
+
+- delivery latency p50/p99 per event type (publish call → client receive)
+- server memory per connection (RSS delta / N)
+- server CPU utilisation while fanning out
+
+Runs fully locally: tokens are HS256-signed with a throwaway secret and
+validated by the normal SupabaseAuthService path; rooms live in the
+in-process ConnectionManager. No Supabase, Redis or network access needed.
+
+Usage (from the repository root):
+    python -m server.benchmarks.ws_load --connections 2000 --events 200
+    python -m server.benchmarks.ws_load --protocol msgpack --orgs 1
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import statistics
+import sys
+import time
+
+BENCH_SECRET = "ws-load-local-secret-" + "x" * 32
+EVENT_KINDS = ("notification", "execution_update", "ingestion_progress")
+
+
+# =============================================================================
+# Server (child process)
+# =============================================================================
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak RSS is the best portable approximation (KiB on Linux, bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _build_app():
+    """The /ws router plus benchmark-only driver endpoints."""
+    from contextlib import asynccontextmanager
+
+    from fastapi import FastAPI
+
+    from server.app.routers import ws
+    from server.app.services import supabase_auth
+    from server.app.services.supabase_auth import SupabaseAuthService
+    from server.app.services.websocket import (
+        manager,
+        progress_coalescer,
+        publish_execution_update,
+        publish_ingestion_progress,
+        publish_notification,
+    )
+
+    class _LocalAuthService(SupabaseAuthService):
+        """Token validation only — skips the GoTrue clients."""
+
+        def __init__(self, jwt_secret: str) -> None:
+            self._client = None
+            self._admin_client = None
+            self._jwt_secret = jwt_secret
+
+    supabase_auth._auth_service = _LocalAuthService(BENCH_SECRET)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        manager.start_heartbeat()
+        yield
+        await manager.stop_heartbeat()
+        await progress_coalescer.flush()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(ws.router)
+
+    @app.get("/__bench/stats")
+    async def stats():
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "rss": _rss_bytes(),
+            "cpu": usage.ru_utime + usage.ru_stime,
+            "connections": manager.active_connections,
+        }
+
+    @app.post("/__bench/drive")
+    async def drive(kind: str, count: int, rate: float, users: int, orgs: int, projects: int):
+        """Publish ``count`` events at ``rate``/s; each carries its send time."""
+        interval = 1.0 / rate if rate > 0 else 0.0
+        start = time.monotonic()
+        for seq in range(count):
+            stamp = f"{seq}:{time.time()}"
+            if kind == "notification":
+                await publish_notification(f"org-{seq % orgs}", "bench", stamp)
+            elif kind == "execution_update":
+                await publish_execution_update(f"user-{seq % users}", stamp, "running")
+            else:
+                # Distinct phases bypass coalescing so every tick is delivered
+                await publish_ingestion_progress(
+                    f"bench-{seq % projects}", f"phase-{seq}", seq / count, message=stamp,
+                )
+            if interval:
+                delay = start + (seq + 1) * interval - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        return {"published": count}
+
+    return app
+
+
+def _serve(port: int, ws_impl: str, deflate: bool) -> None:
+    import uvicorn
+
+    _raise_fd_limit()
+    uvicorn.run(
+        _build_app(),
+        host="127.0.0.1",
+        port=port,
+        ws=ws_impl,
+        ws_per_message_deflate=deflate,
+        log_level="warning",
+        backlog=4096,
+    )
+
+
+# =============================================================================
+# Clients (parent process)
+# =============================================================================
+
+def _raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def mint_token(user_id: str, org_id: str, ttl: int = 3600) -> str:
+    """Sign a Supabase-shaped access token with the local secret."""
+    import jwt
+
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": user_id,
+            "aud": "authenticated",
+            "iat": now,
+            "exp": now + ttl,
+            "email": f"{user_id}@bench.local",
+            "app_metadata": {"org_id": org_id, "roles": ["user"]},
+            "user_metadata": {},
+        },
+        BENCH_SECRET,
+        algorithm="HS256",
+    )
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty sample."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class _Client:
+    """One benchmark socket: decodes frames and records event latency."""
+
+    def __init__(self, ws, protocol: str, latencies: dict[str, list[float]]) -> None:
+        self.ws = ws
+        self.protocol = protocol
+        self.latencies = latencies
+        self.received = 0
+        self.joined = asyncio.Event()
+
+    def _decode(self, frame) -> dict:
+        if isinstance(frame, bytes):
+            import msgpack
+            return msgpack.unpackb(frame, raw=False)
+        return json.loads(frame)
+
+    async def _send(self, data: dict) -> None:
+        if self.protocol == "msgpack":
+            import msgpack
+            await self.ws.send(msgpack.packb(data, use_bin_type=True))
+        else:
+            await self.ws.send(json.dumps(data))
+
+    async def join(self, room: str) -> None:
+        await self._send({"action": "join", "room": room})
+
+    async def run(self) -> None:
+        async for frame in self.ws:
+            received_at = time.time()
+            event = self._decode(frame)
+            kind = event.get("type")
+            if kind == "ping":
+                await self._send({"action": "pong"})
+                continue
+            if kind == "room_joined":
+                self.joined.set()
+                continue
+            stamp = {
+                "notification": event.get("message"),
+                "execution_update": event.get("execution_id"),
+                "ingestion_progress": event.get("message"),
+            }.get(kind)
+            if not stamp or ":" not in stamp:
+                continue
+            sent_at = float(stamp.split(":", 1)[1])
+            self.latencies[kind].append((received_at - sent_at) * 1000)
+            self.received += 1
+
+
+async def _open_clients(
+    url: str,
+    n: int,
+    orgs: int,
+    projects: int,
+    protocol: str,
+    concurrency: int,
+    latencies: dict[str, list[float]],
+) -> tuple[list[_Client], list[asyncio.Task], float]:
+    import websockets
+
+    subprotocols = ["kijko.msgpack.v1"] if protocol == "msgpack" else ["kijko.json.v1"]
+    gate = asyncio.Semaphore(concurrency)
+    clients: list[_Client] = [None] * n
+    tasks: list[asyncio.Task] = []
+
+    async def open_one(i: int) -> None:
+        token = mint_token(f"user-{i}", f"org-{i % orgs}")
+        async with gate:
+            ws = await websockets.connect(
+                f"{url}?token={token}",
+                subprotocols=subprotocols,
+                max_queue=None,
+                ping_interval=None,
+                open_timeout=30,
+            )
+        client = _Client(ws, protocol, latencies)
+        clients[i] = client
+        tasks.append(asyncio.create_task(client.run()))
+        await client.join(f"project:bench-{i % projects}")
+        await asyncio.wait_for(client.joined.wait(), timeout=30)
+
+    started = time.monotonic()
+    await asyncio.gather(*(open_one(i) for i in range(n)))
+    return clients, tasks, time.monotonic() - started
+
+
+def _expected_deliveries(kind: str, events: int, n: int, orgs: int, projects: int) -> int:
+    """How many frames ``events`` publishes of ``kind`` should produce."""
+    if kind == "execution_update":
+        return events
+    groups = orgs if kind == "notification" else projects
+    return sum(len(range(g, n, groups)) for g in (seq % groups for seq in range(events)))
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    import httpx
+
+    _raise_fd_limit()
+    port = _free_port()
+    ctx = multiprocessing.get_context("spawn")
+    server = ctx.Process(
+        target=_serve, args=(port, args.ws, args.deflate), daemon=True,
+    )
+    server.start()
+
+    base = f"http://127.0.0.1:{port}"
+    latencies: dict[str, list[float]] = {kind: [] for kind in EVENT_KINDS}
+    report: dict = {"connections": args.connections, "protocol": args.protocol}
+
+    try:
+        async with httpx.AsyncClient(base_url=base, timeout=None) as http:
+            for _ in range(200):
+                try:
+                    idle = (await http.get("/__bench/stats")).json()
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.05)
+            else:
+                raise RuntimeError("benchmark server did not start")
+
+            clients, tasks, connect_s = await _open_clients(
+                f"ws://127.0.0.1:{port}/ws", args.connections, args.orgs,
+                args.projects, args.protocol, args.connect_concurrency, latencies,
+            )
+            loaded = (await http.get("/__bench/stats")).json()
+            report["connect_seconds"] = round(connect_s, 3)
+            report["server_connections"] = loaded["connections"]
+            report["rss_idle_mb"] = round(idle["rss"] / 2**20, 1)
+            report["rss_loaded_mb"] = round(loaded["rss"] / 2**20, 1)
+            report["bytes_per_connection"] = int((loaded["rss"] - idle["rss"]) / args.connections)
+
+            expected = 0
+            for kind in args.kinds:
+                before = (await http.get("/__bench/stats")).json()
+                wall = time.monotonic()
+                await http.post("/__bench/drive", params={
+                    "kind": kind, "count": args.events, "rate": args.rate,
+                    "users": args.connections, "orgs": args.orgs, "projects": args.projects,
+                })
+                expected += _expected_deliveries(
+                    kind, args.events, args.connections, args.orgs, args.projects,
+                )
+                deadline = time.monotonic() + args.drain_timeout
+                while sum(c.received for c in clients) < expected and time.monotonic() < deadline:
+                    await asyncio.sleep(0.01)
+                after = (await http.get("/__bench/stats")).json()
+                elapsed = time.monotonic() - wall
+
+                samples = latencies[kind]
+                report[kind] = {
+                    "delivered": len(samples),
+                    "p50_ms": round(percentile(samples, 50), 2),
+                    "p99_ms": round(percentile(samples, 99), 2),
+                    "max_ms": round(max(samples, default=0.0), 2),
+                    "mean_ms": round(statistics.fmean(samples), 2) if samples else 0.0,
+                    "server_cpu_pct": round(100 * (after["cpu"] - before["cpu"]) / elapsed, 1),
+                }
+
+            report["delivered_total"] = sum(c.received for c in clients)
+            report["expected_total"] = expected
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*(c.ws.close() for c in clients), return_exceptions=True)
+    finally:
+        server.terminate()
+        server.join(timeout=5)
+
+    return report
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", "-n", type=int, default=1000)
+    parser.add_argument("--orgs", type=int, default=10, help="org rooms (notification fan-out = n/orgs)")
+    parser.add_argument("--projects", type=int, default=50, help="project rooms joined round-robin")
+    parser.add_argument("--events", type=int, default=100, help="events published per kind")
+    parser.add_argument("--rate", type=float, default=50.0, help="events/s per kind (0 = as fast as possible)")
+    parser.add_argument("--kinds", nargs="+", choices=EVENT_KINDS, default=list(EVENT_KINDS))
+    parser.add_argument("--protocol", choices=("json", "msgpack"), default="json")
+    parser.add_argument("--ws", choices=("websockets", "wsproto"), default="websockets")
+    parser.add_argument("--deflate", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"connections      {report['server_connections']}/{report['connections']} "
+          f"({report['protocol']}, opened in {report['connect_seconds']}s)")
+    print(f"server RSS       {report['rss_idle_mb']} MB idle → {report['rss_loaded_mb']} MB loaded "
+          f"(~{report['bytes_per_connection'] / 1024:.1f} KiB/connection)")
+    for kind in args.kinds:
+        r = report[kind]
+        print(f"{kind:<18} p50 {r['p50_ms']:>8.2f} ms  p99 {r['p99_ms']:>8.2f} ms  "
+              f"max {r['max_ms']:>8.2f} ms  delivered {r['delivered']:>7}  cpu {r['server_cpu_pct']}%")
+    print(f"delivered        {report['delivered_total']}/{report['expected_total']}")
+
+
+if __name__ == "__main__":
+    main()
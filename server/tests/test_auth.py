@@ -4,6 +4,7 @@ Uses a test RSA key pair to sign JWTs, mocking Keycloak's JWKS response.
 No live Keycloak needed — all HTTP calls are mocked.
 """
 
+import json
 import time
 import uuid
 from unittest.mock import AsyncMock, patch
@@ -329,3 +330,292 @@ class TestAuthValidation:
             },
         )
         assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# Verified Claims Cache Tests
+# ---------------------------------------------------------------------------
+
+def _make_supabase_token(sub: str = TEST_USER_ID, exp_in: int = 3600) -> str:
+    """A Supabase-style HS256 token (aud=authenticated)."""
+    now = int(time.time())
+    return jwt.encode(
+        {
+            "sub": sub,
+            "email": TEST_EMAIL,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "app_metadata": {"org_id": TEST_ORG_ID, "roles": ["member"]},
+            "user_metadata": {"first_name": "Test", "last_name": "User"},
+            "iat": now,
+            "exp": now + exp_in,
+        },
+        TEST_SECRET,
+        algorithm="HS256",
+    )
+
+
+@pytest.fixture
+def supabase_auth():
+    """SupabaseAuthService without GoTrue clients, over an empty claims cache."""
+    from server.app.services import supabase_auth as module
+
+    class _LocalAuthService(module.SupabaseAuthService):
+        def __init__(self) -> None:
+            self._client = None
+            self._admin_client = None
+            self._jwt_secret = TEST_SECRET
+
+    cache = module.VerifiedClaimsCache(max_size=2)
+    with patch.object(module, "verified_claims", cache):
+        yield _LocalAuthService(), cache
+
+
+class TestVerifiedClaimsCache:
+    """validate_token reuses verified claims until exp or revocation."""
+
+    def test_second_validation_skips_decode(self, supabase_auth):
+        auth, cache = supabase_auth
+        token = _make_supabase_token()
+        first = auth.validate_token(token)
+        with patch("server.app.services.supabase_auth.jwt.decode") as decode:
+            second = auth.validate_token(token)
+        decode.assert_not_called()
+        assert second == first
+        assert second["org_id"] == TEST_ORG_ID
+        assert cache.stats()["hits"] == 1
+
+    def test_returned_claims_are_copies(self, supabase_auth):
+        auth, _ = supabase_auth
+        token = _make_supabase_token()
+        auth.validate_token(token)["roles"].append("admin")
+        assert "admin" not in auth.validate_token(token)["roles"]
+
+    def test_entry_expires_with_token(self, supabase_auth):
+        auth, cache = supabase_auth
+        token = _make_supabase_token(exp_in=60)
+        auth.validate_token(token)
+        with patch("server.app.services.supabase_auth.time.time", return_value=time.time() + 120):
+            assert cache.get(next(iter(cache._claims))) is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_is_bounded(self, supabase_auth):
+        auth, cache = supabase_auth
+        for i in range(3):
+            auth.validate_token(_make_supabase_token(sub=str(uuid.UUID(int=i))))
+        assert cache.stats()["size"] == 2
+
+    def test_invalid_token_not_cached(self, supabase_auth):
+        from fastapi import HTTPException
+
+        auth, cache = supabase_auth
+        with pytest.raises(HTTPException):
+            auth.validate_token("not-a-jwt")
+        assert cache.stats()["size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_revoked_token_rejected_and_broadcast(self, supabase_auth):
+        from fastapi import HTTPException
+
+        auth, cache = supabase_auth
+        token = _make_supabase_token()
+        auth.validate_token(token)
+
+        redis_client = AsyncMock()
+        await auth.revoke_token(token, redis_client=redis_client)
+
+        with pytest.raises(HTTPException) as exc:
+            auth.validate_token(token)
+        assert exc.value.detail == "Token has been revoked"
+        assert redis_client.set.call_args.kwargs["ex"] > 3500
+        channel, message = redis_client.publish.call_args.args
+        assert channel == "auth:revoked"
+        assert message.startswith(redis_client.set.call_args.args[0].rsplit(":", 1)[1])
+
+    @pytest.mark.asyncio
+    async def test_non_jwt_not_revoked(self, supabase_auth):
+        auth, cache = supabase_auth
+        redis_client = AsyncMock()
+        await auth.revoke_token("opaque-refresh-token", redis_client=redis_client)
+        redis_client.publish.assert_not_called()
+        assert cache.stats()["revoked"] == 0
+
+    @pytest.mark.asyncio
+    async def test_forged_token_not_revoked(self, supabase_auth):
+        auth, cache = supabase_auth
+        forged = jwt.encode(
+            {"sub": TEST_USER_ID, "aud": "authenticated", "exp": int(time.time()) + 10**8},
+            "not-the-secret",
+            algorithm="HS256",
+        )
+        redis_client = AsyncMock()
+        await auth.revoke_token(forged, redis_client=redis_client)
+        redis_client.set.assert_not_called()
+        redis_client.publish.assert_not_called()
+        assert cache.stats()["revoked"] == 0
+
+    def test_broadcast_revocation_applied(self, supabase_auth):
+        from server.app.services.supabase_auth import _token_digest
+
+        _, cache = supabase_auth
+        digest = _token_digest("t")
+        cache.revoke(digest, time.time() + 60)
+        cache.revoke("stale", time.time() - 1)
+        assert cache.is_revoked(digest)
+        assert not cache.is_revoked("stale")
+
+    def test_logout_endpoint_revokes_bearer(self, client):
+        with patch(
+            "server.app.services.supabase_auth.SupabaseAuthService.logout",
+            new_callable=AsyncMock,
+        ), patch(
+            "server.app.services.supabase_auth.SupabaseAuthService.revoke_token",
+            new_callable=AsyncMock,
+        ) as revoke:
+            resp = client.post(
+                "/api/v1/auth/logout",
+                json={"refresh_token": "some-refresh-token"},
+                headers={"Authorization": "Bearer access-token"},
+            )
+        assert resp.status_code == 204
+        revoke.assert_awaited_once_with("access-token")
+
+
+# ---------------------------------------------------------------------------
+# GoTrue HTTP Path Tests
+# ---------------------------------------------------------------------------
+
+def _gotrue_session(access_token: str = "gotrue-access") -> dict:
+    return {
+        "access_token": access_token,
+        "refresh_token": "gotrue-refresh",
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "user": {"id": TEST_USER_ID, "email": TEST_EMAIL},
+    }
+
+
+@pytest.fixture
+def gotrue(supabase_auth):
+    """SupabaseAuthService whose pooled client talks to a mock GoTrue."""
+    import httpx
+
+    auth, _ = supabase_auth
+    requests: list = []
+    routes: dict = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        key = (request.method, request.url.path, request.url.params.get("grant_type"))
+        status_code, body = routes.get(key, (404, {"msg": "not found"}))
+        return httpx.Response(status_code, json=body)
+
+    auth._http_client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        base_url="http://gotrue.test/auth/v1",
+    )
+    return auth, routes, requests
+
+
+class TestGoTrueHTTP:
+    """signup/login/refresh go straight to GoTrue over the pooled client."""
+
+    @pytest.mark.asyncio
+    async def test_login_success(self, gotrue):
+        auth, routes, requests = gotrue
+        routes[("POST", "/auth/v1/token", "password")] = (200, _gotrue_session())
+
+        with patch("supabase.create_client", side_effect=AssertionError("no per-call clients")):
+            result = await auth.login(TEST_EMAIL, "password123")
+
+        assert result == {
+            "access_token": "gotrue-access",
+            "refresh_token": "gotrue-refresh",
+            "token_type": "Bearer",
+            "expires_in": 3600,
+        }
+        assert json.loads(requests[0].content) == {"email": TEST_EMAIL, "password": "password123"}
+
+    @pytest.mark.asyncio
+    async def test_login_invalid_credentials(self, gotrue):
+        from fastapi import HTTPException
+
+        auth, routes, _ = gotrue
+        routes[("POST", "/auth/v1/token", "password")] = (
+            400, {"code": 400, "error_code": "invalid_credentials", "msg": "Invalid login credentials"},
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.login(TEST_EMAIL, "wrong-password")
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_login_gotrue_down(self, gotrue):
+        from fastapi import HTTPException
+
+        auth, routes, _ = gotrue
+        routes[("POST", "/auth/v1/token", "password")] = (502, {"msg": "bad gateway"})
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.login(TEST_EMAIL, "password123")
+        assert exc.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_refresh(self, gotrue):
+        from fastapi import HTTPException
+
+        auth, routes, requests = gotrue
+        routes[("POST", "/auth/v1/token", "refresh_token")] = (200, _gotrue_session("refreshed"))
+
+        result = await auth.refresh("gotrue-refresh")
+        assert result["access_token"] == "refreshed"
+        assert json.loads(requests[0].content) == {"refresh_token": "gotrue-refresh"}
+
+        routes[("POST", "/auth/v1/token", "refresh_token")] = (
+            400, {"error": "invalid_grant", "error_description": "Invalid Refresh Token"},
+        )
+        with pytest.raises(HTTPException) as exc:
+            await auth.refresh("revoked")
+        assert exc.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_signup_assigns_org_and_relogs_in(self, gotrue):
+        auth, routes, requests = gotrue
+        routes[("POST", "/auth/v1/signup", None)] = (200, _gotrue_session("initial"))
+        routes[("PUT", f"/auth/v1/admin/users/{TEST_USER_ID}", None)] = (200, {"id": TEST_USER_ID})
+        routes[("POST", "/auth/v1/token", "password")] = (200, _gotrue_session("with-org"))
+
+        with patch("server.app.services.supabase_auth.settings.SUPABASE_SERVICE_KEY", "service-key"):
+            result = await auth.signup(TEST_EMAIL, "password123", "Test", "User")
+
+        assert result["access_token"] == "with-org"
+        signup, update, _ = requests
+        assert json.loads(signup.content)["data"] == {"first_name": "Test", "last_name": "User"}
+        assert update.headers["Authorization"] == "Bearer service-key"
+        assert json.loads(update.content) == {
+            "app_metadata": {"org_id": TEST_USER_ID, "roles": ["member"]},
+        }
+
+    @pytest.mark.asyncio
+    async def test_signup_duplicate_email(self, gotrue):
+        from fastapi import HTTPException
+
+        auth, routes, _ = gotrue
+        routes[("POST", "/auth/v1/signup", None)] = (
+            422, {"code": 422, "error_code": "user_already_exists", "msg": "User already registered"},
+        )
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.signup(TEST_EMAIL, "password123", "Test", "User")
+        assert exc.value.status_code == 409
+
+    @pytest.mark.asyncio
+    async def test_signup_without_session(self, gotrue):
+        from fastapi import HTTPException
+
+        auth, routes, _ = gotrue
+        routes[("POST", "/auth/v1/signup", None)] = (200, {"id": TEST_USER_ID, "email": TEST_EMAIL})
+
+        with pytest.raises(HTTPException) as exc:
+            await auth.signup(TEST_EMAIL, "password123", "Test", "User")
+        assert exc.value.status_code == 400
@@ -354,3 +354,683 @@ class TestUsageService:
         enterprise = PLAN_LIMITS[PlanTier.ENTERPRISE]
         assert enterprise["api_calls"] == 100000
         assert enterprise["seats"] == 100
+
+
+class TestQuotaReservation:
+    """Tests for atomic quota reservation and refunds."""
+
+    def _redis(self, reply):
+        script = AsyncMock(return_value=reply)
+        redis = MagicMock()
+        redis.register_script.return_value = script
+        return redis, script
+
+    @pytest.mark.asyncio
+    async def test_reserve_is_one_script_call(self):
+        """reserve_quota checks and increments in a single Lua call."""
+        from server.app.services.usage import RESERVE_SCRIPT, USAGE_TTL_SECONDS, reserve_quota
+
+        redis, script = self._redis([1, 42])
+        reservation = await reserve_quota("org-1", "api_calls", "free", redis_client=redis)
+
+        redis.register_script.assert_called_once_with(RESERVE_SCRIPT)
+        key, leases = script.call_args.kwargs["keys"]
+        assert key.startswith("usage:org-1:api_calls:")
+        assert leases == f"quota:leases:{key}"
+        assert script.call_args.kwargs["args"] == [1, 100, USAGE_TTL_SECONDS]
+        assert reservation.granted is True
+        assert reservation.used == 42
+        assert reservation.remaining == 58
+
+    @pytest.mark.asyncio
+    async def test_reserve_denied_at_limit(self):
+        """A denied reservation reports the current total and takes nothing."""
+        from server.app.services.usage import reserve_quota
+
+        redis, _ = self._redis([0, 100])
+        reservation = await reserve_quota("org-1", "api_calls", "free", redis_client=redis)
+
+        assert reservation.granted is False
+        assert reservation.used == 100
+        assert reservation.remaining == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_category_never_granted(self):
+        """Categories without a limit are denied without touching Redis."""
+        from server.app.services.usage import reserve_quota
+
+        redis, script = self._redis([1, 1])
+        reservation = await reserve_quota("org-1", "nonexistent", "free", redis_client=redis)
+
+        assert reservation.granted is False
+        script.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_release_is_idempotent(self):
+        """A reservation is refunded at most once, on its original period key."""
+        from server.app.services.usage import RELEASE_SCRIPT, QuotaReservation, release_quota
+
+        redis, script = self._redis(0)
+        reservation = QuotaReservation(True, 5, 100, "usage:org-1:api_calls:2026-01", 1)
+
+        await release_quota(reservation, redis_client=redis)
+        await release_quota(reservation, redis_client=redis)
+
+        redis.register_script.assert_called_once_with(RELEASE_SCRIPT)
+        script.assert_awaited_once_with(keys=["usage:org-1:api_calls:2026-01"], args=[1])
+
+    def _quota_app(self, handler_fails: bool):
+        from fastapi import Depends, FastAPI
+
+        from server.app.dependencies import get_supabase
+        from server.app.middleware.auth import require_auth
+        from server.app.middleware.quota import require_quota
+
+        quota_app = FastAPI()
+
+        @quota_app.post("/run")
+        async def run(reservation=Depends(require_quota("api_calls"))):
+            if handler_fails:
+                raise RuntimeError("downstream failed")
+            return {"used": reservation.used}
+
+        quota_app.dependency_overrides[require_auth] = lambda: {"sub": "u1", "org_id": "org-1"}
+        quota_app.dependency_overrides[get_supabase] = lambda: MagicMock()
+        return quota_app
+
+    def test_require_quota_sets_headers(self):
+        """Granted requests carry the remaining quota."""
+        from server.app.services.entitlements import resolve_entitlements
+        from server.app.services.usage import QuotaReservation
+
+        reservation = QuotaReservation(True, 10, 1000, "usage:org-1:api_calls:p", 1)
+        entitlements = AsyncMock(return_value=resolve_entitlements("pro"))
+        leased = AsyncMock(return_value=reservation)
+        with patch("server.app.middleware.quota.get_entitlements", entitlements), \
+             patch("server.app.middleware.quota.quota_leases.reserve", leased) as reserve, \
+             patch("server.app.middleware.quota.release_quota", AsyncMock()) as release:
+            resp = TestClient(self._quota_app(handler_fails=False)).post("/run")
+
+        assert resp.status_code == 200
+        assert resp.headers["X-RateLimit-Limit"] == "1000"
+        assert resp.headers["X-RateLimit-Remaining"] == "990"
+        reserve.assert_awaited_once_with("org-1", "api_calls", "pro")
+        release.assert_not_awaited()
+
+    def test_require_quota_refunds_on_failure(self):
+        """A failing handler gets its reservation refunded."""
+        from server.app.services.entitlements import resolve_entitlements
+        from server.app.services.usage import QuotaReservation
+
+        reservation = QuotaReservation(True, 10, 1000, "usage:org-1:api_calls:p", 1)
+        entitlements = AsyncMock(return_value=resolve_entitlements("pro"))
+        leased = AsyncMock(return_value=reservation)
+        with patch("server.app.middleware.quota.get_entitlements", entitlements), \
+             patch("server.app.middleware.quota.quota_leases.reserve", leased), \
+             patch("server.app.middleware.quota.release_quota", AsyncMock()) as release:
+            client = TestClient(self._quota_app(handler_fails=True), raise_server_exceptions=False)
+            resp = client.post("/run")
+
+        assert resp.status_code == 500
+        release.assert_awaited_once_with(reservation)
+
+    def test_require_quota_rejects_when_exhausted(self):
+        """Exhausted quota → 429 with reset headers, nothing to refund."""
+        from server.app.services.entitlements import resolve_entitlements
+        from server.app.services.usage import QuotaReservation
+
+        reservation = QuotaReservation(False, 1000, 1000, "usage:org-1:api_calls:p", 1)
+        entitlements = AsyncMock(return_value=resolve_entitlements("pro"))
+        leased = AsyncMock(return_value=reservation)
+        with patch("server.app.middleware.quota.get_entitlements", entitlements), \
+             patch("server.app.middleware.quota.quota_leases.reserve", leased), \
+             patch("server.app.middleware.quota.release_quota", AsyncMock()) as release:
+            resp = TestClient(self._quota_app(handler_fails=False)).post("/run")
+
+        assert resp.status_code == 429
+        assert resp.headers["X-RateLimit-Remaining"] == "0"
+        assert int(resp.headers["Retry-After"]) > 0
+        release.assert_not_awaited()
+
+
+class TestQuotaLeaser:
+    """Tests for per-process quota leases."""
+
+    def _redis(self, lease_reply):
+        from server.app.services.usage import LEASE_SCRIPT, RELEASE_SCRIPT, RETURN_SCRIPT
+
+        scripts = {
+            LEASE_SCRIPT: AsyncMock(return_value=lease_reply),
+            RELEASE_SCRIPT: AsyncMock(return_value=0),
+            RETURN_SCRIPT: AsyncMock(return_value=0),
+        }
+        redis = MagicMock()
+        redis.register_script.side_effect = lambda src: scripts[src]
+        self.return_script = scripts[RETURN_SCRIPT]
+        return redis, scripts[LEASE_SCRIPT], scripts[RELEASE_SCRIPT]
+
+    @pytest.mark.asyncio
+    async def test_one_redis_call_per_block(self):
+        """A leased block serves many reservations without touching Redis."""
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        # 100k plan, 20k used → block of 4000, new total 24000
+        redis, lease_script, _ = self._redis([4000, 24000])
+
+        first = await leaser.reserve("org-1", "api_calls", "enterprise", redis_client=redis)
+        for _ in range(99):
+            last = await leaser.reserve("org-1", "api_calls", "enterprise", redis_client=redis)
+
+        lease_script.assert_awaited_once()
+        assert lease_script.call_args.kwargs["args"][:3] == [100000, 0.05, 10]
+        assert lease_script.call_args.kwargs["keys"][1].startswith("quota:leases:usage:org-1:api_calls:")
+        assert first.granted and last.granted
+        assert first.used == 20001
+        assert last.used == 20100
+        assert leaser.stats()["leased_units"] == 3900
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_refill(self):
+        """Only one coroutine refills a key; the rest take from its lease."""
+        import asyncio
+
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([500, 500])
+
+        async def slow_lease(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return [500, 500]
+
+        lease_script.side_effect = slow_lease
+        results = await asyncio.gather(*(
+            leaser.reserve("org-1", "api_calls", "teams", redis_client=redis) for _ in range(20)
+        ))
+
+        assert all(r.granted for r in results)
+        assert lease_script.await_count == 1
+        assert leaser.stats()["refills"] == 1
+
+    @pytest.mark.asyncio
+    async def test_near_limit_falls_back_to_per_request(self):
+        """With no block worth leasing, each request is checked in Redis."""
+        from server.app.services.usage import QuotaLeaser, QuotaReservation
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, _, _ = self._redis([0, 95])
+        denied = QuotaReservation(False, 100, 100, "usage:org-1:api_calls:p", 1)
+
+        with patch("server.app.services.usage.reserve_quota", AsyncMock(return_value=denied)) as reserve:
+            result = await leaser.reserve("org-1", "api_calls", "free", redis_client=redis)
+
+        reserve.assert_awaited_once_with("org-1", "api_calls", "free", 1, redis)
+        assert result is denied
+        assert leaser.stats()["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_leasing_uses_reserve_quota(self):
+        """fraction=0 turns leasing off entirely."""
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([0, 0])
+
+        with patch("server.app.services.usage.reserve_quota", AsyncMock()) as reserve:
+            await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+
+        reserve.assert_awaited_once()
+        lease_script.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_refund_returns_units_to_lease(self):
+        """Refunding a leased reservation is local while the lease is held."""
+        from server.app.services.usage import QuotaLeaser, release_quota
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, _, release_script = self._redis([50, 50])
+
+        reservation = await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+        assert leaser.stats()["leased_units"] == 49
+
+        await release_quota(reservation, redis_client=redis)
+        release_script.assert_not_awaited()
+        assert leaser.stats()["leased_units"] == 50
+
+    @pytest.mark.asyncio
+    async def test_release_all_commits_spent_units(self):
+        """Shutdown bills exactly the spent units of every lease and drops the rest."""
+        from server.app.services.usage import USAGE_TTL_SECONDS, QuotaLeaser, release_quota
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, _, release_script = self._redis([50, 50])
+
+        reservation = None
+        for _ in range(3):
+            reservation = await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+        await leaser.release_all(redis_client=redis)
+
+        key = reservation.key
+        self.return_script.assert_awaited_once_with(
+            keys=[key, f"quota:leases:{key}"], args=[leaser.lease_id, 3, USAGE_TTL_SECONDS],
+        )
+        release_script.assert_not_awaited()
+        assert leaser.stats()["leases"] == 0
+
+        # Refunds after the lease is gone go straight to Redis
+        await release_quota(reservation, redis_client=redis)
+        release_script.assert_awaited_with(keys=[key], args=[1])
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_returned_before_refill(self):
+        """Stale leases commit their spent units and the key is leased afresh."""
+        from server.app.services.usage import USAGE_TTL_SECONDS, QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([50, 50])
+
+        reservation = await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+        reservation.lease.expires_at = 0.0
+
+        await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+
+        self.return_script.assert_awaited_once_with(
+            keys=[reservation.key, f"quota:leases:{reservation.key}"],
+            args=[leaser.lease_id, 1, USAGE_TTL_SECONDS],
+        )
+        assert lease_script.await_count == 2
+        # The fresh lease starts with nothing spent or held
+        assert lease_script.call_args.kwargs["args"][5:7] == [0, 0]
+        assert reservation.lease.closed
+
+    @pytest.mark.asyncio
+    async def test_refill_commits_spent_units_only(self):
+        """A refill bills the units spent since the last one, never the unspent ones."""
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([10, 10])
+
+        for _ in range(12):
+            await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+
+        first, second = lease_script.call_args_list
+        lease_id, spent, held, lease_ttl_ms = second.kwargs["args"][4:]
+        assert first.kwargs["args"][5:7] == [0, 0]
+        assert (lease_id, spent, held) == (leaser.lease_id, 10, 0)
+        assert lease_ttl_ms == 120_000
+        assert leaser._leases[first.kwargs["keys"][0]].spent == 2
+
+    @pytest.mark.asyncio
+    async def test_empty_lease_dropped_on_fallback(self):
+        """A key too close to its limit keeps no lease around to return later."""
+        from server.app.services.usage import QuotaLeaser, QuotaReservation
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, _, _ = self._redis([0, 95])
+        granted = QuotaReservation(True, 96, 100, "usage:org-1:api_calls:p", 1)
+
+        with patch("server.app.services.usage.reserve_quota", AsyncMock(return_value=granted)):
+            await leaser.reserve("org-1", "api_calls", "free", redis_client=redis)
+
+        assert leaser.stats()["leases"] == 0
+        self.return_script.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_sweep_commits_idle_lease(self):
+        """An expired lease is committed by the sweep without any further reserve()."""
+        import time
+
+        from server.app.services import usage
+        from server.app.services.usage import USAGE_TTL_SECONDS, QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([50, 50])
+
+        for _ in range(3):
+            reservation = await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+        clock = MagicMock()
+        clock.monotonic.return_value = time.monotonic() + 61
+        with patch.object(usage, "time", clock):
+            await leaser.sweep(redis_client=redis)
+
+        self.return_script.assert_awaited_once_with(
+            keys=[reservation.key, f"quota:leases:{reservation.key}"],
+            args=[leaser.lease_id, 3, USAGE_TTL_SECONDS],
+        )
+        assert lease_script.await_count == 1
+        assert leaser.stats()["leases"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_return_does_not_fail_reserve(self):
+        """A Redis error returning another key's lease is logged; the lease is kept for retry."""
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=60)
+        redis, lease_script, _ = self._redis([50, 50])
+        stale = await leaser.reserve("org-2", "api_calls", "pro", redis_client=redis)
+        stale.lease.expires_at = 0.0
+        self.return_script.side_effect = ConnectionError("redis down")
+
+        result = await leaser.reserve("org-1", "api_calls", "pro", redis_client=redis)
+
+        assert result.granted
+        assert lease_script.await_count == 2
+        assert leaser._leases[stale.key] is stale.lease
+        assert not stale.lease.closed
+
+        self.return_script.side_effect = None
+        await leaser.sweep(redis_client=redis)
+        assert stale.key not in leaser._leases
+
+    @pytest.mark.asyncio
+    async def test_sweeper_runs_twice_per_ttl(self):
+        """start_sweeper() sweeps in the background until stopped."""
+        import asyncio
+
+        from server.app.services.usage import QuotaLeaser
+
+        leaser = QuotaLeaser(fraction=0.05, min_block=10, ttl=0.02)
+        with patch.object(leaser, "sweep", AsyncMock()) as sweep:
+            leaser.start_sweeper()
+            await asyncio.sleep(0.05)
+            await leaser.stop_sweeper()
+
+        assert sweep.await_count >= 2
+
+
+class TestEntitlementsCache:
+    """Tests for the cached org plan/limits lookup."""
+
+    def _db(self, plan="pro"):
+        db = MagicMock()
+        execute = db.table.return_value.select.return_value.eq.return_value.single.return_value.execute
+        execute.return_value = MagicMock(data={"plan": plan})
+        return db, execute
+
+    def _redis(self, stored=None):
+        redis = MagicMock()
+        redis.get = AsyncMock(return_value=stored)
+        redis.set = AsyncMock()
+        redis.delete = AsyncMock()
+        redis.publish = AsyncMock()
+        return redis
+
+    @pytest.mark.asyncio
+    async def test_miss_reads_db_once_and_fills_both_layers(self):
+        """A cold lookup hits the DB, then Redis and the LRU serve it."""
+        from server.app.services.entitlements import EntitlementsCache
+        from server.app.services.usage import PLAN_LIMITS
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        db, execute = self._db("teams")
+        redis = self._redis()
+
+        first = await cache.get("org-1", db, redis_client=redis)
+        second = await cache.get("org-1", db, redis_client=redis)
+
+        assert first is second
+        assert first.plan == "teams"
+        assert first.limits == PLAN_LIMITS["teams"]
+        assert first.limit("api_calls") == 10000
+        execute.assert_called_once()
+        redis.get.assert_awaited_once_with("entitlements:org-1")
+        redis.set.assert_awaited_once_with("entitlements:org-1", "teams", ex=300)
+        assert cache.stats() == {"size": 1, "hits": 1, "redis_hits": 0, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_skips_db(self):
+        """Another process's cached plan is reused without a DB read."""
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        db, execute = self._db()
+        redis = self._redis("enterprise")
+
+        ents = await cache.get("org-1", db, redis_client=redis)
+
+        assert ents.plan == "enterprise"
+        execute.assert_not_called()
+        redis.set.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_expired_local_entry_rechecks_redis(self):
+        """Local entries are only trusted for local_ttl."""
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=0, redis_ttl=300)
+        redis = self._redis("pro")
+
+        await cache.get("org-1", redis_client=redis)
+        await cache.get("org-1", redis_client=redis)
+
+        assert redis.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_plan_gets_free_limits(self):
+        """Plans missing from PLAN_LIMITS resolve to the free tier."""
+        from server.app.services.entitlements import EntitlementsCache
+        from server.app.services.usage import PLAN_LIMITS
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        db, _ = self._db("legacy-gold")
+
+        ents = await cache.get("org-1", db, redis_client=self._redis())
+
+        assert ents.plan == "free"
+        assert ents.limits == PLAN_LIMITS["free"]
+
+    @pytest.mark.asyncio
+    async def test_redis_down_falls_through_to_db(self):
+        """Redis errors skip the shared layer instead of failing the request."""
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        db, _ = self._db("pro")
+        redis = self._redis()
+        redis.get.side_effect = ConnectionError("down")
+        redis.set.side_effect = ConnectionError("down")
+
+        ents = await cache.get("org-1", db, redis_client=redis)
+
+        assert ents.plan == "pro"
+
+    @pytest.mark.asyncio
+    async def test_db_error_is_free_and_not_cached(self):
+        """A failed plan read degrades to free limits for that call only."""
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        db, execute = self._db()
+        execute.side_effect = Exception("db down")
+        redis = self._redis()
+
+        ents = await cache.get("org-1", db, redis_client=redis)
+
+        assert ents.plan == "free"
+        assert cache.stats()["size"] == 0
+        redis.set.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recent(self):
+        """The per-process layer is bounded by max_size."""
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=2, local_ttl=30, redis_ttl=300)
+        redis = self._redis("pro")
+
+        for org in ("a", "b", "a", "c"):
+            await cache.get(org, redis_client=redis)
+
+        assert list(cache._local) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_and_publishes(self):
+        """invalidate() drops the org locally, in Redis, and tells other processes."""
+        from server.app.services.entitlements import INVALIDATION_CHANNEL, EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        redis = self._redis("pro")
+        await cache.get("org-1", redis_client=redis)
+
+        await cache.invalidate("org-1", redis_client=redis)
+
+        assert cache.stats()["size"] == 0
+        redis.delete.assert_awaited_once_with("entitlements:org-1")
+        redis.publish.assert_awaited_once_with(INVALIDATION_CHANNEL, "org-1")
+
+    @pytest.mark.asyncio
+    async def test_listener_forgets_published_orgs(self):
+        """Invalidation messages from other processes evict the local entry."""
+        import asyncio
+
+        from server.app.services.entitlements import EntitlementsCache
+
+        cache = EntitlementsCache(max_size=10, local_ttl=30, redis_ttl=300)
+        redis = self._redis("pro")
+        await cache.get("org-1", redis_client=redis)
+        await cache.get("org-2", redis_client=redis)
+
+        async def listen():
+            yield {"type": "subscribe", "data": 1}
+            yield {"type": "message", "data": "org-1"}
+            await asyncio.Event().wait()
+
+        pubsub = MagicMock()
+        pubsub.subscribe = AsyncMock()
+        pubsub.aclose = AsyncMock()
+        pubsub.listen = listen
+        redis.pubsub.return_value = pubsub
+
+        task = asyncio.create_task(cache._listen(redis_client=redis))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert list(cache._local) == ["org-2"]
+        pubsub.aclose.assert_awaited()
+
+    @patch("stripe.Webhook.construct_event")
+    def test_subscription_webhook_invalidates_org(self, mock_construct, test_client):
+        """Subscription changes invalidate the org named in the metadata."""
+        mock_construct.return_value = {
+            "id": f"evt_{uuid.uuid4().hex}",
+            "type": "customer.subscription.updated",
+            "data": {"object": {
+                "id": "sub_1", "object": "subscription", "status": "active",
+                "metadata": {"org_id": TEST_ORG_ID, "plan": "teams"},
+            }},
+        }
+
+        with patch("server.app.services.entitlements.entitlements.invalidate", AsyncMock()) as invalidate:
+            resp = test_client.post(
+                "/api/v1/webhooks/stripe",
+                content=b'{"test": true}',
+                headers={"stripe-signature": "valid_sig"},
+            )
+
+        assert resp.json()["status"] == "ok"
+        invalidate.assert_awaited_once_with(TEST_ORG_ID)
+
+
+class TestUsageBatchReads:
+    """Tests for single round-trip usage reads and resets."""
+
+    @pytest.mark.asyncio
+    async def test_get_all_usage_single_mget(self):
+        """All categories come back from one MGET, in plan order."""
+        from server.app.services.usage import _get_billing_period, get_all_usage
+
+        redis = MagicMock()
+        redis.mget = AsyncMock(return_value=["50", None, "1", None, "200"])
+
+        metrics = await get_all_usage("org-1", "free", redis_client=redis)
+
+        period = _get_billing_period()
+        redis.mget.assert_awaited_once_with([
+            f"usage:org-1:{c}:{period}"
+            for c in ("api_calls", "ingestions", "storage_gb", "seats", "oracle_queries")
+        ])
+        by_cat = {m["category"]: m for m in metrics}
+        assert by_cat["api_calls"]["used"] == 50
+        assert by_cat["api_calls"]["percentage"] == 50.0
+        assert by_cat["ingestions"]["used"] == 0
+        assert by_cat["oracle_queries"]["percentage"] == 100.0
+        assert by_cat["storage_gb"]["unit"] == "GB"
+
+    @pytest.mark.asyncio
+    async def test_reset_usage_single_unlink(self):
+        """All counters are removed with one UNLINK."""
+        from server.app.services.usage import reset_usage
+
+        redis = MagicMock()
+        redis.unlink = AsyncMock()
+
+        await reset_usage("org-1", redis_client=redis)
+
+        redis.unlink.assert_awaited_once()
+        keys = redis.unlink.call_args.args
+        assert len(keys) == 5
+        assert all(k.startswith("usage:org-1:") for k in keys)
+
+    @pytest.mark.asyncio
+    async def test_usage_for_orgs_one_pipeline(self):
+        """Many orgs are read with chunked MGETs sent in one pipeline."""
+        from server.app.services import usage
+
+        pipe = MagicMock()
+        chunks = []
+        pipe.mget.side_effect = lambda keys: chunks.append(keys)
+        pipe.execute = AsyncMock(side_effect=lambda: [[k.split(":")[1][4:] for k in c] for c in chunks])
+        redis = MagicMock()
+        redis.pipeline.return_value = pipe
+
+        orgs = {f"org-{i}": ("pro" if i % 2 else "free") for i in range(7)}
+        with patch.object(usage, "_MGET_CHUNK", 10):
+            result = await usage.get_usage_for_orgs(orgs, redis_client=redis)
+
+        redis.pipeline.assert_called_once_with(transaction=False)
+        pipe.execute.assert_awaited_once()
+        assert [len(c) for c in chunks] == [10, 10, 10, 5]
+        assert list(result) == list(orgs)
+        # Each org's counters land on that org (stub value = org number)
+        assert all(m["used"] == i for i in range(7) for m in result[f"org-{i}"])
+        assert result["org-1"][0]["limit"] == 1000
+        assert result["org-2"][0]["limit"] == 100
+
+    @pytest.mark.asyncio
+    async def test_usage_for_no_orgs_skips_redis(self):
+        from server.app.services.usage import get_usage_for_orgs
+
+        redis = MagicMock()
+        assert await get_usage_for_orgs({}, redis_client=redis) == {}
+        redis.pipeline.assert_not_called()
+
+    def test_admin_usage_endpoint(self):
+        """GET /admin/usage resolves plans in one query and reports unknown orgs."""
+        from server.app.dependencies import get_supabase
+        from server.app.middleware.auth import require_auth
+
+        db = MagicMock()
+        db.table.return_value.select.return_value.in_.return_value.execute.return_value = MagicMock(
+            data=[{"id": "org-b", "plan": "teams"}, {"id": "org-a", "plan": None}],
+        )
+        app.dependency_overrides[require_auth] = lambda: {"sub": "admin", "org_id": "x", "roles": ["admin"]}
+        app.dependency_overrides[get_supabase] = lambda: db
+        try:
+            with patch("server.app.routers.admin.get_usage_for_orgs",
+                       AsyncMock(side_effect=lambda plans: {o: [] for o in plans})) as batch:
+                resp = TestClient(app).get("/api/v1/admin/usage?org_id=org-a&org_id=org-b&org_id=org-x&org_id=org-a")
+        finally:
+            app.dependency_overrides.pop(require_auth, None)
+            app.dependency_overrides.pop(get_supabase, None)
+
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [o["org_id"] for o in body["organizations"]] == ["org-a", "org-b"]
+        assert [o["plan"] for o in body["organizations"]] == ["free", "teams"]
+        assert body["not_found"] == ["org-x"]
+        db.table.return_value.select.return_value.in_.assert_called_once_with("id", ["org-a", "org-b", "org-x"])
+        batch.assert_awaited_once()
@@ -8,50 +8,60 @@ Covers:
 5. Executions Service (executions.py) - get_execution_stats, get_stats_by_skill, get_stats_by_period
 6. Observability Middleware (observability.py) - request ID, timing, skipped paths
 7. Pydantic Model Validation - ProjectCreate, RepositoryCreate, MemberCreate, ReflexCreate, BulkInviteRequest
+8. Response Cache (response_cache.py) - hits, tag invalidation, scoping, stale-while-revalidate, ETags
+9. Single-flight (singleflight.py) - coalescing of identical concurrent reads
+10. Delta Sync (sync.py) - changes since a cursor, tombstones, resets
+11. Sparse Fieldsets (fieldsets.py) - ?fields= validation, select clauses, trimmed models
+12. Execution List Projections (executions.py) - summary selects, streamed full output
 """
 
+import asyncio
 import logging
 import re
-from datetime import datetime, timezone
-from unittest.mock import MagicMock, AsyncMock, patch
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import UUID, uuid4
 
 import pytest
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.testclient import TestClient
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
-from server.app.services.gdpr import (
-    get_data_categories,
-    export_user_data,
-    delete_user_data,
-    USER_DATA_TABLES,
-)
-from server.app.services.projects import validate_repository_url
-from server.app.services.habits import validate_cron
-from server.app.services.reflexes import test_reflex as reflex_test_fn, get_reflex_stats, get_webhook_info
-from server.app.services.executions import (
-    get_execution_stats,
-    get_stats_by_skill,
-    get_stats_by_period,
-)
 from server.app.middleware.observability import ObservabilityMiddleware
+from server.app.models.enums import (
+    ChunkingStrategy,
+    GitProvider,
+    ProjectMemberRole,
+    ProjectPrivacy,
+    ProjectType,
+    ReflexTriggerType,
+)
 from server.app.models.project import (
+    BulkInviteRequest,
+    MemberCreate,
     ProjectCreate,
     RepositoryCreate,
-    MemberCreate,
-    BulkInviteRequest,
 )
 from server.app.models.reflex import ReflexCreate
-from server.app.models.enums import (
-    GitProvider,
-    ProjectType,
-    ProjectPrivacy,
-    ChunkingStrategy,
-    ReflexTriggerType,
-    ProjectMemberRole,
+from server.app.services.executions import (
+    get_execution_stats,
+    get_stats_by_period,
+    get_stats_by_skill,
 )
-
+from server.app.services.fieldsets import Fieldset
+from server.app.services.gdpr import (
+    USER_DATA_TABLES,
+    delete_user_data,
+    export_user_data,
+    get_data_categories,
+)
+from server.app.services.habits import validate_cron
+from server.app.services.projects import validate_repository_url
+from server.app.services.reflexes import get_reflex_stats, get_webhook_info
+from server.app.services.reflexes import test_reflex as reflex_test_fn
+from server.app.services.response_cache import ResponseCache, conditional_response, mutation_tags
+from server.app.services.singleflight import SingleFlight, coalesce
+from server.app.services.sync import changes_since
 
 # ---------------------------------------------------------------------------
 # Mock helpers
@@ -841,6 +851,20 @@ class TestObservabilityMiddleware:
         async def docs_endpoint():
             return {"docs": True}
 
+        @app.get("/stream")
+        async def stream_endpoint():
+            from fastapi.responses import StreamingResponse
+
+            async def chunks():
+                for i in range(3):
+                    yield f"chunk-{i}\n"
+
+            return StreamingResponse(chunks(), media_type="text/plain")
+
+        @app.get("/boom")
+        async def boom_endpoint():
+            raise RuntimeError("kaboom")
+
         return app
 
     @pytest.fixture
@@ -894,6 +918,25 @@ class TestObservabilityMiddleware:
         assert len(http_logs) >= 1
         assert "/test" in http_logs[0].message
 
+    def test_streaming_response_passes_through(self, client):
+        """Streaming bodies are forwarded intact with the tracing headers."""
+        response = client.get("/stream")
+        assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert "X-Request-ID" in response.headers
+        assert re.match(r"^\d+ms$", response.headers["X-Process-Time"])
+
+    def test_unhandled_error_is_logged(self, app, caplog):
+        """Exceptions before the response starts are logged as status=500."""
+        client = TestClient(app, raise_server_exceptions=False)
+        with caplog.at_level(logging.INFO, logger="kijko.http"):
+            response = client.get("/boom")
+
+        assert response.status_code == 500
+        errors = [r for r in caplog.records if r.name == "kijko.http" and r.levelno == logging.ERROR]
+        assert len(errors) == 1
+        assert "status=500" in errors[0].message
+        assert "kaboom" in errors[0].message
+
 
 # ===========================================================================
 # 7. Pydantic Model Validation
@@ -1095,3 +1138,759 @@ class TestBulkInviteRequestValidation:
     def test_custom_role(self):
         b = BulkInviteRequest(emails=["a@b.com"], role=ProjectMemberRole.ADMIN)
         assert b.role == ProjectMemberRole.ADMIN
+
+
+# ===========================================================================
+# 8. Response Cache
+# ===========================================================================
+
+
+class FakeRedis:
+    """The handful of Redis commands the response cache uses."""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+        self.body_reads = 0
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("redis down")
+
+    async def hgetall(self, key):
+        self._check()
+        return dict(self.data.get(key, {}))
+
+    async def mget(self, keys):
+        self._check()
+        return [self.data.get(key) for key in keys]
+
+    async def hmget(self, key, fields):
+        self._check()
+        return [self.data.get(key, {}).get(field) for field in fields]
+
+    async def hget(self, key, field):
+        self._check()
+        self.body_reads += field == "body"
+        return self.data.get(key, {}).get(field)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hset(self, key, mapping):
+        self.ops.append(lambda: self.redis.data.setdefault(key, {}).update(
+            {k: v if isinstance(v, str) else str(v) for k, v in mapping.items()}
+        ))
+
+    def expire(self, key, seconds):
+        self.ops.append(lambda: None)
+
+    def incr(self, key):
+        self.ops.append(lambda: self.redis.data.__setitem__(key, str(int(self.redis.data.get(key) or 0) + 1)))
+
+    async def execute(self):
+        self.redis._check()
+        for op in self.ops:
+            op()
+
+
+def make_request(path="/api/v1/habits", query=b"page=1", headers=None):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in (headers or {}).items()],
+    })
+
+
+class TestResponseCache:
+    """Tests for server/app/services/response_cache.ResponseCache."""
+
+    HABIT = {"id": "h1", "skill_id": "s1", "user_id": TEST_USER_ID}
+
+    @pytest.fixture
+    def redis(self):
+        return FakeRedis()
+
+    @pytest.fixture
+    def cache(self):
+        return ResponseCache(ttl=30, stale_ttl=0)
+
+    def loader(self, *pages):
+        """AsyncMock returning successive list pages of habits."""
+        return AsyncMock(side_effect=[
+            {"data": rows, "total": len(rows), "page": 1, "page_size": 20, "has_more": False}
+            for rows in pages
+        ])
+
+    async def serve(self, cache, redis, loader, request=None, scope="user:u1"):
+        from server.app.models.base import PaginatedResponse
+        return await cache.serve(
+            request or make_request(), loader, PaginatedResponse,
+            scope=scope,
+            tags=[f"user:{TEST_USER_ID}:habits"],
+            row_tags=lambda page: [f"habit:{row['id']}" for row in page["data"]],
+            redis_client=redis,
+        )
+
+    @pytest.mark.asyncio
+    async def test_second_request_is_served_from_cache(self, cache, redis):
+        loader = self.loader([self.HABIT])
+
+        first = await self.serve(cache, redis, loader)
+        second = await self.serve(cache, redis, loader)
+
+        assert loader.await_count == 1
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.body == first.body
+        assert b'"id":"h1"' in second.body
+
+    @pytest.mark.asyncio
+    async def test_row_tag_invalidation_reloads(self, cache, redis):
+        loader = self.loader([self.HABIT], [{**self.HABIT, "id": "h2"}])
+        await self.serve(cache, redis, loader)
+
+        await cache.invalidate(["habit:h1"], redis_client=redis)
+        response = await self.serve(cache, redis, loader)
+
+        assert loader.await_count == 2
+        assert response.headers["X-Cache"] == "MISS"
+        assert b'"id":"h2"' in response.body
+
+    @pytest.mark.asyncio
+    async def test_write_during_load_is_not_masked(self, cache, redis):
+        """A write landing while an entry is built leaves that entry invalid."""
+        async def racing_load():
+            await cache.invalidate([f"user:{TEST_USER_ID}:habits"], redis_client=redis)
+            return {"data": [], "total": 0, "page": 1, "page_size": 20, "has_more": False}
+
+        await self.serve(cache, redis, racing_load)
+        loader = self.loader([self.HABIT])
+        response = await self.serve(cache, redis, loader)
+
+        assert loader.await_count == 1
+        assert response.headers["X-Cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_entries_are_scoped(self, cache, redis):
+        loader = self.loader([self.HABIT], [])
+        await self.serve(cache, redis, loader, scope="user:u1")
+        response = await self.serve(cache, redis, loader, scope="user:u2")
+
+        assert loader.await_count == 2
+        assert response.headers["X-Cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_not_cached(self, cache, redis):
+        loader = AsyncMock(return_value=None)
+
+        assert await self.serve(cache, redis, loader) is None
+        assert await self.serve(cache, redis, loader) is None
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_no_cache_header_skips_read(self, cache, redis):
+        loader = self.loader([self.HABIT], [self.HABIT])
+        await self.serve(cache, redis, loader)
+
+        request = make_request(headers={"cache-control": "no-cache"})
+        response = await self.serve(cache, redis, loader, request=request)
+
+        assert loader.await_count == 2
+        assert response.headers["X-Cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_redis_down_falls_back_to_loader(self, cache, redis):
+        redis.down = True
+        loader = self.loader([self.HABIT], [self.HABIT])
+
+        first = await self.serve(cache, redis, loader)
+        second = await self.serve(cache, redis, loader)
+
+        assert loader.await_count == 2
+        assert first.status_code == second.status_code == 200
+        assert cache.stats()["errors"] > 0
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_revalidating(self, redis):
+        cache = ResponseCache(ttl=30, stale_ttl=60)
+        loader = self.loader([self.HABIT], [{**self.HABIT, "id": "h2"}])
+        await self.serve(cache, redis, loader)
+        for entry in redis.data.values():
+            if isinstance(entry, dict):
+                entry["fresh"] = "0"
+
+        stale = await self.serve(cache, redis, loader)
+        await asyncio.gather(*cache._refreshing.values())
+        fresh = await self.serve(cache, redis, loader)
+
+        assert stale.headers["X-Cache"] == "STALE"
+        assert b'"id":"h1"' in stale.body
+        assert fresh.headers["X-Cache"] == "HIT"
+        assert b'"id":"h2"' in fresh.body
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidated_entry_is_never_served_stale(self, redis):
+        cache = ResponseCache(ttl=30, stale_ttl=60)
+        loader = self.loader([self.HABIT], [])
+        await self.serve(cache, redis, loader)
+        await cache.invalidate(["habit:h1"], redis_client=redis)
+
+        response = await self.serve(cache, redis, loader)
+
+        assert response.headers["X-Cache"] == "MISS"
+
+    @pytest.mark.asyncio
+    async def test_matching_etag_is_answered_from_metadata(self, cache, redis):
+        loader = self.loader([self.HABIT])
+        first = await self.serve(cache, redis, loader)
+
+        request = make_request(headers={"if-none-match": first.headers["ETag"]})
+        response = await self.serve(cache, redis, loader, request=request)
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["ETag"] == first.headers["ETag"]
+        assert redis.body_reads == 0
+        assert loader.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_outdated_etag_gets_the_body(self, cache, redis):
+        loader = self.loader([self.HABIT])
+        first = await self.serve(cache, redis, loader)
+
+        request = make_request(headers={"if-none-match": '"outdated"'})
+        response = await self.serve(cache, redis, loader, request=request)
+
+        assert response.status_code == 200
+        assert response.body == first.body
+        assert redis.body_reads == 1
+
+    @pytest.mark.asyncio
+    async def test_etag_changes_with_content(self, cache, redis):
+        loader = self.loader([self.HABIT], [{**self.HABIT, "id": "h2"}])
+        first = await self.serve(cache, redis, loader)
+        await cache.invalidate(["habit:h1"], redis_client=redis)
+
+        request = make_request(headers={"if-none-match": first.headers["ETag"]})
+        response = await self.serve(cache, redis, loader, request=request)
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != first.headers["ETag"]
+
+    def test_conditional_response_without_cache(self):
+        from server.app.models.execution import ExecutionStatsByPeriod
+
+        stats = [{
+            "period": "2026-10-01", "total_executions": 3, "successful": 2,
+            "failed": 1, "total_tokens": 300, "total_cost_cents": 4,
+        }]
+        first = conditional_response(make_request(), list[ExecutionStatsByPeriod], stats)
+        etag = first.headers["ETag"]
+
+        weak = make_request(headers={"if-none-match": f'"other", W/{etag}'})
+        assert first.status_code == 200
+        assert conditional_response(weak, list[ExecutionStatsByPeriod], stats).status_code == 304
+
+    def test_mutation_tags_cover_entity_related_and_owner(self):
+        assert set(mutation_tags("habit", self.HABIT)) == {
+            "habit:h1", "skill:s1", f"user:{TEST_USER_ID}:habits",
+        }
+        assert set(mutation_tags("project", [{"id": "p1", "organization_id": "o1"}])) == {
+            "project:p1", "org:o1:projects",
+        }
+
+    @pytest.mark.asyncio
+    async def test_service_writes_invalidate(self):
+        from server.app.services.habits import update_habit
+
+        client, _, _ = mock_supabase_query(data=[self.HABIT])
+        with patch(
+            "server.app.services.response_cache.response_cache.invalidate",
+            new_callable=AsyncMock,
+        ) as invalidate:
+            await update_habit(client, "h1", {"is_active": False})
+
+        assert set(invalidate.await_args.args[0]) == {
+            "habit:h1", "skill:s1", f"user:{TEST_USER_ID}:habits",
+        }
+
+
+# ===========================================================================
+# 9. Single-flight
+# ===========================================================================
+
+
+def client_for(token):
+    """A stand-in Supabase client carrying a bearer token."""
+    client = MagicMock()
+    client.postgrest.headers = {"Authorization": f"Bearer {token}"}
+    return client
+
+
+class TestSingleFlight:
+    """Tests for server/app/services/singleflight.coalesce."""
+
+    @pytest.fixture
+    def flight(self):
+        flight = SingleFlight()
+        with patch("server.app.services.singleflight.singleflight", flight):
+            yield flight
+
+    @pytest.fixture
+    def slow_read(self):
+        """A coalesced read that blocks until ``release`` is set."""
+        release = asyncio.Event()
+        calls = []
+
+        @coalesce
+        async def read(client, project_id, page: int = 1):
+            calls.append((project_id, page))
+            await release.wait()
+            return {"id": str(project_id), "page": page, "rows": [1, 2]}
+
+        return read, release, calls
+
+    @pytest.mark.asyncio
+    async def test_identical_reads_share_one_call(self, flight, slow_read):
+        read, release, calls = slow_read
+        client = client_for("t1")
+        pid = uuid4()
+
+        tasks = [asyncio.create_task(read(client, pid)) for _ in range(3)]
+        tasks.append(asyncio.create_task(read(client_for("t1"), str(pid), page=1)))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert all(r == results[0] for r in results)
+        assert results[1] is not results[0]  # followers get their own copy
+        stats = flight.stats()
+        assert stats["calls"] == 1
+        assert stats["coalesced"] == 3
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tenants_and_arguments_are_kept_apart(self, flight, slow_read):
+        read, release, calls = slow_read
+        pid = uuid4()
+
+        tasks = [
+            asyncio.create_task(read(client_for("t1"), pid)),
+            asyncio.create_task(read(client_for("t2"), pid)),
+            asyncio.create_task(read(client_for("t1"), pid, page=2)),
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*tasks)
+
+        assert len(calls) == 3
+        assert flight.stats()["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_calls_after_completion_run_again(self, flight, slow_read):
+        read, release, calls = slow_read
+        release.set()
+
+        await read(client_for("t1"), "p1")
+        await read(client_for("t1"), "p1")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_followers(self, flight, slow_read):
+        read, release, calls = slow_read
+        client = client_for("t1")
+
+        leader = asyncio.create_task(read(client, "p1"))
+        follower = asyncio.create_task(read(client, "p1"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert (await follower)["id"] == "p1"
+        assert leader.cancelled()
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failure_reaches_every_caller(self, flight):
+        release = asyncio.Event()
+
+        @coalesce
+        async def failing(client, key):
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        client = client_for("t1")
+        tasks = [asyncio.create_task(failing(client, "k")) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight.stats()["by_function"]["test_domain_services.failing"]["failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_execution_reads_share_one_query(self, flight):
+        """Concurrent identical list_executions calls run one PostgREST query."""
+        import time
+
+        from server.app.services.executions import list_executions
+
+        client, query, result = mock_supabase_query(data=[{"id": "e1"}], count=1)
+        client.postgrest.headers = {"Authorization": "Bearer t1"}
+        query.range.return_value = query
+        query.execute.side_effect = lambda: (time.sleep(0.05), result)[1]
+
+        pages = await asyncio.gather(*(list_executions(client, page=1) for _ in range(5)))
+
+        assert query.execute.call_count == 1
+        assert all(page["total"] == 1 for page in pages)
+        assert flight.stats()["by_function"]["executions.list_executions"] == {
+            "calls": 1, "coalesced": 4, "failures": 0,
+        }
+
+
+# ===========================================================================
+# 10. Delta Sync
+# ===========================================================================
+
+
+class TestChangesSince:
+    """Tests for server/app/services/sync.changes_since."""
+
+    def recent(self, **delta):
+        return datetime.now(timezone.utc) - timedelta(**(delta or {"minutes": 5}))
+
+    @pytest.mark.asyncio
+    async def test_returns_changed_rows_and_tombstones(self):
+        client = mock_supabase_multi_table({
+            "skills": ([{"id": "s1", "name": "Renamed"}], None),
+            "deleted_records": ([{"record_id": "s2"}, {"record_id": "s2"}], None),
+        })
+        before = datetime.now(timezone.utc)
+
+        result = await changes_since(client, "skills", self.recent())
+
+        assert result["reset"] is False
+        assert result["changes"] == [{"id": "s1", "name": "Renamed"}]
+        assert result["deleted"] == ["s2"]
+        # The next cursor overlaps the window just read
+        assert result["cursor"] < before
+
+    @pytest.mark.asyncio
+    async def test_tombstones_are_filtered_by_table_and_cursor(self):
+        client, query, _ = mock_supabase_query(data=[])
+        since = self.recent()
+
+        await changes_since(client, "habits", since, select="*, skills(name)")
+
+        client.table.assert_any_call("habits")
+        client.table.assert_any_call("deleted_records")
+        query.select.assert_any_call("*, skills(name)")
+        query.eq.assert_called_with("table_name", "habits")
+        query.gte.assert_any_call("updated_at", since.isoformat())
+        query.gte.assert_any_call("created_at", since.isoformat())
+
+    @pytest.mark.asyncio
+    async def test_first_sync_resets(self):
+        client = MagicMock()
+
+        result = await changes_since(client, "skills", None)
+
+        assert result["reset"] is True
+        assert result["changes"] == [] and result["deleted"] == []
+        client.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_cursor_older_than_tombstones_resets(self):
+        client = MagicMock()
+
+        result = await changes_since(client, "projects", self.recent(days=31))
+
+        assert result["reset"] is True
+        client.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_too_many_changes_resets(self):
+        rows = [{"id": str(i)} for i in range(4)]
+        client = mock_supabase_multi_table({"reflexes": (rows, None)})
+
+        with patch("server.app.services.sync.settings.SYNC_MAX_CHANGES", 3):
+            result = await changes_since(client, "reflexes", self.recent())
+
+        assert result["reset"] is True
+        assert result["changes"] == []
+
+    @pytest.mark.asyncio
+    async def test_too_many_tombstones_resets(self):
+        tombstones = [{"record_id": str(i)} for i in range(4)]
+        client = mock_supabase_multi_table({"skills": ([], None), "deleted_records": (tombstones, None)})
+
+        with patch("server.app.services.sync.settings.SYNC_MAX_CHANGES", 3):
+            result = await changes_since(client, "skills", self.recent())
+
+        assert result["reset"] is True
+        assert result["deleted"] == []
+
+    @pytest.mark.asyncio
+    async def test_tombstone_query_is_capped(self):
+        client, query, _ = mock_supabase_query(data=[])
+
+        with patch("server.app.services.sync.settings.SYNC_MAX_CHANGES", 3):
+            await changes_since(client, "skills", self.recent())
+
+        assert query.limit.call_args_list[-1].args == (4,)
+
+    @pytest.mark.asyncio
+    async def test_naive_cursor_is_utc(self):
+        client = mock_supabase_multi_table({})
+        since = self.recent().replace(tzinfo=None)
+
+        result = await changes_since(client, "skills", since)
+
+        assert result["reset"] is False
+
+    def test_changes_routes_precede_id_routes(self):
+        """GET /<resource>/changes is matched before GET /<resource>/{id}."""
+        import importlib
+
+        for resource, param in [
+            ("skills", "skill_id"), ("habits", "habit_id"),
+            ("reflexes", "reflex_id"), ("projects", "project_id"),
+        ]:
+            router = importlib.import_module(f"server.app.routers.{resource}").router
+            paths = [r.path for r in router.routes if "GET" in r.methods]
+            assert paths.index(f"/{resource}/changes") < paths.index(f"/{resource}/{{{param}}}")
+
+
+# ===========================================================================
+# 11. Sparse Fieldsets
+# ===========================================================================
+
+
+class TestFieldsets:
+    """Tests for server/app/services/fieldsets.Fieldset and the list services."""
+
+    def test_no_fields_keeps_default_select(self):
+        from server.app.services.habits import LIST_FIELDS
+
+        assert LIST_FIELDS.parse(None) is None
+        assert LIST_FIELDS.parse("  ") is None
+        assert LIST_FIELDS.select(None) == "*, skills(name, category)"
+
+    def test_parse_adds_always_columns_and_dedupes(self):
+        from server.app.services.habits import LIST_FIELDS
+
+        fields = LIST_FIELDS.parse("schedule_cron, is_active,schedule_cron,id")
+
+        assert fields == ("id", "skill_id", "schedule_cron", "is_active")
+
+    def test_unknown_field_rejected(self):
+        from server.app.services.skills import LIST_FIELDS
+
+        with pytest.raises(HTTPException) as exc:
+            LIST_FIELDS.parse("name,password_hash,secret")
+
+        assert exc.value.status_code == 422
+        assert "password_hash, secret" in exc.value.detail
+
+    def test_embeds_map_to_select_expressions(self):
+        from server.app.services.projects import LIST_FIELDS
+
+        fields = LIST_FIELDS.parse("name,project_members")
+
+        assert LIST_FIELDS.select(fields) == "id,name,project_members(count)"
+
+    def test_response_model_is_trimmed(self):
+        from server.app.services.projects import LIST_FIELDS
+
+        fields = LIST_FIELDS.parse("name,status,project_members")
+        adapter = TypeAdapter(LIST_FIELDS.response_model(fields))
+        row = {
+            "id": str(uuid4()), "name": "Docs", "status": "active",
+            "project_members": [{"count": 3}], "custom_settings": {"big": "x" * 100},
+        }
+
+        page = adapter.dump_python(
+            adapter.validate_python({"data": [row], "total": 1, "page": 1, "page_size": 20, "has_more": False}),
+            mode="json",
+        )
+
+        assert page["data"] == [{
+            "id": row["id"], "name": "Docs", "status": "active", "project_members": [{"count": 3}],
+        }]
+
+    def test_response_model_validates_selected_columns(self):
+        from server.app.services.skills import LIST_FIELDS
+
+        adapter = TypeAdapter(LIST_FIELDS.response_model(LIST_FIELDS.parse("is_active")))
+
+        with pytest.raises(ValidationError):
+            adapter.validate_python({
+                "data": [{"id": "not-a-uuid", "is_active": True}],
+                "total": 1, "page": 1, "page_size": 20, "has_more": False,
+            })
+
+    @pytest.mark.asyncio
+    async def test_list_service_selects_requested_columns(self):
+        from server.app.services.skills import LIST_FIELDS, list_skills
+
+        client, query, _ = mock_supabase_query(data=[{"id": "s1", "name": "A"}], count=1)
+        query.range.return_value = query
+
+        result = await list_skills(client, fields=LIST_FIELDS.parse("name"))
+
+        query.select.assert_called_once_with("id,name", count="exact")
+        assert result["data"] == [{"id": "s1", "name": "A"}]
+
+    def test_fieldset_allowlist_follows_model(self):
+        from server.app.models.skill import SkillResponse
+
+        fieldset = Fieldset(SkillResponse)
+
+        assert "prompt_template" in fieldset.allowed
+        assert "user_id" in fieldset.allowed
+        assert "skills" not in fieldset.allowed
+
+
+# ===========================================================================
+# 12. Execution List Projections
+# ===========================================================================
+
+
+class TestExecutionProjections:
+    """Tests for slim execution lists and GET /executions/{id}/output."""
+
+    @pytest.mark.asyncio
+    async def test_list_selects_summary_not_payloads(self):
+        from server.app.services.executions import list_executions
+
+        client, query, _ = mock_supabase_query(data=[], count=0)
+        query.range.return_value = query
+
+        await list_executions(client)
+
+        select = query.select.call_args.args[0]
+        columns = [c.strip() for c in select.split(",")]
+        assert "input" not in columns
+        assert "output" not in columns
+        assert {"output_preview", "output_length", "status", "tokens_used", "duration_ms"} <= set(columns)
+        assert "skills(name" in select
+
+    def test_full_output_not_selectable_in_lists(self):
+        from server.app.services.executions import LIST_FIELDS
+
+        with pytest.raises(HTTPException):
+            LIST_FIELDS.parse("status,output")
+        with pytest.raises(HTTPException):
+            LIST_FIELDS.parse("input")
+
+        assert LIST_FIELDS.select(LIST_FIELDS.parse("status,output_preview")) == "id,status,output_preview"
+
+    @pytest.mark.asyncio
+    async def test_output_info_never_selects_output(self):
+        from server.app.services.executions import get_execution_output_info
+
+        client, query, _ = mock_supabase_query(data={"id": "e1", "completed_at": None, "output_length": 3})
+
+        result = await get_execution_output_info(client, uuid4())
+
+        query.select.assert_called_once_with("id, completed_at, output_length")
+        assert result["output_length"] == 3
+
+    @pytest.mark.asyncio
+    async def test_output_chunk_is_a_ranged_rpc(self):
+        from server.app.services.executions import get_execution_output_chunk
+
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value = MagicMock(data="abc")
+        execution_id = uuid4()
+
+        text = await get_execution_output_chunk(client, execution_id, 128, 64)
+
+        client.rpc.assert_called_once_with("execution_output_chunk", {
+            "p_execution_id": str(execution_id), "p_offset": 128, "p_length": 64,
+        })
+        assert text == "abc"
+
+    def output_client(self, output):
+        from server.app.dependencies import get_user_db
+        from server.app.middleware.auth import require_auth
+        from server.app.routers import executions as executions_router
+
+        app = FastAPI()
+        app.include_router(executions_router.router)
+        app.dependency_overrides[require_auth] = lambda: {"sub": TEST_USER_ID}
+        app.dependency_overrides[get_user_db] = lambda: MagicMock()
+
+        info = None if output is None else {
+            "id": "e1", "completed_at": "2026-01-01T00:00:00Z", "output_length": len(output),
+        }
+
+        async def chunk(db, execution_id, offset, length):
+            return output[offset:offset + length]
+
+        self.chunk = AsyncMock(side_effect=chunk)
+        service = "server.app.routers.executions.execution_service"
+        patches = (
+            patch(f"{service}.get_execution_output_info", AsyncMock(return_value=info)),
+            patch(f"{service}.get_execution_output_chunk", self.chunk),
+            patch("server.app.routers.executions.OUTPUT_CHUNK_SIZE", 4),
+        )
+        return TestClient(app), patches
+
+    def test_output_paged_from_database(self):
+        output = "0123456789"
+        client, (info, chunk, size) = self.output_client(output)
+
+        with info, chunk, size:
+            response = client.get(f"/executions/{uuid4()}/output")
+
+        assert response.status_code == 200
+        assert response.text == output
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.headers["etag"]
+        assert [call.args[2:] for call in self.chunk.await_args_list] == [(0, 4), (4, 4), (8, 4)]
+
+    def test_output_exact_multiple_ends_on_empty_chunk(self):
+        client, (info, chunk, size) = self.output_client("01234567")
+
+        with info, chunk, size:
+            response = client.get(f"/executions/{uuid4()}/output")
+
+        assert response.text == "01234567"
+        assert self.chunk.await_count == 3
+
+    def test_output_not_modified(self):
+        client, (info, chunk, size) = self.output_client("result")
+
+        url = f"/executions/{uuid4()}/output"
+
+        with info, chunk, size:
+            etag = client.get(url).headers["etag"]
+            self.chunk.reset_mock()
+            response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        self.chunk.assert_not_awaited()
+
+    def test_output_missing_execution_404(self):
+        client, (info, chunk, size) = self.output_client(None)
+
+        with info, chunk, size:
+            response = client.get(f"/executions/{uuid4()}/output")
+
+        assert response.status_code == 404
@@ -115,6 +115,210 @@ class TestRateLimiting:
         # 6th should be rejected
         assert limiter._check_memory("test:key", 5, 60) is False
 
+    def test_rejection_returns_429_with_headers(self):
+        """Over-limit requests get a 429 JSON response, not a server error."""
+        from fastapi import FastAPI
+
+        from server.app.middleware.rate_limit import RateLimitMiddleware
+
+        limited = FastAPI()
+        limited.add_middleware(RateLimitMiddleware)
+
+        @limited.post("/api/v1/auth/login")
+        async def login():
+            return {"ok": True}
+
+        @limited.get("/api/v1/auth/login")
+        async def login_page():
+            return {"ok": True}
+
+        with patch.object(RateLimitMiddleware, "_check_redis", side_effect=ConnectionError):
+            test_client = TestClient(limited)
+            statuses = [test_client.post("/api/v1/auth/login").status_code for _ in range(6)]
+            resp = test_client.post("/api/v1/auth/login")
+            # Only POST is limited
+            assert test_client.get("/api/v1/auth/login").status_code == 200
+
+        assert statuses == [200] * 5 + [429]
+        assert resp.status_code == 429
+        assert resp.json() == {"detail": "Too many requests. Please try again later."}
+        assert 1 <= int(resp.headers["Retry-After"]) <= 120
+        assert resp.headers["X-RateLimit-Limit"] == "5"
+        assert resp.headers["X-RateLimit-Remaining"] == "0"
+
+    def test_memory_limiter_is_bounded(self):
+        """The fallback evicts least recently used keys at capacity."""
+        from server.app.middleware.rate_limit import SlidingWindowStore
+
+        store = SlidingWindowStore(max_keys=100)
+        store.hit("rate:/login:keep", 5, 60, now=1000.0)
+        for i in range(500):
+            store.hit(f"rate:/login:10.0.{i // 256}.{i % 256}", 5, 60, now=1000.0)
+            store.hit("rate:/login:keep", 1000, 60, now=1000.0)
+
+        assert len(store) == 100
+        assert store.evictions == 401
+        assert "rate:/login:keep" in store
+        assert store.stats()["max_keys"] == 100
+
+    def test_memory_limiter_hashes_long_keys(self):
+        """Forged, oversized client identifiers don't inflate memory."""
+        from server.app.middleware.rate_limit import SlidingWindowStore
+
+        store = SlidingWindowStore(max_keys=10)
+        key = "rate:/login:" + "9" * 10_000
+        store.hit(key, 5, 60, now=1000.0)
+
+        assert key in store
+        assert all(len(k) <= 128 for k in store._windows)
+
+    def test_memory_limiter_sliding_window(self):
+        """The previous window's count decays across the current one."""
+        from server.app.middleware.rate_limit import SlidingWindowStore
+
+        store = SlidingWindowStore()
+        for _ in range(10):
+            assert store.hit("k", 10, 60, now=60.0).allowed
+        assert not store.hit("k", 10, 60, now=119.0).allowed
+
+        # 30s into the next window: 10 * 0.5 carried over → 5 more allowed
+        results = [store.hit("k", 10, 60, now=150.0) for _ in range(6)]
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        assert results[0].remaining == 4
+        assert results[-1].retry_after > 0
+        # Denied requests are not counted
+        assert store._windows["k"].current == 5
+
+    @pytest.mark.asyncio
+    async def test_redis_gcra_single_script_call(self):
+        """The Redis path is one script call; its reply maps to the result."""
+        from unittest.mock import MagicMock
+
+        from server.app.middleware.rate_limit import GCRA_SCRIPT, RateLimitMiddleware
+
+        script = AsyncMock(return_value=[0, 0, 11_500_000, 59_000_000])
+        redis = MagicMock()
+        redis.register_script.return_value = script
+
+        with patch("server.app.dependencies.get_redis", AsyncMock(return_value=redis)):
+            limiter = RateLimitMiddleware(None)
+            result = await limiter._check_redis("rate:/x:1.2.3.4", 5, 60)
+            await limiter._check_redis("rate:/x:1.2.3.4", 5, 60)
+
+        redis.register_script.assert_called_once_with(GCRA_SCRIPT)
+        script.assert_awaited_with(keys=["rate:/x:1.2.3.4"], args=[5, 60_000_000], client=redis)
+        assert result.allowed is False
+        assert result.headers() == {
+            "X-RateLimit-Limit": "5",
+            "X-RateLimit-Remaining": "0",
+            "X-RateLimit-Reset": "59",
+            "Retry-After": "12",
+        }
+
+    def test_allowed_response_carries_exact_headers(self):
+        """Allowed requests on limited routes report remaining and reset."""
+        from fastapi import FastAPI
+
+        from server.app.middleware.rate_limit import RateLimitMiddleware, RateLimitResult
+
+        limited = FastAPI()
+        limited.add_middleware(RateLimitMiddleware)
+
+        @limited.post("/api/v1/auth/signup")
+        async def signup():
+            return {"ok": True}
+
+        result = RateLimitResult(allowed=True, limit=10, remaining=7, retry_after=0.0, reset_after=17.2)
+        with patch.object(RateLimitMiddleware, "_check_redis", AsyncMock(return_value=result)):
+            resp = TestClient(limited).post("/api/v1/auth/signup")
+
+        assert resp.status_code == 200
+        assert resp.headers["X-RateLimit-Limit"] == "10"
+        assert resp.headers["X-RateLimit-Remaining"] == "7"
+        assert resp.headers["X-RateLimit-Reset"] == "18"
+        assert "Retry-After" not in resp.headers
+
+
+class TestRateLimitPolicies:
+    """Tests for the declarative policy table and its route trie."""
+
+    def _matcher(self):
+        from server.app.middleware.rate_limit import PolicyMatcher, RateLimitPolicy
+
+        policies = [
+            RateLimitPolicy("/api/v1/auth/login", frozenset({"POST"}), "ip", (5, 60), prefix=True),
+            RateLimitPolicy("/api/v1/items/{item_id}", frozenset({"GET"}), "org", (10, 60)),
+            RateLimitPolicy("/api/v1/items/stats", frozenset({"GET"}), "org", (20, 60), prefix=True),
+            RateLimitPolicy("/api/v1/items/{item_id}/export", frozenset({"GET"}), "user", (1, 60)),
+        ]
+        return PolicyMatcher(policies), policies
+
+    def test_route_matching(self):
+        """Literal beats param, prefix rules cover sub-paths, methods filter."""
+        matcher, (login, item, stats, export) = self._matcher()
+
+        assert matcher.match("POST", "/api/v1/auth/login") is login
+        assert matcher.match("POST", "/api/v1/auth/login/") is login
+        assert matcher.match("GET", "/api/v1/auth/login") is None
+        assert matcher.match("GET", "/api/v1/items/abc") is item
+        assert matcher.match("GET", "/api/v1/items/stats") is stats
+        assert matcher.match("GET", "/api/v1/items/stats/by-period") is stats
+        assert matcher.match("GET", "/api/v1/items/abc/export") is export
+        assert matcher.match("GET", "/api/v1/items/abc/other") is None
+        assert matcher.match("GET", "/api/v1/other") is None
+
+    def test_default_policies_cover_tenant_endpoints(self):
+        """Expensive tenant endpoints are limited per org and scale with plan."""
+        from server.app.middleware.rate_limit import RATE_LIMIT_POLICIES, PolicyMatcher
+
+        matcher = PolicyMatcher(RATE_LIMIT_POLICIES)
+        stats = matcher.match("GET", "/api/v1/executions/stats/by-skill")
+        export = matcher.match("POST", "/api/v1/gdpr/export")
+
+        assert stats.identity == "org"
+        assert export.identity == "org"
+        assert stats.limit_for("enterprise")[0] > stats.limit_for("free")[0]
+        assert stats.limit_for("unknown-plan") == stats.limit_for("free")
+        assert matcher.match("POST", "/api/v1/auth/login").limit == (5, 60)
+        assert matcher.match("GET", "/api/v1/executions") is None
+
+    def test_orgs_have_independent_budgets(self):
+        """One org exhausting its budget does not affect another."""
+        from fastapi import FastAPI
+
+        from server.app.middleware.rate_limit import RateLimitMiddleware, RateLimitPolicy
+
+        limited = FastAPI()
+        policy = RateLimitPolicy(
+            "/api/v1/executions/stats", frozenset({"GET"}), "org", {"free": (2, 60), "pro": (3, 60)},
+        )
+        limited.add_middleware(RateLimitMiddleware, policies=[policy])
+
+        @limited.get("/api/v1/executions/stats")
+        async def stats():
+            return {"ok": True}
+
+        claims = {"org-a": {"sub": "u1", "org_id": "org-a"}, "org-b": {"sub": "u2", "org_id": "org-b"}}
+        plans = {"org-a": "free", "org-b": "pro"}
+        with patch.object(RateLimitMiddleware, "_check_redis", side_effect=ConnectionError), \
+             patch.object(RateLimitMiddleware, "_get_claims",
+                          side_effect=lambda req: claims.get(req.headers.get("authorization", "")[7:])), \
+             patch("server.app.middleware.rate_limit._get_org_plan",
+                   AsyncMock(side_effect=lambda org_id: plans[org_id])):
+            test_client = TestClient(limited)
+            org_a = [test_client.get("/api/v1/executions/stats", headers={"Authorization": "Bearer org-a"})
+                     for _ in range(3)]
+            org_b = [test_client.get("/api/v1/executions/stats", headers={"Authorization": "Bearer org-b"})
+                     for _ in range(4)]
+            anonymous = test_client.get("/api/v1/executions/stats")
+
+        assert [r.status_code for r in org_a] == [200, 200, 429]
+        assert [r.status_code for r in org_b] == [200, 200, 200, 429]
+        assert org_b[0].headers["X-RateLimit-Limit"] == "3"
+        # No token → limited by IP under the free budget
+        assert anonymous.status_code == 200
+        assert anonymous.headers["X-RateLimit-Limit"] == "2"
+
 
 # =============================================================================
 # Docker Configuration Tests
@@ -3,16 +3,21 @@
 Mocks all HTTP calls (httpx) to test business logic in isolation.
 """
 
+import asyncio
 import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 from fastapi import HTTPException
-from jose import JWTError
-
-from server.app.services.keycloak import KeycloakService, get_keycloak, JWKS_CACHE_TTL
+from jose import jwk, jwt
 
+from server.app.services.keycloak import (
+    JWKS_CACHE_TTL,
+    JWKS_MIN_REFRESH_INTERVAL,
+    KeycloakService,
+    get_keycloak,
+)
 
 # ---------------------------------------------------------------------------
 # Fixtures
@@ -56,6 +61,43 @@ def sample_jwks():
     }
 
 
+@pytest.fixture(scope="module")
+def rsa_private_pem():
+    """Throwaway RSA key for signing test tokens."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+@pytest.fixture
+def rsa_jwks(rsa_private_pem):
+    """JWKS holding the public half of rsa_private_pem."""
+    public = jwk.construct(rsa_private_pem, "RS256").public_key().to_dict()
+    return {"keys": [{**public, "kid": "test-key-id", "use": "sig"}]}
+
+
+@pytest.fixture
+def sign_token(kc, rsa_private_pem):
+    """Sign a payload as Keycloak would (RS256, kid header, iss/aud/exp)."""
+    def _sign(payload: dict, kid: str = "test-key-id", exp_in: int = 300) -> str:
+        now = int(time.time())
+        claims = {
+            **payload,
+            "iss": kc.realm_url,
+            "aud": kc.client_id,
+            "iat": now - 5,
+            "exp": now + exp_in,
+        }
+        return jwt.encode(claims, rsa_private_pem, algorithm="RS256", headers={"kid": kid})
+    return _sign
+
+
 @pytest.fixture
 def sample_jwt_payload():
     """Decoded JWT payload from Keycloak."""
@@ -216,55 +258,109 @@ class TestJWKS:
 class TestTokenValidation:
 
     @pytest.mark.asyncio
-    async def test_validate_token_success(self, kc, sample_jwks, sample_jwt_payload):
+    async def test_validate_token_success(self, kc, rsa_jwks, sign_token, sample_jwt_payload):
         """Successful token validation returns extracted claims."""
-        kc._jwks = sample_jwks
+        kc._jwks = rsa_jwks
         kc._jwks_fetched_at = time.time()
 
-        with patch.object(kc, "_decode_token", return_value=sample_jwt_payload):
-            claims = await kc.validate_token("valid-token")
+        claims = await kc.validate_token(sign_token(sample_jwt_payload))
 
         assert claims["sub"] == "user-uuid-123"
         assert claims["email"] == "test@kijko.nl"
         assert claims["org_id"] == "org-uuid-456"
         assert "admin" in claims["roles"]
         assert "developer" in claims["roles"]
+        kc._http_client.get.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_validate_token_retries_with_fresh_jwks(self, kc, sample_jwks, sample_jwt_payload):
-        """Token validation retries with refreshed JWKS on first failure."""
-        kc._jwks = sample_jwks
+    async def test_keys_parsed_once_per_jwks(self, kc, rsa_jwks, sign_token, sample_jwt_payload):
+        """JWKS keys are parsed on first use, not on every decode."""
+        kc._jwks = rsa_jwks
         kc._jwks_fetched_at = time.time()
 
-        call_count = 0
+        tokens = [sign_token(sample_jwt_payload) for _ in range(3)]
+        with patch("server.app.services.keycloak.jwk.construct", wraps=jwk.construct) as construct:
+            for token in tokens:
+                await kc.validate_token(token)
+
+        assert construct.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_validate_token_refreshes_jwks_for_unknown_kid(
+        self, kc, rsa_jwks, sign_token, sample_jwt_payload
+    ):
+        """A token signed with a rotated-in key triggers one JWKS refresh."""
+        kc._jwks = {"keys": []}
+        kc._jwks_fetched_at = time.time()
 
-        def mock_decode(token, jwks):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise JWTError("Signature verification failed")
-            return sample_jwt_payload
+        resp_mock = MagicMock()
+        resp_mock.json.return_value = rsa_jwks
+        kc._http_client.get = AsyncMock(return_value=resp_mock)
 
-        with patch.object(kc, "_decode_token", side_effect=mock_decode):
-            with patch.object(kc, "get_jwks", new_callable=AsyncMock, return_value=sample_jwks):
-                claims = await kc.validate_token("token-with-rotated-key")
+        claims = await kc.validate_token(sign_token(sample_jwt_payload))
 
         assert claims["sub"] == "user-uuid-123"
-        assert call_count == 2  # Tried twice
+        kc._http_client.get.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_validate_token_fails_after_retry(self, kc, sample_jwks):
-        """Token validation raises 401 after both attempts fail."""
-        kc._jwks = sample_jwks
+    async def test_expired_token_does_not_refresh_jwks(self, kc, rsa_jwks, sign_token, sample_jwt_payload):
+        """Expiry is a plain 401 — the known key is not re-fetched."""
+        kc._jwks = rsa_jwks
         kc._jwks_fetched_at = time.time()
 
-        with patch.object(kc, "_decode_token", side_effect=JWTError("Invalid")):
-            with patch.object(kc, "get_jwks", new_callable=AsyncMock, return_value=sample_jwks):
-                with pytest.raises(HTTPException) as exc_info:
-                    await kc.validate_token("bad-token")
+        token = sign_token(sample_jwt_payload, exp_in=-60)
+        with pytest.raises(HTTPException) as exc_info:
+            await kc.validate_token(token)
 
         assert exc_info.value.status_code == 401
         assert "WWW-Authenticate" in exc_info.value.headers
+        kc._http_client.get.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refreshes_are_coalesced(
+        self, kc, rsa_jwks, sign_token, sample_jwt_payload
+    ):
+        """Concurrent unknown-kid failures share one fetch, then back off."""
+        kc._jwks = rsa_jwks
+        kc._jwks_fetched_at = time.time()
+
+        async def slow_get(url):
+            await asyncio.sleep(0.01)
+            resp = MagicMock()
+            resp.json.return_value = rsa_jwks
+            return resp
+
+        kc._http_client.get = AsyncMock(side_effect=slow_get)
+        token = sign_token(sample_jwt_payload, kid="unknown-kid")
+
+        results = await asyncio.gather(
+            *(kc.validate_token(token) for _ in range(10)), return_exceptions=True
+        )
+        assert all(isinstance(r, HTTPException) and r.status_code == 401 for r in results)
+        assert kc._http_client.get.call_count == 1
+
+        # Within JWKS_MIN_REFRESH_INTERVAL: no further fetch
+        with pytest.raises(HTTPException):
+            await kc.validate_token(token)
+        assert kc._http_client.get.call_count == 1
+
+        # After the interval, an unknown kid may fetch again
+        kc._jwks_attempted_at = time.time() - JWKS_MIN_REFRESH_INTERVAL - 1
+        with pytest.raises(HTTPException):
+            await kc.validate_token(token)
+        assert kc._http_client.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_validate_token_rejects_malformed_token(self, kc, rsa_jwks):
+        """A token without a readable header is rejected without any fetch."""
+        kc._jwks = rsa_jwks
+        kc._jwks_fetched_at = time.time()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await kc.validate_token("bad-token")
+
+        assert exc_info.value.status_code == 401
+        kc._http_client.get.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -525,6 +621,96 @@ class TestRegistration:
         assert exc_info.value.status_code == 500
 
 
+# ---------------------------------------------------------------------------
+# Admin Token Cache
+# ---------------------------------------------------------------------------
+
+def _admin_token_resp(token: str = "admin-token", expires_in: int = 300) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = 200
+    resp.json.return_value = {"access_token": token, "expires_in": expires_in}
+    resp.raise_for_status = MagicMock()
+    return resp
+
+
+class TestAdminTokenCache:
+
+    @pytest.mark.asyncio
+    async def test_admin_token_reused_until_expiry(self, kc):
+        """Bulk admin calls make one client-credentials fetch, not N."""
+        created = MagicMock(status_code=201)
+        kc._http_client.post = AsyncMock(side_effect=[_admin_token_resp()] + [created] * 5)
+
+        for i in range(5):
+            resp = await kc._admin_request("post", "/users", json={"username": f"u{i}"})
+            assert resp.status_code == 201
+
+        token_calls = [c for c in kc._http_client.post.call_args_list if c.args[0] == kc.token_endpoint]
+        assert len(token_calls) == 1
+        assert kc._http_client.post.call_args.kwargs["headers"]["Authorization"] == "Bearer admin-token"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_fetch(self, kc):
+        async def slow_post(url, **kwargs):
+            await asyncio.sleep(0.01)
+            return _admin_token_resp()
+
+        kc._http_client.post = AsyncMock(side_effect=slow_post)
+
+        tokens = await asyncio.gather(*(kc._get_admin_token() for _ in range(10)))
+
+        assert set(tokens) == {"admin-token"}
+        assert kc._http_client.post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_near_expiry_renews_in_background(self, kc):
+        """Past the refresh point the old token is served while a new one is fetched."""
+        kc._admin_token = "old-token"
+        kc._admin_token_expires_at = time.time() + 30
+        kc._admin_token_refresh_at = time.time() - 1
+        kc._http_client.post = AsyncMock(return_value=_admin_token_resp("new-token"))
+
+        assert await kc._get_admin_token() == "old-token"
+        await kc._admin_token_fetch
+
+        assert await kc._get_admin_token() == "new-token"
+        assert kc._http_client.post.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_token_fetched_inline(self, kc):
+        kc._admin_token = "old-token"
+        kc._admin_token_expires_at = time.time() - 1
+        kc._http_client.post = AsyncMock(return_value=_admin_token_resp("new-token"))
+
+        assert await kc._get_admin_token() == "new-token"
+
+    @pytest.mark.asyncio
+    async def test_rejected_token_dropped_and_retried_once(self, kc):
+        kc._admin_token = "revoked-token"
+        kc._admin_token_expires_at = time.time() + 300
+        kc._admin_token_refresh_at = time.time() + 200
+        kc._http_client.post = AsyncMock(side_effect=[
+            MagicMock(status_code=401),
+            _admin_token_resp("new-token"),
+            MagicMock(status_code=201),
+        ])
+
+        resp = await kc._admin_request("post", "/users", json={})
+
+        assert resp.status_code == 201
+        assert kc._admin_token == "new-token"
+
+    @pytest.mark.asyncio
+    async def test_fetch_failure_raises_503(self, kc):
+        kc._http_client.post = AsyncMock(side_effect=httpx.HTTPError("down"))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await kc._get_admin_token()
+
+        assert exc_info.value.status_code == 503
+        assert kc._admin_token is None
+
+
 # ---------------------------------------------------------------------------
 # Logout
 # ---------------------------------------------------------------------------
@@ -108,6 +108,64 @@ class TestWebSocket:
         assert _validate_room_access("user:other-user", claims) is False
         assert _validate_room_access("invalid-format", claims) is False
 
+    def test_revalidate_requires_same_user_and_org(self):
+        """In-band token refresh must keep the same sub and org_id."""
+        from unittest.mock import MagicMock
+
+        from server.app.routers.ws import _revalidate
+
+        current = {"sub": "user-1", "org_id": "org-1"}
+        auth = MagicMock()
+
+        auth.validate_token.return_value = {"sub": "user-1", "org_id": "org-1", "exp": 2}
+        assert _revalidate(auth, "tok", current) == {"sub": "user-1", "org_id": "org-1", "exp": 2}
+
+        auth.validate_token.return_value = {"sub": "user-2", "org_id": "org-1"}
+        assert _revalidate(auth, "tok", current) is None
+
+        auth.validate_token.return_value = {"sub": "user-1", "org_id": "org-2"}
+        assert _revalidate(auth, "tok", current) is None
+
+        auth.validate_token.side_effect = Exception("bad token")
+        assert _revalidate(auth, "tok", current) is None
+        assert _revalidate(auth, "", current) is None
+
+
+# =============================================================================
+# Server-Sent Events Tests
+# =============================================================================
+
+class TestEventStream:
+    """Tests for the SSE /events endpoint admission checks."""
+
+    @pytest.fixture
+    def sse_client(self):
+        from unittest.mock import MagicMock
+
+        from server.app.services.supabase_auth import get_supabase_auth
+
+        auth = MagicMock()
+        auth.validate_token.return_value = {"sub": TEST_USER_ID, "org_id": TEST_ORG_ID}
+        app.dependency_overrides[get_supabase_auth] = lambda: auth
+        yield TestClient(app)
+        app.dependency_overrides.pop(get_supabase_auth, None)
+
+    def test_missing_token(self, sse_client):
+        """No token → 401."""
+        resp = sse_client.get("/events")
+        assert resp.status_code == 401
+
+    def test_forbidden_room(self, sse_client):
+        """Rooms are checked with the same rules as /ws."""
+        resp = sse_client.get("/events", params={"token": "t", "rooms": "org:other-org"})
+        assert resp.status_code == 403
+
+    def test_too_many_rooms(self, sse_client):
+        """Room count is capped per stream."""
+        rooms = ",".join(f"project:p{i}" for i in range(50))
+        resp = sse_client.get("/events", params={"token": "t", "rooms": rooms})
+        assert resp.status_code == 400
+
 
 # =============================================================================
 # GDPR Tests
@@ -221,6 +221,7 @@ class TestRateLimiting:
         required_paths = [
             "/api/v1/auth/login",
             "/api/v1/auth/signup",
+            "/api/v1/auth/logout",
         ]
         for path in required_paths:
             assert path in RATE_LIMITS, f"Missing rate limit for {path}"
@@ -262,12 +263,11 @@ class TestRateLimiting:
         # Should be blocked
         assert limiter._check_memory(key, 5, 1) is False
 
-        # Simulate window expiry
-        for ts_list in limiter._memory_store.values():
-            ts_list.clear()
-
-        # Should be allowed again
-        assert limiter._check_memory(key, 5, 1) is True
+        # Simulate window expiry (current and previous window both aged out)
+        from unittest.mock import patch
+        with patch("server.app.middleware.rate_limit.time.time", return_value=time_mod.time() + 2.5):
+            # Should be allowed again
+            assert limiter._check_memory(key, 5, 1) is True
 
     def test_client_ip_extraction_forwarded_for(self):
         """X-Forwarded-For header is used for client IP."""
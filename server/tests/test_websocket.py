@@ -4,13 +4,35 @@ Covers:
 - Connection lifecycle (connect, disconnect, room management)
 - Personal and broadcast messaging with error handling
 - Event publishing helpers (ingestion, execution, notification)
+- Ingestion progress coalescing
+- Server heartbeats and idle/expired connection reaping
+- Wire format negotiation (JSON / MessagePack subprotocols)
+- Event ids, Last-Event-ID replay and the SSE transport
 """
 
+import asyncio
+import json
+import time
+
+import msgpack
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from server.app.services.websocket import (
+    CLOSE_AUTH_EXPIRED,
+    CLOSE_HEARTBEAT_TIMEOUT,
+    CLOSE_RECONNECT,
+    PROTOCOL_SSE,
+    SUBPROTOCOL_JSON,
+    SUBPROTOCOL_MSGPACK,
     ConnectionManager,
+    ProgressCoalescer,
+    SSEConnection,
+    decode_frame,
+    encode_frame,
+    format_sse,
+    negotiate_subprotocol,
     publish_ingestion_progress,
     publish_execution_update,
     publish_notification,
@@ -23,13 +45,20 @@ from server.app.services.websocket import (
 # ---------------------------------------------------------------------------
 
 def make_mock_websocket() -> MagicMock:
-    """Create a mock WebSocket with accept and send_json as AsyncMocks."""
+    """Create a mock WebSocket with accept, send_text/send_bytes and close as AsyncMocks."""
     ws = MagicMock()
     ws.accept = AsyncMock()
-    ws.send_json = AsyncMock()
+    ws.send_text = AsyncMock()
+    ws.send_bytes = AsyncMock()
+    ws.close = AsyncMock()
     return ws
 
 
+def as_text(data: dict) -> str:
+    """Encode ``data`` the way the default JSON subprotocol puts it on the wire."""
+    return json.dumps(data, separators=(",", ":"))
+
+
 # ---------------------------------------------------------------------------
 # TestConnectionManager
 # ---------------------------------------------------------------------------
@@ -206,14 +235,14 @@ class TestMessaging:
 
     @pytest.mark.asyncio
     async def test_send_personal_success(self):
-        """send_personal() sends JSON data to the websocket."""
+        """send_personal() sends JSON text to a websocket without a subprotocol."""
         mgr = ConnectionManager()
         ws = make_mock_websocket()
         data = {"type": "test", "payload": "hello"}
 
         await mgr.send_personal(ws, data)
 
-        ws.send_json.assert_awaited_once_with(data)
+        ws.send_text.assert_awaited_once_with(as_text(data))
 
     @pytest.mark.asyncio
     async def test_send_personal_error_disconnects_client(self):
@@ -221,7 +250,7 @@ class TestMessaging:
         mgr = ConnectionManager()
         ws = make_mock_websocket()
         await mgr.connect(ws, {"sub": "u1", "org_id": "o1"})
-        ws.send_json.side_effect = RuntimeError("connection closed")
+        ws.send_text.side_effect = RuntimeError("connection closed")
 
         await mgr.send_personal(ws, {"type": "test"})
 
@@ -241,8 +270,8 @@ class TestMessaging:
 
         await mgr.broadcast_to_room("project:p1", data)
 
-        ws1.send_json.assert_awaited_with(data)
-        ws2.send_json.assert_awaited_with(data)
+        ws1.send_text.assert_awaited_with(as_text(data))
+        ws2.send_text.assert_awaited_with(as_text(data))
 
     @pytest.mark.asyncio
     async def test_broadcast_to_room_empty_room_no_error(self):
@@ -257,7 +286,7 @@ class TestMessaging:
         mgr = ConnectionManager()
         ws_ok = make_mock_websocket()
         ws_fail = make_mock_websocket()
-        ws_fail.send_json.side_effect = RuntimeError("broken pipe")
+        ws_fail.send_text.side_effect = RuntimeError("broken pipe")
 
         await mgr.connect(ws_ok, {"sub": "u1"})
         await mgr.connect(ws_fail, {"sub": "u2"})
@@ -283,8 +312,8 @@ class TestMessaging:
 
         await mgr.broadcast_all(data)
 
-        ws1.send_json.assert_awaited_with(data)
-        ws2.send_json.assert_awaited_with(data)
+        ws1.send_text.assert_awaited_with(as_text(data))
+        ws2.send_text.assert_awaited_with(as_text(data))
 
     @pytest.mark.asyncio
     async def test_broadcast_all_disconnects_failed_clients(self):
@@ -292,7 +321,7 @@ class TestMessaging:
         mgr = ConnectionManager()
         ws_ok = make_mock_websocket()
         ws_fail = make_mock_websocket()
-        ws_fail.send_json.side_effect = RuntimeError("connection reset")
+        ws_fail.send_text.side_effect = RuntimeError("connection reset")
 
         await mgr.connect(ws_ok, {"sub": "u1"})
         await mgr.connect(ws_fail, {"sub": "u2"})
@@ -388,3 +417,522 @@ class TestEventPublishing:
             call_args = mock_broadcast.call_args
             payload = call_args[0][1]
             assert payload["level"] == "info"
+
+
+# ---------------------------------------------------------------------------
+# TestProgressCoalescer
+# ---------------------------------------------------------------------------
+
+def _progress(phase: str, progress: float) -> dict:
+    return {"type": "ingestion_progress", "phase": phase, "progress": progress}
+
+
+class TestProgressCoalescer:
+    """Tests for per-room ingestion progress coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_first_event_sent_immediately(self):
+        """The first event for a room is delivered without delay."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=10)
+
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.1))
+
+        mgr.broadcast_to_room.assert_awaited_once_with("project:p1", _progress("parsing", 0.1))
+
+    @pytest.mark.asyncio
+    async def test_burst_coalesced_latest_value_wins(self):
+        """A burst within one interval sends the first and then only the latest tick."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=20)
+
+        for i in range(100):
+            await coalescer.publish("project:p1", "parsing", _progress("parsing", i / 100))
+
+        assert mgr.broadcast_to_room.await_count == 1
+        assert coalescer.pending_rooms == 1
+
+        await asyncio.sleep(0.1)
+
+        assert mgr.broadcast_to_room.await_count == 2
+        assert mgr.broadcast_to_room.call_args[0][1] == _progress("parsing", 0.99)
+        assert coalescer.pending_rooms == 0
+
+    @pytest.mark.asyncio
+    async def test_phase_transition_flushes_and_sends_immediately(self):
+        """A new phase flushes the old phase's pending tick, then sends at once."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1)
+
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.1))
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.9))
+        await coalescer.publish("project:p1", "chunking", _progress("chunking", 0.0))
+
+        sent = [c[0][1] for c in mgr.broadcast_to_room.call_args_list]
+        assert sent == [
+            _progress("parsing", 0.1),
+            _progress("parsing", 0.9),
+            _progress("chunking", 0.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_terminal_phase_sent_immediately_and_state_dropped(self):
+        """Terminal phases bypass the throttle and release room state."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1)
+
+        await coalescer.publish("project:p1", "indexing", _progress("indexing", 0.5))
+        await coalescer.publish("project:p1", "completed", _progress("completed", 1.0))
+
+        assert mgr.broadcast_to_room.await_count == 2
+        assert coalescer._rooms == {}
+
+    @pytest.mark.asyncio
+    async def test_final_flag_bypasses_throttle(self):
+        """final=True delivers a same-phase event immediately."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1)
+
+        await coalescer.publish("project:p1", "indexing", _progress("indexing", 0.5))
+        await coalescer.publish("project:p1", "indexing", _progress("indexing", 1.0), final=True)
+
+        assert mgr.broadcast_to_room.call_args[0][1] == _progress("indexing", 1.0)
+
+    @pytest.mark.asyncio
+    async def test_rooms_are_independent(self):
+        """Throttling one room does not delay another."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1)
+
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.1))
+        await coalescer.publish("project:p2", "parsing", _progress("parsing", 0.1))
+
+        rooms = [c[0][0] for c in mgr.broadcast_to_room.call_args_list]
+        assert rooms == ["project:p1", "project:p2"]
+
+    @pytest.mark.asyncio
+    async def test_zero_hz_disables_coalescing(self):
+        """max_hz=0 forwards every tick."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=0)
+
+        for i in range(5):
+            await coalescer.publish("project:p1", "parsing", _progress("parsing", i))
+
+        assert mgr.broadcast_to_room.await_count == 5
+
+    @pytest.mark.asyncio
+    async def test_flush_delivers_pending(self):
+        """flush() sends pending updates without waiting for the timer."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1)
+
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.1))
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.2))
+        await coalescer.flush()
+
+        assert mgr.broadcast_to_room.await_count == 2
+        assert coalescer.pending_rooms == 0
+
+    @pytest.mark.asyncio
+    async def test_sweep_evicts_idle_rooms(self):
+        """The heartbeat sweep drops rooms that never got a final event once idle."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1, idle_timeout=60)
+
+        await coalescer.publish("project:crashed", "parsing", _progress("parsing", 0.1))
+        await coalescer.publish("project:busy", "parsing", _progress("parsing", 0.1))
+        await coalescer.publish("project:busy", "parsing", _progress("parsing", 0.2))
+        coalescer._rooms["project:crashed"].last_sent -= 61
+        coalescer._rooms["project:busy"].last_sent -= 61
+
+        await mgr.sweep()
+
+        # A pending tick keeps its room until it is delivered
+        assert set(coalescer._rooms) == {"project:busy"}
+
+    @pytest.mark.asyncio
+    async def test_recent_rooms_survive_sweep(self):
+        """Rooms with recent progress keep their throttle state."""
+        mgr = ConnectionManager()
+        mgr.broadcast_to_room = AsyncMock()
+        coalescer = ProgressCoalescer(mgr, max_hz=1, idle_timeout=60)
+
+        await coalescer.publish("project:p1", "parsing", _progress("parsing", 0.1))
+
+        assert coalescer.evict_idle() == 0
+        assert set(coalescer._rooms) == {"project:p1"}
+
+
+# ---------------------------------------------------------------------------
+# TestHeartbeat
+# ---------------------------------------------------------------------------
+
+class TestHeartbeat:
+    """Tests for server-driven heartbeats and connection reaping."""
+
+    @staticmethod
+    async def _connected(mgr: ConnectionManager, claims: dict | None = None) -> MagicMock:
+        ws = make_mock_websocket()
+        await mgr.connect(ws, claims or {"sub": "u1", "org_id": "o1"})
+        return ws
+
+    @pytest.mark.asyncio
+    async def test_quiet_connection_is_pinged(self):
+        """A connection quiet for ping_interval receives a server ping."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr)
+        mgr._state[ws].last_seen -= 11
+
+        evicted = await mgr.sweep()
+
+        assert evicted == 0
+        ws.send_text.assert_awaited_once_with(as_text({"type": "ping"}))
+        assert mgr._state[ws].ping_sent_at is not None
+
+    @pytest.mark.asyncio
+    async def test_active_connection_not_pinged(self):
+        """Recent client activity suppresses the ping."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr)
+
+        await mgr.sweep()
+
+        ws.send_text.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_missed_pong_evicts(self):
+        """A ping left unanswered past pong_timeout evicts the socket."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr)
+        mgr.join_room(ws, "project:p1")
+        mgr._state[ws].ping_sent_at = time.monotonic() - 6
+
+        evicted = await mgr.sweep()
+
+        assert evicted == 1
+        assert mgr.active_connections == 0
+        assert mgr._rooms == {}
+        assert mgr._memberships == {}
+        ws.close.assert_awaited_once_with(code=CLOSE_HEARTBEAT_TIMEOUT, reason="Heartbeat timeout")
+
+    @pytest.mark.asyncio
+    async def test_touch_clears_pending_ping(self):
+        """Any inbound frame counts as a pong."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr)
+        mgr._state[ws].ping_sent_at = time.monotonic() - 6
+
+        mgr.touch(ws)
+        evicted = await mgr.sweep()
+
+        assert evicted == 0
+        assert mgr.active_connections == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_token_closes_connection(self):
+        """A JWT past its exp claim is notified and closed with 4001."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr, {"sub": "u1", "org_id": "o1", "exp": int(time.time()) - 1})
+
+        evicted = await mgr.sweep()
+
+        assert evicted == 1
+        ws.send_text.assert_awaited_once_with(as_text({"type": "token_expired"}))
+        ws.close.assert_awaited_once_with(code=CLOSE_AUTH_EXPIRED, reason="Token expired")
+
+    @pytest.mark.asyncio
+    async def test_refreshed_claims_extend_connection(self):
+        """update_claims() with a later exp keeps the connection alive."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr, {"sub": "u1", "org_id": "o1", "exp": int(time.time()) - 1})
+
+        mgr.update_claims(ws, {"sub": "u1", "org_id": "o1", "exp": int(time.time()) + 3600})
+        evicted = await mgr.sweep()
+
+        assert evicted == 0
+
+    @pytest.mark.asyncio
+    async def test_max_age_sends_reconnect_hint(self):
+        """Connections past max_connection_age get a reconnect hint and 4000."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=60)
+        ws = await self._connected(mgr)
+        mgr._state[ws].connected_at -= 61
+
+        evicted = await mgr.sweep()
+
+        assert evicted == 1
+        notice = json.loads(ws.send_text.call_args[0][0])
+        assert notice["type"] == "reconnect"
+        assert 0 <= notice["retry_after_ms"] <= 5000
+        ws.close.assert_awaited_once_with(code=CLOSE_RECONNECT, reason="Max connection age")
+
+    @pytest.mark.asyncio
+    async def test_evict_tolerates_close_failure(self):
+        """Half-open sockets that fail to close are still untracked."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = await self._connected(mgr)
+        ws.close.side_effect = RuntimeError("transport closed")
+        mgr._state[ws].ping_sent_at = time.monotonic() - 6
+
+        await mgr.sweep()
+
+        assert mgr.active_connections == 0
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop_heartbeat(self):
+        """The heartbeat task starts once and stops cleanly."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+
+        mgr.start_heartbeat()
+        task = mgr._heartbeat_task
+        mgr.start_heartbeat()
+
+        assert mgr._heartbeat_task is task
+        await mgr.stop_heartbeat()
+        assert mgr._heartbeat_task is None
+        assert task.cancelled()
+
+
+# ---------------------------------------------------------------------------
+# TestWireProtocol
+# ---------------------------------------------------------------------------
+
+class TestWireProtocol:
+    """Tests for subprotocol negotiation and frame encoding."""
+
+    def test_negotiate_prefers_msgpack(self):
+        """MessagePack wins when the client offers both formats."""
+        offered = [SUBPROTOCOL_JSON, SUBPROTOCOL_MSGPACK]
+        assert negotiate_subprotocol(offered) == SUBPROTOCOL_MSGPACK
+
+    def test_negotiate_json_and_default(self):
+        """JSON is echoed when offered; no header means no subprotocol."""
+        assert negotiate_subprotocol([SUBPROTOCOL_JSON]) == SUBPROTOCOL_JSON
+        assert negotiate_subprotocol(None) is None
+        assert negotiate_subprotocol(["graphql-ws"]) is None
+
+    def test_encode_decode_roundtrip(self):
+        """Frames decode back to the original payload in both formats."""
+        data = {"type": "join", "room": "project:p1", "progress": 0.5}
+
+        text = encode_frame(data, None)
+        packed = encode_frame(data, SUBPROTOCOL_MSGPACK)
+
+        assert isinstance(text, str)
+        assert isinstance(packed, bytes)
+        assert decode_frame({"type": "websocket.receive", "text": text}) == data
+        assert decode_frame({"type": "websocket.receive", "bytes": packed}) == data
+
+    def test_decode_rejects_malformed(self):
+        """Non-object and undecodable payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_frame({"type": "websocket.receive", "text": "not json"})
+        with pytest.raises(ValueError):
+            decode_frame({"type": "websocket.receive", "text": "[1, 2]"})
+        with pytest.raises(ValueError):
+            decode_frame({"type": "websocket.receive", "bytes": b"\xc1"})
+
+    @pytest.mark.asyncio
+    async def test_connect_accepts_negotiated_subprotocol(self):
+        """connect() echoes the negotiated subprotocol in the handshake."""
+        mgr = ConnectionManager()
+        ws = make_mock_websocket()
+
+        await mgr.connect(ws, {"sub": "u1"}, subprotocol=SUBPROTOCOL_MSGPACK)
+
+        ws.accept.assert_awaited_once_with(subprotocol=SUBPROTOCOL_MSGPACK)
+
+    @pytest.mark.asyncio
+    async def test_msgpack_connection_receives_binary_frames(self):
+        """MessagePack connections get send_bytes, JSON ones send_text."""
+        mgr = ConnectionManager()
+        ws_json = make_mock_websocket()
+        ws_pack = make_mock_websocket()
+        await mgr.connect(ws_json, {"sub": "u1"})
+        await mgr.connect(ws_pack, {"sub": "u2"}, subprotocol=SUBPROTOCOL_MSGPACK)
+        data = {"type": "global", "n": 1}
+
+        await mgr.broadcast_all(data)
+
+        ws_json.send_text.assert_awaited_once_with(as_text(data))
+        ws_json.send_bytes.assert_not_awaited()
+        ws_pack.send_bytes.assert_awaited_once_with(msgpack.packb(data, use_bin_type=True))
+        ws_pack.send_text.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_broadcast_encodes_once_per_format(self):
+        """A room broadcast serializes the payload once, not once per socket."""
+        mgr = ConnectionManager()
+        sockets = [make_mock_websocket() for _ in range(5)]
+        for i, ws in enumerate(sockets):
+            await mgr.connect(ws, {"sub": f"u{i}"})
+            mgr.join_room(ws, "project:p1")
+
+        with patch(
+            "server.app.services.websocket.encode_frame", wraps=encode_frame
+        ) as mock_encode:
+            await mgr.broadcast_to_room("project:p1", {"type": "update"})
+
+        assert mock_encode.call_count == 1
+        for ws in sockets:
+            ws.send_text.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_evict_notice_uses_connection_format(self):
+        """Eviction notices are encoded in the socket's negotiated format."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        ws = make_mock_websocket()
+        claims = {"sub": "u1", "exp": int(time.time()) - 1}
+        await mgr.connect(ws, claims, subprotocol=SUBPROTOCOL_MSGPACK)
+
+        await mgr.sweep()
+
+        ws.send_bytes.assert_awaited_once_with(
+            msgpack.packb({"type": "token_expired"}, use_bin_type=True)
+        )
+
+
+# ---------------------------------------------------------------------------
+# TestReplay
+# ---------------------------------------------------------------------------
+
+class TestReplay:
+    """Tests for broadcast event ids and Last-Event-ID replay."""
+
+    @pytest.mark.asyncio
+    async def test_replay_returns_events_after_id(self):
+        """Only events newer than the given id are replayed, oldest first."""
+        mgr = ConnectionManager(replay_events=10, replay_rooms=10)
+        await mgr.broadcast_to_room("project:p1", {"n": 1})
+        first = f"{mgr._epoch}-{mgr._event_seq}"
+        await mgr.broadcast_to_room("org:o1", {"n": 2})
+        await mgr.broadcast_to_room("project:p1", {"n": 3})
+        await mgr.broadcast_to_room("project:other", {"n": 4})
+
+        events, complete = mgr.replay({"project:p1", "org:o1"}, first)
+
+        assert complete is True
+        assert [data["n"] for _, data in events] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_replay_detects_evicted_events(self):
+        """A gap in the per-room buffer is reported as incomplete."""
+        mgr = ConnectionManager(replay_events=2, replay_rooms=10)
+        await mgr.broadcast_to_room("project:p1", {"n": 1})
+        first = f"{mgr._epoch}-{mgr._event_seq}"
+        for n in range(2, 5):
+            await mgr.broadcast_to_room("project:p1", {"n": n})
+
+        events, complete = mgr.replay({"project:p1"}, first)
+
+        assert complete is False
+        assert [data["n"] for _, data in events] == [3, 4]
+
+    @pytest.mark.asyncio
+    async def test_replay_detects_dropped_rooms(self):
+        """Rooms pushed out of the LRU make older ids incomplete."""
+        mgr = ConnectionManager(replay_events=5, replay_rooms=1)
+        await mgr.broadcast_to_room("project:p1", {"n": 1})
+        first = f"{mgr._epoch}-{mgr._event_seq}"
+        await mgr.broadcast_to_room("project:p1", {"n": 2})
+        await mgr.broadcast_to_room("project:p2", {"n": 3})
+
+        assert len(mgr._history) == 1
+        _, complete = mgr.replay({"project:p1"}, first)
+        assert complete is False
+
+    def test_foreign_or_malformed_id_is_incomplete(self):
+        """Ids from another process or restart cannot be resumed."""
+        mgr = ConnectionManager()
+
+        assert mgr.replay({"org:o1"}, "deadbeef-1") == ([], False)
+        assert mgr.replay({"org:o1"}, "garbage") == ([], False)
+        assert mgr.replay({"org:o1"}, f"{mgr._epoch}-99") == ([], False)
+
+    @pytest.mark.asyncio
+    async def test_replay_disabled(self):
+        """replay_events=0 keeps no history."""
+        mgr = ConnectionManager(replay_events=0)
+        await mgr.broadcast_to_room("project:p1", {"n": 1})
+
+        assert mgr._history == {}
+
+
+# ---------------------------------------------------------------------------
+# TestSSEConnection
+# ---------------------------------------------------------------------------
+
+class TestSSEConnection:
+    """Tests for the SSE adapter registered with the ConnectionManager."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_sse_with_event_id(self):
+        """Room broadcasts are queued as SSE messages carrying the event id."""
+        mgr = ConnectionManager()
+        conn = SSEConnection(max_queue=10)
+        await mgr.connect(conn, {"sub": "u1", "org_id": "o1"}, subprotocol=PROTOCOL_SSE)
+
+        await mgr.broadcast_to_room("org:o1", {"type": "notification"})
+        await conn.close()
+        chunks = [chunk async for chunk in conn.stream(keepalive=1)]
+
+        event_id = f"{mgr._epoch}-{mgr._event_seq}"
+        assert chunks == [format_sse(as_text({"type": "notification"}), event_id)]
+
+    @pytest.mark.asyncio
+    async def test_personal_messages_have_no_id(self):
+        """Non-room messages don't move the client's Last-Event-ID."""
+        mgr = ConnectionManager()
+        conn = SSEConnection(max_queue=10)
+        await mgr.connect(conn, {"sub": "u1"}, subprotocol=PROTOCOL_SSE)
+
+        await mgr.send_personal(conn, {"type": "ping"})
+
+        assert conn._queue.get_nowait() == 'data: {"type":"ping"}\n\n'
+
+    @pytest.mark.asyncio
+    async def test_keepalive_comment_when_idle(self):
+        """An idle stream yields a keepalive comment."""
+        conn = SSEConnection(max_queue=10)
+        stream = conn.stream(keepalive=0.01)
+
+        assert await stream.__anext__() == ": keepalive\n\n"
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_is_disconnected(self):
+        """Overflowing the queue ends the stream and untracks the subscriber."""
+        mgr = ConnectionManager()
+        conn = SSEConnection(max_queue=2)
+        await mgr.connect(conn, {"sub": "u1"}, subprotocol=PROTOCOL_SSE)
+
+        for n in range(3):
+            await mgr.broadcast_to_room("user:u1", {"n": n})
+
+        assert conn.closed is True
+        assert mgr.active_connections == 0
+        chunks = [chunk async for chunk in conn.stream(keepalive=1)]
+        assert len(chunks) == 2
+
+    @pytest.mark.asyncio
+    async def test_eviction_notice_then_end_of_stream(self):
+        """Heartbeat eviction delivers the notice, then closes the stream."""
+        mgr = ConnectionManager(ping_interval=10, pong_timeout=5, max_connection_age=0)
+        conn = SSEConnection(max_queue=10)
+        claims = {"sub": "u1", "exp": int(time.time()) - 1}
+        await mgr.connect(conn, claims, subprotocol=PROTOCOL_SSE)
+
+        await mgr.sweep()
+        chunks = [chunk async for chunk in conn.stream(keepalive=1)]
+
+        assert chunks == ['data: {"type":"token_expired"}\n\n']
@@ -1,9 +1,11 @@
 """Tests for Celery worker tasks — mock LLM calls and DB operations."""
 
-import pytest
+import json
+import time
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
 
 # =============================================================================
 # Fixtures
@@ -357,6 +359,606 @@ class TestCheckDueHabitsTask:
         assert result["dispatched"] == 0
 
 
+# =============================================================================
+# Test usage ledger flush
+# =============================================================================
+
+class _LedgerRedis:
+    """Just enough of redis.asyncio for the ledger: strings, hashes, SCAN, pipelines."""
+
+    def __init__(self, strings=None, hashes=None, ready=True):
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import READY_KEY
+
+        self.strings = dict(strings or {})
+        self.hashes = {k: dict(v) for k, v in (hashes or {}).items()}
+        if ready:
+            self.strings.setdefault(READY_KEY.format(period=_get_billing_period()), "1")
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = str(value)
+        return True
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def delete(self, key):
+        self.strings.pop(key, None)
+        self.hashes.pop(key, None)
+
+    async def scan_iter(self, match="*", count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.strings):
+            if key.startswith(prefix):
+                yield key
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class _Pipe:
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: ops.append((name, args, kwargs))
+
+            async def execute(self):
+                results = []
+                for name, args, kwargs in ops:
+                    if name == "mget":
+                        results.append([redis.strings.get(k) for k in args[0]])
+                    elif name == "exists":
+                        results.append(int(args[0] in redis.strings))
+                    elif name == "hgetall":
+                        results.append(dict(redis.hashes.get(args[0], {})))
+                    elif name == "hset":
+                        redis.hashes.setdefault(args[0], {}).update(
+                            {k: str(v) for k, v in kwargs["mapping"].items()})
+                        results.append(len(kwargs["mapping"]))
+                    elif name == "delete":
+                        await redis.delete(args[0])
+                        results.append(1)
+                    else:
+                        results.append(True)
+                return results
+
+        return _Pipe()
+
+
+ORG_1 = "11111111-1111-1111-1111-111111111111"
+ORG_2 = "22222222-2222-2222-2222-222222222222"
+
+
+class TestUsageLedgerFlush:
+    """Tests for flushing Redis usage counters into usage_metrics."""
+
+    def _db(self):
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value = MagicMock(data=1)
+        return client
+
+    def _sent(self, client):
+        return [call.args[1] for call in client.rpc.call_args_list]
+
+    @pytest.mark.asyncio
+    async def test_first_flush_sends_full_counters(self):
+        """Counters with no checkpoint are sent in full, then checkpointed."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import CHECKPOINT_KEY, flush_usage_to_ledger
+
+        period = _get_billing_period()
+        redis = _LedgerRedis({
+            f"usage:{ORG_1}:api_calls:{period}": "7",
+            f"usage:{ORG_2}:ingestions:{period}": "3",
+            f"usage:not-an-org:api_calls:{period}": "9",
+        })
+        client = self._db()
+
+        result = await flush_usage_to_ledger(client, redis)
+
+        assert result == {"keys": 2, "rows": 2, "batches": 1}
+        (batch,) = self._sent(client)
+        assert client.rpc.call_args.args[0] == "apply_usage_deltas"
+        assert sorted((r["org_id"], r["category"], r["delta"]) for r in batch["p_rows"]) == [
+            (ORG_1, "api_calls", 7), (ORG_2, "ingestions", 3),
+        ]
+        assert redis.hashes[CHECKPOINT_KEY.format(period=period)] == {
+            f"usage:{ORG_1}:api_calls:{period}": "7",
+            f"usage:{ORG_2}:ingestions:{period}": "3",
+        }
+        assert "ledger:usage:lock" not in redis.strings
+        assert "ledger:usage:pending" not in redis.strings
+
+    @pytest.mark.asyncio
+    async def test_only_signed_deltas_are_sent(self):
+        """Unchanged counters are skipped; decreases and resets go out negative."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import CHECKPOINT_KEY, flush_usage_to_ledger
+
+        period = _get_billing_period()
+        grown, same, refunded, reset = (
+            f"usage:{ORG_1}:api_calls:{period}",
+            f"usage:{ORG_1}:ingestions:{period}",
+            f"usage:{ORG_2}:api_calls:{period}",
+            f"usage:{ORG_2}:ingestions:{period}",
+        )
+        redis = _LedgerRedis(
+            {grown: "12", same: "4", refunded: "8"},
+            {CHECKPOINT_KEY.format(period=period): {grown: "10", same: "4", refunded: "9", reset: "5"}},
+        )
+        client = self._db()
+
+        await flush_usage_to_ledger(client, redis)
+
+        (batch,) = self._sent(client)
+        deltas = {(r["org_id"], r["category"]): r["delta"] for r in batch["p_rows"]}
+        assert deltas == {
+            (ORG_1, "api_calls"): 2,
+            (ORG_2, "api_calls"): -1,
+            (ORG_2, "ingestions"): -5,
+        }
+
+    @pytest.mark.asyncio
+    async def test_current_period_rows_carry_plan_limit(self):
+        """The org's plan limit is recorded while the period is current, never for late usage."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import flush_usage_to_ledger
+
+        period = _get_billing_period()
+        redis = _LedgerRedis({
+            f"usage:{ORG_1}:api_calls:{period}": "7",
+            f"usage:{ORG_2}:api_calls:{period}": "3",
+            f"usage:{ORG_1}:api_calls:2020-01": "5",
+            "ledger:usage:ready:2020-01": "1",
+        })
+        client = self._db()
+        orgs = client.table.return_value.select.return_value.in_.return_value
+        orgs.execute.return_value = MagicMock(data=[{"id": ORG_1, "plan": "pro"}])
+
+        await flush_usage_to_ledger(client, redis)
+
+        (batch,) = self._sent(client)
+        limits = {(r["org_id"], r["period"]): r["plan_limit"] for r in batch["p_rows"]}
+        assert limits == {
+            (ORG_1, period): 1000,
+            (ORG_2, period): 100,
+            (ORG_1, "2020-01"): None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_second_flush_is_a_no_op(self):
+        """Nothing changed since the last flush → no ledger writes."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import flush_usage_to_ledger
+
+        redis = _LedgerRedis({f"usage:{ORG_1}:api_calls:{_get_billing_period()}": "7"})
+        client = self._db()
+
+        await flush_usage_to_ledger(client, redis)
+        result = await flush_usage_to_ledger(client, redis)
+
+        assert result["rows"] == 0
+        assert client.rpc.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_batches_respect_batch_size(self):
+        """Rows are written in batches of batch_size, each with its own ID."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import flush_usage_to_ledger
+
+        period = _get_billing_period()
+        redis = _LedgerRedis({
+            f"usage:{i:08d}-0000-0000-0000-000000000000:api_calls:{period}": "1" for i in range(5)
+        })
+        client = self._db()
+
+        result = await flush_usage_to_ledger(client, redis, batch_size=2)
+
+        sent = self._sent(client)
+        assert result["batches"] == 3
+        assert [len(b["p_rows"]) for b in sent] == [2, 2, 1]
+        assert len({b["p_batch_id"] for b in sent}) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_resent_with_same_batch_id(self):
+        """A batch whose write failed is replayed as-is, so the DB can dedupe it."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import flush_usage_to_ledger
+
+        redis = _LedgerRedis({f"usage:{ORG_1}:api_calls:{_get_billing_period()}": "7"})
+        client = self._db()
+        client.rpc.return_value.execute.side_effect = [ConnectionError("db down"), MagicMock(data=1)]
+
+        with pytest.raises(ConnectionError):
+            await flush_usage_to_ledger(client, redis)
+        assert "ledger:usage:pending" in redis.strings
+        assert "ledger:usage:lock" not in redis.strings
+
+        result = await flush_usage_to_ledger(client, redis)
+
+        first, retry = self._sent(client)
+        assert retry == first
+        assert result == {"keys": 1, "rows": 0, "batches": 1}
+        assert "ledger:usage:pending" not in redis.strings
+
+    @pytest.mark.asyncio
+    async def test_concurrent_flush_skipped(self):
+        """A flush that finds the lock held does nothing."""
+        from server.app.services.usage_ledger import LOCK_KEY, flush_usage_to_ledger
+
+        redis = _LedgerRedis({LOCK_KEY: "other-worker"})
+        client = self._db()
+
+        result = await flush_usage_to_ledger(client, redis)
+
+        assert result["skipped"] == 1
+        client.rpc.assert_not_called()
+        assert redis.strings[LOCK_KEY] == "other-worker"
+
+    @pytest.mark.asyncio
+    async def test_flush_after_redis_loss_rehydrates_first(self):
+        """Checkpoints lost while the API runs: restore from the ledger, send only new units."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import CHECKPOINT_KEY, READY_KEY, flush_usage_to_ledger
+
+        period = _get_billing_period()
+        key = f"usage:{ORG_1}:api_calls:{period}"
+        # Ledger holds 40; Redis was wiped and has counted 3 since
+        redis = _LedgerRedis({key: "3"}, ready=False)
+
+        async def rehydrate(client, redis_client, period=None, page_size=1000):
+            redis_client.strings[key] = str(int(redis_client.strings[key]) + 40)
+            redis_client.hashes.setdefault(CHECKPOINT_KEY.format(period=period), {})[key] = "40"
+            redis_client.strings[READY_KEY.format(period=period)] = "1"
+            return 1
+
+        client = self._db()
+        with patch("server.app.services.usage_ledger.rehydrate_usage_from_ledger",
+                   side_effect=rehydrate) as rehydrated:
+            await flush_usage_to_ledger(client, redis)
+            await flush_usage_to_ledger(client, redis)
+
+        rehydrated.assert_awaited_once()
+        (batch,) = self._sent(client)
+        assert [r["delta"] for r in batch["p_rows"]] == [3]
+        assert redis.strings[key] == "43"
+
+    @pytest.mark.asyncio
+    async def test_flush_refuses_when_rehydration_fails(self):
+        """No ledger writes if the lost period cannot be restored."""
+        from server.app.services.usage import _get_billing_period
+        from server.app.services.usage_ledger import LOCK_KEY, flush_usage_to_ledger
+
+        redis = _LedgerRedis({f"usage:{ORG_1}:api_calls:{_get_billing_period()}": "3"}, ready=False)
+        client = self._db()
+
+        with patch("server.app.services.usage_ledger.rehydrate_usage_from_ledger",
+                   side_effect=ConnectionError("db down")):
+            with pytest.raises(ConnectionError):
+                await flush_usage_to_ledger(client, redis)
+
+        client.rpc.assert_not_called()
+        assert LOCK_KEY not in redis.strings
+
+    @pytest.mark.asyncio
+    async def test_rehydrate_pipelines_one_script_per_row(self):
+        """Startup rehydration sends a page of ledger rows in one pipeline."""
+        from server.app.services.usage_ledger import (
+            CHECKPOINT_KEY,
+            READY_KEY,
+            REHYDRATE_SCRIPT,
+            rehydrate_usage_from_ledger,
+        )
+
+        client = MagicMock()
+        query = client.table.return_value.select.return_value.eq.return_value.order.return_value.range
+        query.return_value.execute.return_value = MagicMock(data=[
+            {"org_id": ORG_1, "category": "api_calls", "period": "2026-01", "used": 40},
+            {"org_id": ORG_2, "category": "api_calls", "period": "2026-01", "used": 7},
+        ])
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[40, -1])
+        script = AsyncMock()
+        redis = MagicMock()
+        redis.pipeline.return_value = pipe
+        redis.register_script.return_value = script
+        redis.set = AsyncMock()
+
+        restored = await rehydrate_usage_from_ledger(client, redis, period="2026-01")
+
+        assert restored == 1
+        redis.register_script.assert_called_once_with(REHYDRATE_SCRIPT)
+        client.table.return_value.select.return_value.eq.assert_called_once_with("period", "2026-01")
+        first = script.call_args_list[0].kwargs
+        assert first["keys"] == [f"usage:{ORG_1}:api_calls:2026-01", CHECKPOINT_KEY.format(period="2026-01")]
+        assert first["args"][0] == 40
+        assert all(call.kwargs["client"] is pipe for call in script.call_args_list)
+        pipe.execute.assert_awaited_once()
+        assert redis.set.call_args.args[0] == READY_KEY.format(period="2026-01")
+
+    @patch("server.app.workers.tasks._get_supabase_client")
+    def test_flush_task_uses_own_redis_connection(self, mock_client, mock_supabase):
+        """The Celery task opens (and closes) its own Redis client per run."""
+        mock_client.return_value = mock_supabase
+        redis = MagicMock()
+        redis.aclose = AsyncMock()
+
+        with patch("redis.asyncio.from_url", return_value=redis), \
+             patch("server.app.services.usage_ledger.flush_usage_to_ledger",
+                   AsyncMock(return_value={"keys": 1, "rows": 1, "batches": 1})) as flush:
+            from server.app.workers.tasks import flush_usage_ledger_task
+
+            result = flush_usage_ledger_task()
+
+        assert result["rows"] == 1
+        assert flush.call_args.args == (mock_supabase, redis)
+        redis.aclose.assert_awaited_once()
+
+
+# =============================================================================
+# Test usage export to Stripe (against a local Stripe stand-in)
+# =============================================================================
+
+class _StripeStandIn:
+    """Minimal local Stripe API: customer search and billing meter events.
+
+    Meter events are deduplicated by identifier like the real API.
+    ``lose_responses`` drops that many successful replies (500 after the
+    event is recorded), to mimic a timeout after Stripe accepted the call.
+    """
+
+    def __init__(self, customers: dict[str, str], delay: float = 0.0):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        self.customers = customers
+        self.events: dict[str, dict] = {}
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail = 0
+        self.lose_responses = 0
+        lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/v1/customers/search":
+                    return self._reply(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+                org_id = parse_qs(url.query)["query"][0].split('"')[3]
+                cus = stand_in.customers.get(org_id)
+                data = [{"id": cus, "object": "customer", "metadata": {"org_id": org_id}}] if cus else []
+                self._reply(200, {"object": "search_result", "data": data, "has_more": False, "url": url.path})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                form = {k: v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+                with lock:
+                    stand_in.requests += 1
+                    stand_in.in_flight += 1
+                    stand_in.max_in_flight = max(stand_in.max_in_flight, stand_in.in_flight)
+                try:
+                    time.sleep(delay)
+                    with lock:
+                        if stand_in.fail:
+                            stand_in.fail -= 1
+                            return self._reply(500, {"error": {"message": "boom", "type": "api_error"}})
+                        event = {
+                            "object": "billing.meter_event",
+                            "event_name": form["event_name"],
+                            "identifier": form["identifier"],
+                            "payload": {
+                                "stripe_customer_id": form["payload[stripe_customer_id]"],
+                                "value": form["payload[value]"],
+                            },
+                            "created": 0, "timestamp": 0, "livemode": False,
+                        }
+                        stand_in.events.setdefault(form["identifier"], event)
+                        if stand_in.lose_responses:
+                            stand_in.lose_responses -= 1
+                            return self._reply(500, {"error": {"message": "timeout", "type": "api_error"}})
+                    self._reply(200, event)
+                finally:
+                    with lock:
+                        stand_in.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def billed(self) -> dict[tuple[str, str], int]:
+        totals: dict[tuple[str, str], int] = {}
+        for event in self.events.values():
+            key = (event["payload"]["stripe_customer_id"], event["event_name"])
+            totals[key] = totals.get(key, 0) + int(event["payload"]["value"])
+        return totals
+
+
+class _LedgerDB:
+    """In-memory usage_metrics / organizations behind the Supabase client API."""
+
+    def __init__(self, rows, plans):
+        self.rows = {row["id"]: {"exported": 0, "export_target": None, **row} for row in rows}
+        self.plans = plans
+
+    def table(self, name):
+        query = MagicMock()
+        for method in ("select", "in_", "order", "range", "eq"):
+            getattr(query, method).return_value = query
+        if name == "usage_metrics":
+            query.execute.side_effect = lambda: MagicMock(data=[dict(r) for r in self.rows.values()])
+        else:
+            query.execute.side_effect = lambda: MagicMock(
+                data=[{"id": org, "plan": plan} for org, plan in self.plans.items()])
+        return query
+
+    def rpc(self, name, params):
+        call = MagicMock()
+
+        def execute():
+            if name == "stage_usage_export":
+                staged = []
+                for item in params["p_rows"]:
+                    row = self.rows[item["id"]]
+                    if row["export_target"] is None and item["target"] > row["exported"]:
+                        row["export_target"] = item["target"]
+                        staged.append({"id": item["id"]})
+                return MagicMock(data=staged)
+            for item in params["p_rows"]:
+                row = self.rows[item["id"]]
+                row["exported"] = max(row["exported"], item["exported"])
+                row["export_target"] = None
+            return MagicMock(data=len(params["p_rows"]))
+
+        call.execute.side_effect = execute
+        return call
+
+
+class TestUsageExport:
+    """Tests for exporting plan overage to Stripe meters."""
+
+    @pytest.fixture
+    def stand_in(self):
+        import stripe
+
+        stand_in = _StripeStandIn({ORG_1: "cus_one", ORG_2: "cus_two"})
+        with patch.object(stripe, "api_base", stand_in.url), \
+             patch.object(stripe, "max_network_retries", 0):
+            yield stand_in
+        stand_in.server.shutdown()
+
+    def _db(self, used_1=1500, used_2=150):
+        return _LedgerDB(
+            [
+                # pro: 1000 api_calls included
+                {"id": "m1", "org_id": ORG_1, "category": "api_calls", "period": "2026-01", "used": used_1},
+                {"id": "m2", "org_id": ORG_1, "category": "ingestions", "period": "2026-01", "used": 3},
+                # free: 100 api_calls included
+                {"id": "m3", "org_id": ORG_2, "category": "api_calls", "period": "2026-01", "used": used_2},
+                {"id": "m4", "org_id": "33333333-3333-3333-3333-333333333333",
+                 "category": "api_calls", "period": "2026-01", "used": 999},
+            ],
+            {ORG_1: "pro", ORG_2: "free", "33333333-3333-3333-3333-333333333333": "free"},
+        )
+
+    @pytest.mark.asyncio
+    async def test_exports_overage_once(self, stand_in):
+        """Only usage above the plan limit is billed, and only once."""
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        db = self._db()
+        first = await export_usage_to_stripe(db, periods=["2026-01"])
+        second = await export_usage_to_stripe(db, periods=["2026-01"])
+
+        assert first == {"rows": 4, "sent": 2, "failed": 0, "no_customer": 1}
+        assert second["sent"] == 0
+        assert stand_in.billed() == {("cus_one", "kijko_api_calls"): 500, ("cus_two", "kijko_api_calls"): 50}
+        assert db.rows["m1"]["exported"] == 500
+        assert db.rows["m1"]["export_target"] is None
+
+    @pytest.mark.asyncio
+    async def test_recorded_plan_limit_wins(self, stand_in):
+        """Overage uses the limit recorded for the period, not the org's plan today."""
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        db = self._db()
+        # ORG_1 was on free (100) during 2026-01 and upgraded to pro afterwards
+        db.rows["m1"]["plan_limit"] = 100
+        db.rows["m2"]["plan_limit"] = 10
+
+        await export_usage_to_stripe(db, periods=["2026-01"])
+
+        assert stand_in.billed() == {("cus_one", "kijko_api_calls"): 1400, ("cus_two", "kijko_api_calls"): 50}
+        assert db.rows["m1"]["exported"] == 1400
+
+    @pytest.mark.asyncio
+    async def test_only_new_overage_is_sent(self, stand_in):
+        """Growth since the last export goes out as a delta."""
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        db = self._db()
+        await export_usage_to_stripe(db, periods=["2026-01"])
+        db.rows["m1"]["used"] = 1620
+
+        await export_usage_to_stripe(db, periods=["2026-01"])
+
+        values = sorted(int(e["payload"]["value"]) for e in stand_in.events.values()
+                        if e["payload"]["stripe_customer_id"] == "cus_one")
+        assert values == [120, 500]
+        assert stand_in.billed()[("cus_one", "kijko_api_calls")] == 620
+
+    @pytest.mark.asyncio
+    async def test_failed_event_is_retried_next_run(self, stand_in):
+        """A failed call leaves the row staged and is resent next run."""
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        db = self._db(used_2=100)
+        stand_in.fail = 1
+
+        first = await export_usage_to_stripe(db, periods=["2026-01"])
+        assert first["failed"] == 1
+        assert db.rows["m1"]["export_target"] == 500
+
+        second = await export_usage_to_stripe(db, periods=["2026-01"])
+        assert second["sent"] == 1
+        assert stand_in.billed() == {("cus_one", "kijko_api_calls"): 500}
+
+    @pytest.mark.asyncio
+    async def test_lost_response_not_billed_twice(self, stand_in):
+        """Stripe accepted but the reply was lost: the resend reuses the identifier."""
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        db = self._db(used_2=100)
+        stand_in.lose_responses = 1
+
+        await export_usage_to_stripe(db, periods=["2026-01"])
+        # Usage keeps growing while the export is in flight
+        db.rows["m1"]["used"] = 1700
+        await export_usage_to_stripe(db, periods=["2026-01"])
+        await export_usage_to_stripe(db, periods=["2026-01"])
+
+        assert stand_in.requests == 3
+        assert stand_in.billed() == {("cus_one", "kijko_api_calls"): 700}
+        assert db.rows["m1"]["exported"] == 700
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than ``concurrency`` Stripe calls are in flight."""
+        import stripe
+
+        from server.app.services.usage_export import export_usage_to_stripe
+
+        orgs = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(12)]
+        stand_in = _StripeStandIn({org: f"cus_{i}" for i, org in enumerate(orgs)}, delay=0.05)
+        db = _LedgerDB(
+            [{"id": f"m{i}", "org_id": org, "category": "oracle_queries", "period": "2026-01", "used": 11}
+             for i, org in enumerate(orgs)],
+            {org: "free" for org in orgs},
+        )
+        try:
+            with patch.object(stripe, "api_base", stand_in.url), \
+                 patch.object(stripe, "max_network_retries", 0):
+                result = await export_usage_to_stripe(db, periods=["2026-01"], concurrency=3)
+        finally:
+            stand_in.server.shutdown()
+
+        assert result["sent"] == 12
+        assert stand_in.max_in_flight <= 3
+        assert len(stand_in.events) == 12
+
+
 class TestHelpers:
     """Tests for helper functions."""
 